@@ -7,4 +7,5 @@ class AccountsConfig(AppConfig):
     verbose_name = _("User Accounts")
 
     def ready(self):
+        import accounts.handlers  # noqa
         import accounts.signals  # noqa
@@ -0,0 +1,31 @@
+import logging
+
+from accounts.models import User
+from accounts.utils import get_invitation_email
+from core.events import (DEVELOPER_ROLLED_OFF, USER_INVITED, EventHandlerError,
+                         event_handler)
+from utils.send_email import send_email
+
+logger = logging.getLogger(__name__)
+
+
+@event_handler(USER_INVITED)
+def send_invitation_email(event):
+    """Event handler to email the invitation of an invited user who didn't
+    accept it yet
+    """
+    user = User.objects.filter(pk=event.payload["user_id"], is_active=False).first()
+    if user is None:
+        return
+    if not send_email(*get_invitation_email(user)):
+        raise EventHandlerError(f"The invitation of user {user.pk} couldn't be sent")
+
+
+@event_handler(DEVELOPER_ROLLED_OFF)
+def log_roll_off(event):
+    """Event handler to log the developers who rolled off their project"""
+    roll_off = event.payload
+    logger.info(
+        f"[ROLL OFF] Developer profile {roll_off['developer_profile_id']} left "
+        f"'{roll_off['project']}' which ended on {roll_off['end_date']}"
+    )
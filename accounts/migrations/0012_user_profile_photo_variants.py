@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_developerprofile_job_information'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_photo_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.7 on 2026-10-19 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_user_profile_photo_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='developerprofile',
+            index=models.Index(fields=['availability', 'current_project_end_date'], name='accounts_de_availab_446620_idx'),
+        ),
+    ]
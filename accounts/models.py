@@ -35,6 +35,7 @@ class User(TimestampMixin, AbstractUser):
         help_text=_("Shows whether or not this user has accepted their invite."),
     )
     profile_photo = models.URLField(blank=True)
+    profile_photo_variants = JSONField(default=dict, blank=True)
     country = CountryField(blank=True, null=True)
 
     USERNAME_FIELD = "email"
@@ -96,7 +97,11 @@ class DeveloperProfile(TimestampMixin, models.Model):
     ]
 
     class Meta:
-        indexes = [models.Index(fields=["availability"])]
+        indexes = [
+            models.Index(fields=["availability"]),
+            # projects that ended or end soon, see `roll_off_developers`
+            models.Index(fields=["availability", "current_project_end_date"]),
+        ]
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="developer_profile"
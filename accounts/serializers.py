@@ -1,3 +1,4 @@
+from django.utils import timezone
 from django_countries.serializer_fields import CountryField
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
@@ -6,6 +7,13 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from accounts.models import DeveloperProfile, Education, User, WorkExperience
 from utils.validations import validate_email, validate_password
 
+# relations read by the UserConfigSerializer and DeveloperProfileSerializer,
+# to be prefetched by the querysets that they serialize
+USER_PREFETCH = ["groups", "user_permissions"]
+DEVELOPER_PROFILE_PREFETCH = [
+    "user__groups", "user__user_permissions", "education", "work_experience", "skills"
+]
+
 
 class CurrentUserDeveloperProfileDefault:
     """Custom default class that enables the currently logged in user's
@@ -22,6 +30,9 @@ class CurrentUserDeveloperProfileDefault:
     requires_context = True
 
     def __call__(self, serializer_field):
+        # resolved once by views that serialize several items of the profile
+        if "developer_profile" in serializer_field.context:
+            return serializer_field.context["developer_profile"]
         request = serializer_field.context.get("request")
         if request and hasattr(request, "user"):
             return request.user.developer_profile.first()
@@ -29,12 +40,62 @@ class CurrentUserDeveloperProfileDefault:
         raise serializers.ValidationError(error_message)
 
 
+class ProfileItemListSerializer(serializers.ListSerializer):
+    """List serializer that saves the submitted education or work experience
+    of a developer profile. Its instance is the queryset of the existing
+    rows: an item with the `id` of a row updates it and an item without `id`
+    is inserted. With `replace` in the context, the list is the complete
+    list of the profile and the rows left out are deleted. One query each
+
+    Raises:
+        serializers.ValidationError: raised if an `id` isn't one of the rows
+        or is submitted twice
+    """
+
+    def get_submitted_ids(self) -> list:
+        return [item.get("id") if isinstance(item, dict) else None for item in self.initial_data]
+
+    def validate(self, attrs):
+        ids = [pk for pk in self.get_submitted_ids() if pk is not None]
+        existing_ids = {str(row.pk) for row in self.instance}
+        if len(set(map(str, ids))) != len(ids) or not set(map(str, ids)) <= existing_ids:
+            raise serializers.ValidationError("One or more ids are invalid or duplicated.")
+        return attrs
+
+    def update(self, instance, validated_data):
+        model = self.child.Meta.model
+        developer_profile = self.context["developer_profile"]
+        existing = {str(row.pk): row for row in instance}
+        now = timezone.now()
+        created, updated, fields = [], [], {"modify_date"}
+
+        for pk, attrs in zip(self.get_submitted_ids(), validated_data):
+            attrs.pop("developer_profile", None)
+            if pk is None:
+                created.append(model(developer_profile=developer_profile, **attrs))
+                continue
+            row = existing.pop(str(pk))
+            for name, value in attrs.items():
+                setattr(row, name, value)
+            # bulk_update doesn't apply auto_now
+            row.modify_date = now
+            fields.update(attrs)
+            updated.append(row)
+
+        if existing and self.context.get("replace"):
+            model.objects.filter(pk__in=[row.pk for row in existing.values()]).delete()
+        if updated:
+            model.objects.bulk_update(updated, sorted(fields))
+        return [*updated, *model.objects.bulk_create(created)]
+
+
 class EducationSerializer(serializers.ModelSerializer):
     developer_profile = serializers.HiddenField(default=CurrentUserDeveloperProfileDefault())
 
     class Meta:
         model = Education
         fields = "__all__"
+        list_serializer_class = ProfileItemListSerializer
 
 
 class WorkExperienceSerializer(serializers.ModelSerializer):
@@ -44,6 +105,7 @@ class WorkExperienceSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkExperience
         fields = "__all__"
+        list_serializer_class = ProfileItemListSerializer
 
 
 class CountryWithCodeAndNameField(CountryField):
@@ -170,6 +232,7 @@ class UserConfigSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         exclude = ["password"]
+        read_only_fields = ["profile_photo_variants"]
 
 
 class DeveloperProfileSerializer(serializers.ModelSerializer):
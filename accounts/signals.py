@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 
-from accounts.models import DeveloperProfile, User
+from accounts.models import DeveloperProfile, Education, User, WorkExperience
+from core import audit
+from core.cache import (DEVELOPER_PROFILES_TAG, PROJECTS_TAG, USERS_TAG,
+                        invalidate_tags_on_commit)
 
 
 @receiver(post_save, sender=User)
@@ -16,3 +19,35 @@ def create_developer_profile(sender, instance, created, **kwargs):
     """
     if created and instance.role == User.DEVELOPER:
         DeveloperProfile.objects.get_or_create(user=instance)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_responses(sender, **kwargs):
+    """Signal function to invalidate the cached responses that contain users"""
+    invalidate_tags_on_commit(USERS_TAG, DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
+
+
+@receiver([post_save, post_delete], sender=DeveloperProfile)
+@receiver([post_save, post_delete], sender=Education)
+@receiver([post_save, post_delete], sender=WorkExperience)
+def invalidate_developer_profile_responses(sender, **kwargs):
+    """Signal function to invalidate the cached responses that contain
+    developer profiles
+    """
+    invalidate_tags_on_commit(DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
+
+
+@receiver(post_init, sender=User)
+def remember_role(sender, instance, **kwargs):
+    """Signal function to keep the role a user was loaded with, to audit its
+    changes. A deferred role isn't loaded
+    """
+    instance._initial_role = instance.__dict__.get("role")
+
+
+@receiver(post_save, sender=User)
+def audit_role_change(sender, instance, created, **kwargs):
+    """Signal function to record a change of role in the audit log"""
+    if not created and instance._initial_role is not None and instance._initial_role != instance.role:
+        audit.record_change(audit.ROLE_CHANGED, instance, {"old_role": instance._initial_role, "role": instance.role})
+    instance._initial_role = instance.role
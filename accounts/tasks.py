@@ -0,0 +1,66 @@
+import logging
+import os
+
+from celery import shared_task
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import UnidentifiedImageError
+
+from accounts.models import User
+from accounts.utils import roll_off_developers
+from core.cache import (DEVELOPER_PROFILES_TAG, PROJECTS_TAG, USERS_TAG,
+                        invalidate_tags)
+from utils.images import resize_image_variants
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generate_profile_photo_variants(user_id, photo_path):
+    """Celery task to generate the resized variants of a user's profile photo
+    and record their URLs on the user
+
+    Args:
+        user_id (int): id of the user who uploaded the photo
+        photo_path (str): storage path of the original photo
+
+    Returns:
+        dict: mapping of the variant name to its URL
+    """
+    photo_url = default_storage.url(photo_path)
+    if not User.objects.filter(pk=user_id, profile_photo=photo_url).exists():
+        # the user has since replaced or removed this photo
+        return {}
+
+    try:
+        with default_storage.open(photo_path, "rb") as photo:
+            variants = resize_image_variants(
+                photo, settings.PROFILE_PHOTO_VARIANTS, settings.PROFILE_PHOTO_QUALITY
+            )
+    except (OSError, UnidentifiedImageError):
+        logger.exception(f"[PROFILE PHOTO] Could not resize {photo_path}")
+        return {}
+
+    name = os.path.splitext(photo_path)[0]
+    variant_urls = {}
+    for variant_name, variant in variants.items():
+        variant_path = default_storage.save(f"{name}-{variant_name}.jpg", variant)
+        variant_urls[variant_name] = default_storage.url(variant_path)
+
+    User.objects.filter(pk=user_id, profile_photo=photo_url).update(
+        profile_photo_variants=variant_urls, modify_date=timezone.now()
+    )
+    invalidate_tags(USERS_TAG, DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
+    return variant_urls
+
+
+@shared_task
+def roll_off_ended_projects():
+    """Periodic Celery task to make the developers whose project ended
+    available again, see `CELERY_BEAT_SCHEDULE`
+
+    Returns:
+        int: the number of developers who rolled off
+    """
+    return len(roll_off_developers())
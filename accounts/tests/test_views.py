@@ -1,12 +1,36 @@
-from django.test import RequestFactory, TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
+from PIL import Image
 from rest_framework import status
 from rest_framework.test import APIClient, force_authenticate
 
+from accounts.models import DeveloperProfile, Education
+from accounts.tasks import (generate_profile_photo_variants,
+                            roll_off_ended_projects)
 from accounts.tests.factories import User, UserFactory
-from accounts.views import UserConfigView
+from accounts.views import SendInvitationView, UserConfigView
+from core.cache import get_cache_stats
+from core.events import DEVELOPER_ROLLED_OFF, dispatch_events
+from core.models import OutboxEvent
+from skills import similarity
+from skills.models import SkillRating
+from skills.tests.factories import CategoryFactory, SkillFactory
 from utils.auth import TokenGenerator
 
 
@@ -145,6 +169,53 @@ class UserListViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class UserListCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin_user = UserFactory.create()
+        cls.url = reverse("accounts:user-list")
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        access_token = self.admin_user.tokens.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+    def test_user_list_is_served_from_the_cache(self):
+        """Test that a repeated request is answered from the response cache
+        """
+        first_response = self.client.get(self.url)
+        second_response = self.client.get(self.url)
+
+        self.assertEqual(first_response["X-Cache"], "MISS")
+        self.assertEqual(second_response["X-Cache"], "HIT")
+        self.assertEqual(second_response.data, first_response.data)
+        stats = get_cache_stats()["UserListView.list"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_saving_a_user_invalidates_the_cached_list(self):
+        """Test that creating a user drops the cached user list
+        """
+        self.client.get(self.url)
+        UserFactory.create(email="manager@amalitech.org", role=User.PROJECT_MANAGER)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data), 2)
+
+    def test_list_cached_before_the_commit_is_invalidated_on_commit(self):
+        """Test that a list cached while the transaction that created a user
+        was still open is dropped once it commits
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            UserFactory.create(email="manager@amalitech.org", role=User.PROJECT_MANAGER)
+            # stands for a concurrent request that can't see the new user yet
+            self.client.get(self.url)
+            self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+
+
 class DeveloperProfileTestMixin:
     @classmethod
     def setUpTestData(cls) -> None:
@@ -201,6 +272,92 @@ class DeveloperProfileUpdateViewTestCase(DeveloperProfileTestMixin, TestCase):
         self.assertEqual(response.data.get("job_information"), self.payload.get("job_information"))
         self.assertEqual(response.data.get("employment_status"), self.payload.get("employment_status"))
 
+    def test_developer_update_profile_adds_the_submitted_items(self):
+        """Test that a patch updates the rows with an id, creates the items
+        without one and keeps the rows left out
+        """
+        response = self.client.patch(self.url, self.payload, format="json")
+        work_experience = response.data["work_experience"]
+        education = response.data["education"]
+
+        payload = {
+            "work_experience": [{**work_experience[0], "job_title": "Senior Software Developer"}],
+            "education": [{**self.payload["education"][0], "school_name": "KNUST"}],
+        }
+        response = self.client.patch(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = sorted(response.data["work_experience"], key=lambda row: row["id"])
+        self.assertEqual([row["id"] for row in rows], sorted(row["id"] for row in work_experience))
+        self.assertEqual(rows[0]["job_title"], "Senior Software Developer")
+        self.assertEqual(len(response.data["education"]), len(education) + 1)
+
+    def test_developer_replace_profile_diffs_the_submitted_lists(self):
+        """Test that the lists submitted with a put replace the profile's
+        education and work experience: rows with an id are updated, rows
+        without one are created and rows left out are deleted, so repeated
+        saves don't duplicate them
+        """
+        response = self.client.patch(self.url, self.payload, format="json")
+        work_experience = response.data["work_experience"]
+        education_id = response.data["education"][0]["id"]
+        self.client.patch(self.url, {**self.payload, "work_experience": work_experience}, format="json")
+
+        payload = {
+            "work_experience": [
+                {**work_experience[0], "job_title": "Senior Software Developer"},
+                {**self.payload["work_experience"][1], "company_name": "Amazon"},
+            ],
+            "education": [],
+        }
+        response = self.client.put(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = sorted(response.data["work_experience"], key=lambda row: row["id"])
+        self.assertEqual([row["id"] for row in rows[:1]], [work_experience[0]["id"]])
+        self.assertEqual([row["job_title"] for row in rows], ["Senior Software Developer", "Software Developer"])
+        self.assertEqual(rows[1]["company_name"], "Amazon")
+        self.assertEqual(response.data["education"], [])
+        self.assertFalse(Education.objects.filter(pk=education_id).exists())
+
+    def test_developer_update_profile_rejects_unknown_ids(self):
+        """Test that an id that isn't one of the profile's rows is rejected
+        and nothing is saved
+        """
+        other_profile = UserFactory.create(email="other@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+        education = Education.objects.create(
+            developer_profile=other_profile, school_name="KNUST", program="BSc. Mathematics",
+            start_date="2015-09-01", end_date="2019-06-01",
+        )
+        payload = {**self.payload, "education": [{**self.payload["education"][0], "id": education.pk}]}
+
+        response = self.client.patch(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.developer_user.developer_profile.get().work_experience.exists())
+        self.assertEqual(Education.objects.get(pk=education.pk).school_name, "KNUST")
+
+    def test_developer_update_profile_queries_are_bounded(self):
+        """Test that the number of queries doesn't grow with the number of
+        submitted items
+        """
+        work_experience, education = self.payload["work_experience"][0], self.payload["education"][0]
+
+        def count_queries(items):
+            response = self.client.patch(
+                self.url, {"work_experience": [work_experience] * items, "education": [education] * items}, format="json"
+            )
+            # updates all the rows but one, deletes it and inserts a new one
+            payload = {
+                "work_experience": [*response.data["work_experience"][1:], work_experience],
+                "education": [*response.data["education"][1:], education],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                self.client.put(self.url, payload, format="json")
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+
 
 class DeveloperProfileViewTestCase(DeveloperProfileTestMixin, TestCase):
     def setUp(self) -> None:
@@ -217,3 +374,271 @@ class DeveloperProfileViewTestCase(DeveloperProfileTestMixin, TestCase):
         self.assertEqual(response.data.get("user").get("id"), self.developer_user.pk)
         self.assertIsInstance(response.data.get("education"), list)
         self.assertIsInstance(response.data.get("work_experience"), list)
+
+    def test_developer_profile_etag_changes_with_education(self):
+        """Test that the profile is only resent once its nested education changes
+        """
+        etag = self.client.get(self.url, format="json")["ETag"]
+        response = self.client.get(self.url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Education.objects.create(
+            developer_profile=self.developer_user.developer_profile.first(),
+            school_name="University of Ghana",
+            program="BSc. Computer Science",
+            start_date="2017-09-05",
+            end_date="2021-05-12",
+        )
+        response = self.client.get(self.url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data.get("education")), 1)
+
+
+class UpdateUserProfilePhotoTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = UserFactory.create(email="photo@amalitech.org")
+        cls.url = reverse("accounts:update-user")
+
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        storage_settings = override_settings(
+            DEFAULT_FILE_STORAGE="django.core.files.storage.FileSystemStorage",
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL="https://media.amalitech.org/",
+        )
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+        self.client = APIClient()
+        access_token = self.user.tokens.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+    def make_photo(self, name="My Photo.png", size=(1200, 800)):
+        buffer = BytesIO()
+        Image.new("RGBA", size, (200, 40, 40, 255)).save(buffer, format="PNG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+    def test_profile_photo_is_uploaded_and_variants_are_queued(self):
+        """Test that the original photo is saved during the request and the
+        resized variants are generated in the background once it's committed
+        """
+        with mock.patch("accounts.views.generate_profile_photo_variants.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(self.url, {"profile_photo": self.make_photo()}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data.get("profile_photo").endswith("profile-photos/my-photo.png"))
+        self.assertEqual(response.data.get("profile_photo_variants"), {})
+        delay.assert_called_once_with(self.user.pk, "profile-photos/my-photo.png")
+
+    def test_generate_profile_photo_variants(self):
+        """Test that the resized variants are saved and their URLs recorded on the user"""
+        path = default_storage.save("profile-photos/photo.png", self.make_photo())
+        User.objects.filter(pk=self.user.pk).update(profile_photo=default_storage.url(path))
+
+        variants = generate_profile_photo_variants(self.user.pk, path)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_photo_variants, variants)
+        self.assertEqual(set(variants), {"small", "medium", "large"})
+        with default_storage.open("profile-photos/photo-small.jpg") as small:
+            self.assertEqual(Image.open(small).size, (64, 43))
+
+    def test_stale_photo_variants_are_not_recorded(self):
+        """Test that variants of a photo that has since been replaced are discarded"""
+        path = default_storage.save("profile-photos/old.png", self.make_photo())
+
+        self.assertEqual(generate_profile_photo_variants(self.user.pk, path), {})
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_photo_variants, {})
+
+
+# the middleware of the ASGI deployment, see ASGI_MODE in the settings
+@override_settings(
+    ROOT_URLCONF="acms.asgi_urls",
+    MIDDLEWARE=[middleware for middleware in settings.MIDDLEWARE if not middleware.startswith("whitenoise.")],
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class AsyncAccountViewsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin = UserFactory.create(email="admin@amalitech.org", role=User.ADMIN)
+
+    def setUp(self) -> None:
+        self.headers = {"AUTHORIZATION": f"Bearer {self.admin.tokens.get('access')}"}
+
+    def test_invitation_is_sent_by_the_sync_view(self):
+        """Test that the ASGI deployment serves the invitation with the sync
+        view, the email is sent by the dispatcher
+        """
+        response = async_to_sync(self.async_client.post)(
+            reverse("accounts:Send invitation"),
+            {"email": "invited@amalitech.org", "role": User.DEVELOPER},
+            content_type="application/json",
+            **self.headers,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.resolver_match.func.view_class, SendInvitationView)
+        self.assertEqual(response.data["data"], {"email": "invited@amalitech.org", "role": User.DEVELOPER})
+        self.assertEqual(mail.outbox, [])
+
+        self.assertEqual(dispatch_events(), {"dispatched": 1})
+        self.assertEqual(mail.outbox[0].to, ["invited@amalitech.org"])
+
+    def test_user_config_is_served_by_the_sync_view(self):
+        """Test that the ASGI deployment serves the user config with the sync
+        view and keeps the conditional responses
+        """
+        response = async_to_sync(self.async_client.get)(reverse("accounts:user"), **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.resolver_match.func.view_class, UserConfigView)
+        self.assertEqual(response.data["email"], self.admin.email)
+
+        response = async_to_sync(self.async_client.get)(
+            reverse("accounts:user"), IF_NONE_MATCH=response["ETag"], **self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_async_views_require_authentication(self):
+        """Test that authentication still runs before the async handlers"""
+        response = async_to_sync(self.async_client.get)(reverse("accounts:user"))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class RollOffTestCase(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin.tokens.get('access')}")
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.admin = UserFactory.create(email="admin@amalitech.org")
+        cls.today = timezone.localdate()
+        cls.developers = []
+        # the end dates of the projects of the developers, None when they're available
+        for index, days in enumerate([-30, -1, 0, 10, 20, None]):
+            developer = UserFactory.create(
+                email=f"developer{index}@amalitech.org", role=User.DEVELOPER
+            ).developer_profile.get()
+            if days is not None:
+                developer.availability = False
+                developer.current_project = f"Project {index}"
+                developer.current_project_start_date = cls.today - timezone.timedelta(days=60)
+                developer.current_project_end_date = cls.today + timezone.timedelta(days=days)
+                developer.save()
+            cls.developers.append(developer)
+
+    def test_roll_off_ended_projects(self):
+        """Test that the developers whose project ended are made available in
+        one query and that a roll-off event is published for each of them
+        """
+        # the UPDATE and the events, in a savepoint of the test's transaction
+        with self.assertNumQueries(4):
+            self.assertEqual(roll_off_ended_projects(), 2)
+
+        rolled_off = DeveloperProfile.objects.filter(pk__in=[self.developers[0].pk, self.developers[1].pk])
+        self.assertTrue(all(developer.availability for developer in rolled_off))
+        self.assertEqual({developer.current_project_end_date for developer in rolled_off}, {None})
+        self.assertFalse(DeveloperProfile.objects.get(pk=self.developers[2].pk).availability)
+
+        roll_offs = OutboxEvent.objects.filter(event_type=DEVELOPER_ROLLED_OFF).values_list("payload", flat=True)
+        self.assertEqual(
+            sorted((roll_off["developer_profile_id"], roll_off["project"]) for roll_off in roll_offs),
+            [(self.developers[0].pk, "Project 0"), (self.developers[1].pk, "Project 1")],
+        )
+        self.assertEqual(roll_off_ended_projects(), 0)
+
+    def test_developer_profiles_ending(self):
+        """Test that the developers whose project ends within the number of
+        days are listed, soonest first
+        """
+        url = reverse("accounts:developer-profiles-ending")
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [profile["id"] for profile in response.data["results"]], [self.developers[2].pk, self.developers[3].pk]
+        )
+
+        response = self.client.get(url, {"days": 30})
+        self.assertEqual(response.data["count"], 3)
+
+        response = self.client.get(url, {"days": "-1"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SimilarDevelopersListViewTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        category = CategoryFactory.create(name="Backend", slug="backend")
+        cls.skills = [
+            SkillFactory.create(name=name, slug=name.lower(), category=category) for name in ["Python", "Go", "Rust"]
+        ]
+        cls.developers = {}
+        # ratings of Python, Go and Rust
+        for name, ratings in [
+            ("leaving", [5, 4, 0]), ("twin", [5, 4, 0]), ("close", [4, 5, 1]), ("far", [0, 0, 5]), ("busy", [5, 4, 0]),
+        ]:
+            profile = UserFactory.create(email=f"{name}@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+            cls.add_ratings(profile, ratings)
+            cls.developers[name] = profile
+        DeveloperProfile.objects.filter(pk=cls.developers["busy"].pk).update(availability=False)
+        cls.manager = UserFactory.create(email="manager@amalitech.org", role=User.PROJECT_MANAGER)
+
+    @classmethod
+    def add_ratings(cls, profile, ratings):
+        SkillRating.objects.bulk_create(
+            SkillRating(developer_profile=profile, skill=skill, rating=rating, comment="")
+            for skill, rating in zip(cls.skills, ratings)
+            if rating
+        )
+
+    def setUp(self) -> None:
+        similarity._index = None
+        self.addCleanup(setattr, similarity, "_index", None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+        self.url = reverse("accounts:similar-developers", args=[self.developers["leaving"].pk])
+
+    def test_similar_available_developers_are_ranked_by_cosine_similarity(self):
+        """Test that the available developers are listed most similar first,
+        without the developer themselves and the unavailable developers
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [data["developer_profile"]["id"] for data in response.data],
+            [self.developers[name].pk for name in ["twin", "close"]],
+        )
+        self.assertEqual([data["similarity"] for data in response.data], [1.0, 0.9639])
+        self.assertEqual(len(self.client.get(self.url, {"limit": 1}).data), 1)
+        self.assertEqual(self.client.get(self.url, {"limit": 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SIMILARITY_REFRESH_INTERVAL=3600)
+    def test_index_is_refreshed_incrementally(self):
+        """Test that the rows of the developers whose ratings changed are
+        reloaded without rebuilding the index
+        """
+        self.client.get(self.url)
+        index = similarity._index
+        newcomer = UserFactory.create(email="newcomer@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+        self.add_ratings(newcomer, [5, 4, 0])
+        SkillRating.objects.filter(developer_profile=self.developers["far"]).update(rating=5)
+        self.add_ratings(self.developers["far"], [5, 4, 0])
+        # bulk queries don't send signals, in this process a rating change expires the index
+        similarity.expire_similarity_index()
+
+        response = self.client.get(self.url, {"limit": 4})
+
+        self.assertIs(similarity._index, index)
+        self.assertEqual(
+            [data["developer_profile"]["id"] for data in response.data],
+            [self.developers["twin"].pk, newcomer.pk, self.developers["close"].pk, self.developers["far"].pk],
+        )
+        self.assertEqual(response.data[3]["similarity"], 0.7882)
@@ -3,9 +3,10 @@ from django.urls import path
 from accounts.views import (AcceptInviteAPIView, DeveloperProfileAPIView,
                             DeveloperProfileListAPIView,
                             DeveloperProfileUpdateView, DeveloperProfileView,
-                            EducationDetailView, LoginAPIView,
-                            SendInvitationView, UpdateUserAPIView,
-                            UserConfigView, UserListView,
+                            EducationDetailView,
+                            EndingDeveloperProfilesListView, LoginAPIView,
+                            SendInvitationView, SimilarDevelopersListView,
+                            UpdateUserAPIView, UserConfigView, UserListView,
                             WorkExperienceDetailView)
 
 urlpatterns = [
@@ -17,11 +18,13 @@ urlpatterns = [
         name="user-retrieve-update",
     ),
     path("user/", UserConfigView.as_view(), name="user"),
-    path("update-user/", UpdateUserAPIView.as_view(), name="user"),
+    path("update-user/", UpdateUserAPIView.as_view(), name="update-user"),
     path("users/", UserListView.as_view(), name="user-list"),
     path('developer-profiles/', DeveloperProfileListAPIView.as_view()),
+    path("developer-profiles/ending/", EndingDeveloperProfilesListView.as_view(), name="developer-profiles-ending"),
     path('developer-profile/', DeveloperProfileAPIView.as_view(), name="developer-profile"),
     path("developer/<int:id>", DeveloperProfileView.as_view(), name="view-developer profile"),
+    path("developer/<int:id>/similar/", SimilarDevelopersListView.as_view(), name="similar-developers"),
     path("developer-profile/update/", DeveloperProfileUpdateView.as_view(), name="developer-profile-update"),
     path("work-experience/<int:pk>", WorkExperienceDetailView.as_view(), name="work-experience-retrieve-update-delete"),
     path("education/<int:pk>", EducationDetailView.as_view(), name="education-retrieve-update-delete"),
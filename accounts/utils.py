@@ -1,10 +1,19 @@
 import logging
 
-from django.utils.encoding import force_str
-from django.utils.http import urlsafe_base64_decode
+from django.conf import settings
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from six import text_type
 
-from accounts.models import User
+from accounts.models import DeveloperProfile, User
+from acms.settings_utils import get_env_variable
+from core.cache import (DEVELOPER_PROFILES_TAG, PROJECTS_TAG,
+                        invalidate_tags_on_commit)
+from core.events import DEVELOPER_ROLLED_OFF, publish_events
+from utils.auth import TokenGenerator
 
 logger = logging.getLogger(__name__)
 
@@ -29,3 +38,66 @@ def validate_user_by_uid(uid):
             f"[RESET PASSWORD] Error while decoding uid.\n" f"Error: {text_type(e)}"
         )
         return None
+
+
+def get_invitation_email(user):
+    """Helper function to build the invitation email of an invited user
+
+    Args:
+        user (User): the invited user
+
+    Returns:
+        tuple: the subject, the message and the email address of the user
+    """
+    FRONTEND_DOMAIN_NAME = get_env_variable("FRONTEND_DOMAIN_NAME", "")
+    encoded_uid = urlsafe_base64_encode(force_bytes(user.id))
+    token_generator = TokenGenerator()
+    token = token_generator.make_token(user)
+
+    link = f"{FRONTEND_DOMAIN_NAME}/accept-invite/{token}/{encoded_uid}"
+    subject = "Invitation to Join ACMS"
+    expiry_time_hours = settings.TOKEN_EXPIRED_AFTER_SECONDS / 3600
+    data = {"link": link, "expiry_time": expiry_time_hours}
+    message = render_to_string("email_invitation.html", data)
+    return subject, message, user.email
+
+
+# frees every developer whose project ended and returns the project they left
+ROLL_OFF_SQL = """
+UPDATE {table} AS profile
+SET availability = true, current_project = '', current_project_start_date = NULL,
+    current_project_end_date = NULL, modify_date = %(now)s
+FROM (
+    SELECT id, current_project, current_project_end_date FROM {table}
+    WHERE availability = false AND current_project_end_date < %(today)s
+    FOR UPDATE
+) AS ended
+WHERE profile.id = ended.id
+RETURNING profile.id, profile.user_id, ended.current_project, ended.current_project_end_date
+"""
+
+
+def roll_off_developers(today=None) -> list:
+    """Helper function to make the developers whose project ended available
+    again, in a single UPDATE that uses the availability and end date index,
+    and publish a `DEVELOPER_ROLLED_OFF` event per developer
+
+    Args:
+        today (date, optional): the developers whose project ended before it
+        are rolled off. Defaults to today.
+
+    Returns:
+        list: the developer profile id, user id, project and end date of every roll-off
+    """
+    params = {"today": today or timezone.localdate(), "now": timezone.now()}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(ROLL_OFF_SQL.format(table=DeveloperProfile._meta.db_table), params)
+        roll_offs = [
+            {"developer_profile_id": pk, "user_id": user_id, "project": project, "end_date": end_date}
+            for pk, user_id, project, end_date in cursor.fetchall()
+        ]
+        if roll_offs:
+            publish_events(DEVELOPER_ROLLED_OFF, roll_offs)
+            # the bulk update doesn't send post_save so the cached profiles are dropped here
+            invalidate_tags_on_commit(DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
+    return roll_offs
@@ -1,31 +1,43 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from django.template.loader import render_to_string
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from accounts.models import DeveloperProfile, Education, User, WorkExperience
-from accounts.serializers import (AcceptInviteSerializer,
+from accounts.serializers import (DEVELOPER_PROFILE_PREFETCH, USER_PREFETCH,
+                                  AcceptInviteSerializer,
                                   DeveloperProfileSerializer,
                                   EducationSerializer, LoginSerializer,
                                   UserConfigSerializer, UserSerializer,
                                   WorkExperienceSerializer)
+from accounts.tasks import generate_profile_photo_variants
 from accounts.utils import validate_user_by_uid
-from acms.settings_utils import get_env_variable
+from core.cache import DEVELOPER_PROFILES_TAG, USERS_TAG, cache_response
+from core.events import USER_INVITED, publish_event
+from core.mixins import (AsyncViewMixin, ConditionalGetMixin,
+                         ConditionalRetrieveMixin, FlatListMixin,
+                         ReadReplicaMixin)
+from core.serializers import FlatSerializer
 from skills.models import SkillRating
 from skills.serializers import ListSkillRatingsSerializer
+from skills.similarity import find_similar_developers
+from skills.utils import sync_skill_experience
 from utils.auth import TokenGenerator
 from utils.decorators import required_fields
 from utils.exceptions import CustomAPIException
-from utils.general import upload_to_s3
+from utils.general import upload_file
 from utils.permissions import (IsAdmin, IsDeveloper, IsNotAuthenticated,
                                IsProjectManager)
-from utils.send_email import send_email
+
+# relations nested in the DeveloperProfileSerializer output
+DEVELOPER_PROFILE_DEPENDENCIES = ("user", "education", "work_experience", "skillrating")
 
 
 class LoginAPIView(TokenObtainPairView):
@@ -46,42 +58,32 @@ class SendInvitationView(generics.GenericAPIView):
     """APIView to enable an ADMIN user to send an invitation to
     other users to join the system
 
+    The invitation email is sent by the `USER_INVITED` event handler once
+    the user is committed, see `accounts.handlers`
+
     Returns:
         Response: a Response data object that contains a success message
-        if the invitation email is sent successfully and an error message
-        if it's not
+        and the invited user
     """
 
     permission_classes = [IsAuthenticated, IsAdmin]
     serializer_class = UserSerializer
 
     def post(self, request):
-        FAIL_STATUS = "Fail"
-        SUCCESS_MSG = "Email sent successfully"
-        FRONTEND_DOMAIN_NAME = get_env_variable("FRONTEND_DOMAIN_NAME", "")
-        FAIL_TO_SEND_MESSAGE = "Fail to send email!"
-        response_data = {"message": SUCCESS_MSG, "status": FAIL_STATUS, "data": None}
+        serializer = self.create_user(request.data)
+        return self.get_invitation_response(serializer)
 
-        serializer = UserSerializer(data=request.data)
+    @transaction.atomic
+    def create_user(self, data):
+        serializer = UserSerializer(data=data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
+        serializer.save()
+        publish_event(USER_INVITED, {"user_id": serializer.instance.pk})
+        return serializer
 
-        encoded_uid = urlsafe_base64_encode(force_bytes(user.id))
-        token_generator = TokenGenerator()
-        token = token_generator.make_token(user)
-
-        link = f"{FRONTEND_DOMAIN_NAME}/accept-invite/{token}/{encoded_uid}"
-        subject = "Invitation to Join ACMS"
-        expiry_time_hours = settings.TOKEN_EXPIRED_AFTER_SECONDS / 3600
-        data = {"link": link, "expiry_time": expiry_time_hours}
-        message = render_to_string("email_invitation.html", data)
-
-        send = send_email(subject, message, user.email)
-        if not send:
-            user.delete()
-            raise CustomAPIException(message=FAIL_TO_SEND_MESSAGE)
-        response_data["data"] = serializer.data
-        response_data["status"] = "success"
+    def get_invitation_response(self, serializer):
+        SUCCESS_MSG = "Email sent successfully"
+        response_data = {"message": SUCCESS_MSG, "status": "success", "data": serializer.data}
         return Response(response_data, status=status.HTTP_200_OK)
 
 
@@ -134,7 +136,7 @@ class AcceptInviteAPIView(generics.RetrieveUpdateAPIView):
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class UserConfigView(generics.RetrieveAPIView):
+class UserConfigView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
     serializer_class = UserConfigSerializer
     permission_classes = [IsAuthenticated]
 
@@ -157,25 +159,36 @@ class UpdateUserAPIView(generics.UpdateAPIView):
         return get_object_or_404(get_user_model(), email=self.request.user.email)
 
     def patch(self, request, *args, **kwargs):
-        user = self.get_object()
-
-        serializer = self.get_serializer(user, data=request.data, partial=True)
-
         profile_photo = request.FILES.get("profile_photo")
+        photo_path = self.upload_profile_photo(profile_photo) if profile_photo else None
+        return self.update_user(request.data, photo_path)
 
-        if profile_photo:
-            photo_url = upload_to_s3(profile_photo)
-            if not photo_url:
-                error_message = "There was an error uploading your photo!"
-                raise CustomAPIException(message=error_message)
-            serializer.initial_data["profile_photo"] = photo_url
+    def upload_profile_photo(self, profile_photo):
+        photo_path = upload_file(profile_photo, folder=settings.PROFILE_PHOTO_FOLDER)
+        if not photo_path:
+            error_message = "There was an error uploading your photo!"
+            raise CustomAPIException(message=error_message)
+        return photo_path
+
+    def update_user(self, data, photo_path=None):
+        user = self.get_object()
+        serializer = self.get_serializer(user, data=data, partial=True)
+        if photo_path:
+            serializer.initial_data["profile_photo"] = default_storage.url(photo_path)
 
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        if photo_path:
+            # the resized variants are generated off-request once they're ready
+            serializer.save(profile_photo_variants={})
+            transaction.on_commit(
+                lambda: generate_profile_photo_variants.delay(user.pk, photo_path)
+            )
+        else:
+            serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(ReadReplicaMixin, ConditionalGetMixin, generics.ListAPIView):
     """APIView to enable logged in users to view users based on their role
     """
     serializer_class = UserConfigSerializer
@@ -183,18 +196,21 @@ class UserListView(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return user.get_users_by_role()
+        return user.get_users_by_role().prefetch_related(*USER_PREFETCH)
 
+    @cache_response(tags=[USERS_TAG])
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         serializer = self.serializer_class(queryset, many=True)
         return Response(serializer.data)
 
 
-class DeveloperProfileListAPIView(generics.ListAPIView):
+class DeveloperProfileListAPIView(ReadReplicaMixin, ConditionalGetMixin, FlatListMixin, generics.ListAPIView):
     """APIView to list developer profiles based on availability
     """
     serializer_class = DeveloperProfileSerializer
+    flat_serializer = FlatSerializer(DeveloperProfileSerializer)
+    conditional_dependencies = DEVELOPER_PROFILE_DEPENDENCIES
     permission_classes = [IsAuthenticated & (IsAdmin | IsProjectManager)]
 
     def get_queryset(self):
@@ -204,17 +220,70 @@ class DeveloperProfileListAPIView(generics.ListAPIView):
             queryset = queryset.filter(availability=availability)
         return queryset
 
+    @cache_response(tags=[DEVELOPER_PROFILES_TAG])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
-class DeveloperProfileView(generics.RetrieveAPIView):
+class EndingDeveloperProfilesListView(ReadReplicaMixin, FlatListMixin, generics.ListAPIView):
+    """APIView to list the developers whose project ends within the `days`
+    query param, 14 by default, soonest first. Developers whose project
+    already ended are rolled off by the `roll_off_ended_projects` task
+    """
+    serializer_class = DeveloperProfileSerializer
+    flat_serializer = FlatSerializer(DeveloperProfileSerializer)
     permission_classes = [IsAuthenticated & (IsAdmin | IsProjectManager)]
+    ending_days = 14
+
+    def get_queryset(self):
+        days = self.request.query_params.get("days", self.ending_days)
+        if not str(days).isdigit():
+            raise CustomAPIException(message="days must be a positive number of days")
+        today = timezone.localdate()
+        return DeveloperProfile.objects.filter(
+            availability=False, current_project_end_date__range=(today, today + timezone.timedelta(days=int(days)))
+        ).order_by("current_project_end_date", "pk")
+
+
+class SimilarDevelopersListView(ReadReplicaMixin, generics.GenericAPIView):
+    """APIView to list the available developers whose skill ratings are the
+    most similar to a developer's, e.g. to replace them on a project. The
+    `limit` query param is the number of developers, 10 by default
+    """
     serializer_class = DeveloperProfileSerializer
+    flat_serializer = FlatSerializer(DeveloperProfileSerializer)
+    permission_classes = [IsAuthenticated & (IsAdmin | IsProjectManager)]
+    queryset = DeveloperProfile.objects.all()
+    lookup_field = "id"
+    similar_limit = 10
+    max_similar_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        developer_profile = self.get_object()
+        limit = request.query_params.get("limit", self.similar_limit)
+        if not str(limit).isdigit() or not 0 < int(limit) <= self.max_similar_limit:
+            raise CustomAPIException(message=f"limit must be a number between 1 and {self.max_similar_limit}")
+
+        similar = find_similar_developers(developer_profile.pk, int(limit))
+        profiles = self.flat_serializer.serialize_pks([profile_id for profile_id, _ in similar])
+        response_data = [
+            {"developer_profile": profile, "similarity": round(similarity, 4)}
+            for profile, (_, similarity) in zip(profiles, similar)
+        ]
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class DeveloperProfileView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
+    permission_classes = [IsAuthenticated & (IsAdmin | IsProjectManager)]
+    serializer_class = DeveloperProfileSerializer
+    conditional_dependencies = DEVELOPER_PROFILE_DEPENDENCIES + ("skillrating__skill", "skillrating__skill__category")
     queryset = DeveloperProfile.objects.all()
     lookup_field = "id"
 
     def retrieve(self, request, *args, **kwargs):
         developer_profile = self.get_object()
         serializer = self.get_serializer(developer_profile)
-        skill_ratings = SkillRating.objects.filter(developer_profile=developer_profile)
+        skill_ratings = SkillRating.objects.filter(developer_profile=developer_profile).select_related("skill__category")
         serialized_skill_ratings = ListSkillRatingsSerializer(skill_ratings, many=True)
         serializer.data["skill_ratings"] = serialized_skill_ratings
         response_data = {
@@ -234,34 +303,52 @@ class DeveloperProfileUpdateView(generics.UpdateAPIView):
     def get_object(self):
         return self.request.user.developer_profile.first()
 
+    def put(self, request, *args, **kwargs):
+        """The submitted `work_experience` and `education` lists are the
+        complete lists of the profile, the rows left out are deleted
+        """
+        return self.update_profile(request, replace=True)
+
     def patch(self, request, *args, **kwargs):
+        """The items of the submitted `work_experience` and `education`
+        lists are added to the profile or update its rows, see
+        `ProfileItemListSerializer`
+        """
+        return self.update_profile(request)
+
+    def update_profile(self, request, replace=False):
         developer_profile = self.get_object()
         data = request.data
-        work_experience_data = data.get("work_experience")
-        education_data = data.get("education")
-
-        if work_experience_data:
-            work_experience_serializer = WorkExperienceSerializer(data=work_experience_data, context={"request": request}, many=True, partial=True)
-            work_experience_serializer.is_valid(raise_exception=True)
-            work_experience_serializer.save(developer_profile=developer_profile)
-        if education_data:
-            education_serializer = EducationSerializer(data=education_data, context={"request": request}, many=True, partial=True)
-            education_serializer.is_valid(raise_exception=True)
-            education_serializer.save(developer_profile=developer_profile)
-
-        employment_status = data.get("employment_status")
-        job_information = data.get("job_information")
-
-        if employment_status or job_information:
-            developer_profile.employment_status = employment_status
-            developer_profile.job_information = job_information
-            developer_profile.save()
-        profile_serializer = self.get_serializer(developer_profile, partial=True)
-
+        context = {"request": request, "developer_profile": developer_profile, "replace": replace}
+        item_serializers = [
+            serializer_class(
+                getattr(developer_profile, field).all(), data=data[field], context=context, many=True
+            )
+            for field, serializer_class in (("work_experience", WorkExperienceSerializer), ("education", EducationSerializer))
+            if data.get(field) is not None
+        ]
+        for serializer in item_serializers:
+            serializer.is_valid(raise_exception=True)
+
+        profile_fields = [field for field in ("employment_status", "job_information") if data.get(field)]
+        with transaction.atomic():
+            for serializer in item_serializers:
+                serializer.save()
+            if data.get("work_experience") is not None:
+                sync_skill_experience([developer_profile.pk])
+            for field in profile_fields:
+                setattr(developer_profile, field, data[field])
+            # bulk queries don't send post_save, saving the profile drops its cached responses
+            developer_profile.save(update_fields=[*profile_fields, "modify_date"])
+
+        developer_profile = DeveloperProfile.objects.prefetch_related(*DEVELOPER_PROFILE_PREFETCH).get(
+            pk=developer_profile.pk
+        )
+        profile_serializer = self.get_serializer(developer_profile)
         return Response(profile_serializer.data, status=status.HTTP_200_OK)
 
 
-class WorkExperienceEducationMixin(generics.RetrieveUpdateDestroyAPIView):
+class WorkExperienceEducationMixin(ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated & IsDeveloper]
 
     def get_object(self):
@@ -280,6 +367,16 @@ class WorkExperienceDetailView(WorkExperienceEducationMixin):
         developer_profile = user.developer_profile.first()
         return WorkExperience.objects.filter(developer_profile=developer_profile)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        sync_skill_experience([serializer.instance.developer_profile_id])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        sync_skill_experience([instance.developer_profile_id])
+
 
 class EducationDetailView(WorkExperienceEducationMixin):
     """API View to enable a developer to retrieve, update or delete
@@ -293,11 +390,25 @@ class EducationDetailView(WorkExperienceEducationMixin):
         return Education.objects.filter(developer_profile=developer_profile)
 
 
-class DeveloperProfileAPIView(generics.RetrieveAPIView):
+class DeveloperProfileAPIView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
     """API View to enable a logged in developer to view their developer profile
     """
     serializer_class = DeveloperProfileSerializer
+    conditional_dependencies = DEVELOPER_PROFILE_DEPENDENCIES
     permission_classes = [IsAuthenticated & IsDeveloper]
 
     def get_object(self):
         return self.request.user.developer_profile.first()
+
+
+class AsyncUpdateUserAPIView(AsyncViewMixin, UpdateUserAPIView):
+    """`UpdateUserAPIView` of the ASGI deployment, the profile photo is
+    uploaded without holding the database thread
+    """
+
+    async def patch(self, request, *args, **kwargs):
+        profile_photo = request.FILES.get("profile_photo")
+        photo_path = None
+        if profile_photo:
+            photo_path = await sync_to_async(self.upload_profile_photo, thread_sensitive=False)(profile_photo)
+        return await sync_to_async(self.update_user)(request.data, photo_path)
@@ -12,5 +12,17 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "acms.settings")
+# serves the async views, see ASGI_MODE in the settings
+os.environ.setdefault("ASGI_MODE", "1")
 
 application = get_asgi_application()
+
+# every uvicorn worker imports this module
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+
+from core.warmup import warm_up_application, warm_up_database  # noqa: E402
+
+warm_up_application()
+# uvicorn imports it in its event loop, where the ORM refuses to run
+with ThreadPoolExecutor(max_workers=1) as executor:
+    executor.submit(warm_up_database).result()
@@ -0,0 +1,17 @@
+"""acms URL Configuration of the ASGI deployment
+
+The async versions of the views are routed before the URLs of `acms.urls`
+so that they answer on the same paths. They aren't named, `reverse()`
+still resolves the names of `acms.urls` to the same paths. Only the views
+that wait on I/O outside the database are worth an async version, see the
+`asgi` benchmark.
+"""
+from django.urls import path
+
+from accounts.views import AsyncUpdateUserAPIView
+from acms.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("accounts/update-user/", AsyncUpdateUserAPIView.as_view()),
+    *sync_urlpatterns,
+]
@@ -11,9 +11,11 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
 from django.conf import settings
 from django.core.management.utils import get_random_secret_key
 
@@ -33,6 +35,8 @@ SECRET_KEY = get_env_variable(
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = bool(int(get_env_variable("DEBUG", required=True)))
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 ALLOWED_HOSTS = get_env_variable("ALLOWED_HOSTS", required=True).split(" ")
 
 
@@ -57,9 +61,16 @@ INSTALLED_APPS = [
     "accounts",
     "skills",
     "projects",
+    "analytics",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
+    "core.profiling.ProfilerMiddleware",
+    "core.middleware.RequestTimingMiddleware",
+    "core.nplusone.NPlusOneMiddleware",
+    "core.audit.AuditMiddleware",
+    "core.replicas.ReplicaStickinessMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -74,6 +85,14 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "acms.urls"
 
+# Set by acms/asgi.py. The ASGI deployment serves the I/O bound endpoints
+# with async views and leaves out the middleware that only runs
+# synchronously, so static files are served by the WSGI deployment
+ASGI_MODE = bool(int(get_env_variable("ASGI_MODE", 0)))
+if ASGI_MODE:
+    ROOT_URLCONF = "acms.asgi_urls"
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -104,9 +123,54 @@ DATABASES = {
         "PASSWORD": get_env_variable("DB_PASSWORD", "some_password"),
         "HOST": get_env_variable("DB_HOST", "localhost"),
         "PORT": get_env_variable("DB_PORT", 5432),
+        # used by the core.db.postgresql engine, see core/db/postgresql/base.py
+        "POOL": {
+            "MAX_SIZE": int(get_env_variable("DB_POOL_MAX_SIZE", 10)),
+            "MAX_LIFETIME": int(get_env_variable("DB_POOL_MAX_LIFETIME", 1800)),
+            "HEALTH_CHECK_INTERVAL": int(get_env_variable("DB_POOL_HEALTH_CHECK_INTERVAL", 30)),
+            "TIMEOUT": int(get_env_variable("DB_POOL_TIMEOUT", 10)),
+        },
     }
 }
 
+# Read replica
+# list, search and report queries run in `core.replicas.read_replica` blocks
+# are sent to the replica when REPLICA_DB_NAME is set. The tests mirror it to
+# the default database and only read from it when REPLICA_DATABASE is overridden
+if get_env_variable("REPLICA_DB_NAME") or TESTING:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": get_env_variable("REPLICA_DB_NAME", DATABASES["default"]["NAME"]),
+        "HOST": get_env_variable("REPLICA_DB_HOST", DATABASES["default"]["HOST"]),
+        "PORT": get_env_variable("REPLICA_DB_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
+REPLICA_DATABASE = "replica" if "replica" in DATABASES and not TESTING else None
+# seconds of replication lag after which reads go back to the primary
+REPLICA_MAX_LAG = float(get_env_variable("REPLICA_MAX_LAG", 5))
+# seconds between two checks of the replica's lag by a process
+REPLICA_CHECK_INTERVAL = float(get_env_variable("REPLICA_CHECK_INTERVAL", 5))
+# seconds a user reads from the primary after a write
+REPLICA_STICKY_SECONDS = int(get_env_variable("REPLICA_STICKY_SECONDS", 10))
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# the cache is shared by every worker through redis, so that they all see the
+# same cached responses, tag versions, primary pins and hit/miss counters. A
+# per-process LocMemCache is only correct with a single process, the tests
+# use one
+if TESTING:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "acms"}}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": get_env_variable("CACHE_BACKEND", "django.core.cache.backends.redis.RedisCache"),
+            "LOCATION": get_env_variable("CACHE_LOCATION", "redis://redis:6379/0"),
+        }
+    }
+RESPONSE_CACHE_TIMEOUT = int(get_env_variable("RESPONSE_CACHE_TIMEOUT", 300))
+
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 25,
@@ -114,7 +178,7 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
-    "DEFAULT_RENDERER_CLASSES": ("core.renderers.CustomJSONRenderer",),
+    "DEFAULT_RENDERER_CLASSES": ("core.renderers.FastJSONRenderer",),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
@@ -195,6 +259,73 @@ EMAIL_PORT = get_env_variable("EMAIL_PORT", 587)
 EMAIL_USE_TLS = get_env_variable("EMAIL_USE_TLS", True)
 EMAIL_HOST_USER = get_env_variable("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = get_env_variable("EMAIL_HOST_PASSWORD", "")
+# seconds before a blocked connection to the SMTP server fails, the outbox
+# handlers that send emails must finish within OUTBOX_LEASE_SECONDS
+EMAIL_TIMEOUT = int(get_env_variable("EMAIL_TIMEOUT", 30))
+
+# Celery settings
+CELERY_BROKER_URL = get_env_variable("CELERY_BROKER_URL", "amqp://rabbitmq")
+CELERY_RESULT_BACKEND = "django-db"
+CELERY_TASK_ALWAYS_EAGER = bool(int(get_env_variable("CELERY_TASK_ALWAYS_EAGER", 0)))
+CELERY_BEAT_SCHEDULE = {
+    "roll-off-ended-projects": {
+        "task": "accounts.tasks.roll_off_ended_projects",
+        "schedule": crontab(minute=5, hour="*"),
+    },
+    "dispatch-outbox-events": {
+        "task": "core.tasks.dispatch_outbox_events",
+        "schedule": timedelta(seconds=int(get_env_variable("OUTBOX_POLL_INTERVAL", 30))),
+    },
+    "purge-outbox-events": {
+        "task": "core.tasks.purge_outbox_events",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    "create-audit-partitions": {
+        "task": "core.tasks.create_audit_partitions",
+        "schedule": crontab(minute=45, hour=3),
+    },
+    "build-staffing-index": {
+        "task": "projects.tasks.build_staffing_index",
+        "schedule": crontab(minute=15, hour=4),
+    },
+}
+
+# Domain events are written to the outbox with the change they record and
+# dispatched by a Celery task, queued after the commit and on the beat
+# schedule. A failed event is retried after OUTBOX_RETRY_DELAY seconds,
+# doubled after every attempt, until it failed OUTBOX_MAX_ATTEMPTS times. A
+# claimed event that isn't recorded within OUTBOX_LEASE_SECONDS, e.g. because
+# its worker died, is claimed again
+OUTBOX_DISPATCH_ON_COMMIT = not TESTING and bool(int(get_env_variable("OUTBOX_DISPATCH_ON_COMMIT", 1)))
+OUTBOX_BATCH_SIZE = int(get_env_variable("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(get_env_variable("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_RETRY_DELAY = int(get_env_variable("OUTBOX_RETRY_DELAY", 30))
+OUTBOX_MAX_RETRY_DELAY = int(get_env_variable("OUTBOX_MAX_RETRY_DELAY", 3600))
+OUTBOX_RETENTION_DAYS = int(get_env_variable("OUTBOX_RETENTION_DAYS", 7))
+OUTBOX_LEASE_SECONDS = int(get_env_variable("OUTBOX_LEASE_SECONDS", 300))
+
+# The audit log is partitioned by month, the partitions of this month and of
+# the next AUDIT_PARTITION_MONTHS_AHEAD months are created every day
+AUDIT_PARTITION_MONTHS_AHEAD = int(get_env_variable("AUDIT_PARTITION_MONTHS_AHEAD", 2))
+
+# Every worker keeps the skill rating vectors of the developers in memory to
+# find similar developers. The ratings changed since the last refresh, going
+# back SIMILARITY_REFRESH_LAG seconds, are reloaded at most every
+# SIMILARITY_REFRESH_INTERVAL seconds. They're read from the replica, so keep
+# the lag above REPLICA_MAX_LAG
+SIMILARITY_REFRESH_INTERVAL = float(get_env_variable("SIMILARITY_REFRESH_INTERVAL", 5))
+SIMILARITY_REFRESH_LAG = int(get_env_variable("SIMILARITY_REFRESH_LAG", 60))
+
+# Staffing recommendations rank the past projects by the Jaccard similarity of
+# their required skills. The index of the projects is built offline into
+# STAFFING_INDEX_PATH by the build_staffing_index command and nightly task,
+# loaded by every worker and refreshed like the similarity index, from the
+# replica as well. The members
+# of the STAFFING_SIMILAR_PROJECTS most similar projects are recommended
+STAFFING_INDEX_PATH = get_env_variable("STAFFING_INDEX_PATH") or str(BASE_DIR / "indexes" / "staffing.npz")
+STAFFING_REFRESH_INTERVAL = float(get_env_variable("STAFFING_REFRESH_INTERVAL", 5))
+STAFFING_REFRESH_LAG = int(get_env_variable("STAFFING_REFRESH_LAG", 60))
+STAFFING_SIMILAR_PROJECTS = int(get_env_variable("STAFFING_SIMILAR_PROJECTS", 20))
 
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOW_METHODS = ["DELETE", "GET", "OPTIONS", "PATCH", "POST", "PUT"]
@@ -222,7 +353,65 @@ AWS_S3_CUSTOM_DOMAIN = f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com"
 AWS_QUERYSTRING_AUTH = False
 
 
-DEFAULT_FILE_STORAGE = "core.backends.MediaStorage"
+DEFAULT_FILE_STORAGE = get_env_variable("DEFAULT_FILE_STORAGE", "core.backends.MediaStorage")
+MEDIA_ROOT = get_env_variable("MEDIA_ROOT", BASE_DIR / "media")
+MEDIA_URL = "/media/"
+
+# Spool every upload to a temporary file so that large photos are streamed
+# to the storage backend instead of being held in memory
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+
+# Profile photos are resized into these variants (name: longest edge in px)
+# by a background worker after the original has been uploaded
+PROFILE_PHOTO_FOLDER = "profile-photos"
+PROFILE_PHOTO_VARIANTS = {"small": 64, "medium": 256, "large": 512}
+PROFILE_PHOTO_QUALITY = int(get_env_variable("PROFILE_PHOTO_QUALITY", 80))
+
+# Fraction of the requests whose SQL, serializer and renderer time is
+# measured, logged and returned in a Server-Timing header
+REQUEST_TIMING_SAMPLE_RATE = float(get_env_variable("REQUEST_TIMING_SAMPLE_RATE", 0.1))
+REQUEST_TIMING_HEADER = bool(int(get_env_variable("REQUEST_TIMING_HEADER", 1)))
+
+# Number of seconds a profile token issued to an admin profiles requests
+PROFILER_TOKEN_MAX_AGE = int(get_env_variable("PROFILER_TOKEN_MAX_AGE", 600))
+
+# Requests that run a query shape at least NPLUSONE_THRESHOLD times fail in
+# the tests and are logged in development. The allowlist holds regular
+# expressions matched against the SQL and the frames of the call site
+NPLUSONE_MODE = "raise" if TESTING else get_env_variable("NPLUSONE_MODE", "log" if DEBUG else "off")
+NPLUSONE_THRESHOLD = int(get_env_variable("NPLUSONE_THRESHOLD", 3))
+NPLUSONE_ALLOWLIST = [
+    # every skill of a batch is validated against its category on its own
+    r"skills/serializers\.py:\d+ in validate$",
+]
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "requests": {"class": "logging.StreamHandler", "formatter": "message"},
+    },
+    "loggers": {
+        "acms.requests": {
+            "handlers": ["requests"],
+            "level": get_env_variable("REQUEST_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "acms.nplusone": {
+            "handlers": ["requests"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+        "acms.startup": {
+            "handlers": ["requests"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
 
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -237,7 +426,13 @@ SWAGGER_SETTINGS = {
         'Bearer': [],
     }],
     "SUPPORTED_SCHEMES": ["http", "https"],
+    "SPEC_URL": "core:schema",
 }
+# the OpenAPI schema is built once per code version into this directory, by
+# the build_schema command or on the first request. CODE_VERSION is e.g. the
+# deployed commit, a hash of the source files is used when it's empty
+OPENAPI_SCHEMA_DIR = get_env_variable("OPENAPI_SCHEMA_DIR", str(BASE_DIR / "openapi"))
+CODE_VERSION = get_env_variable("CODE_VERSION", "")
 SECURE_PROXY_SSL_HEADER = (
     "HTTP_X_FORWARDED_PROTO",
     "https",
@@ -16,38 +16,29 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 from django.views import generic
-from drf_yasg import openapi
+from drf_yasg.renderers import SwaggerUIRenderer
 from drf_yasg.views import get_schema_view
 from rest_framework.permissions import AllowAny
 
-from acms.settings_utils import get_env_variable
+from core.schema import API_INFO, API_URL
 
 admin.site.site_header = "AmaliTech"
 admin.site.site_title = "AmaliTech CMS Admin Portal"
 admin.site.index_title = "Welcome to AmaliTech CMS Portal"
 
 schema_view = get_schema_view(
-    openapi.Info(
-        title="ACMS API Documentation",
-        default_version="v1",
-        description=(
-            "This is a collection of all available APIs for "
-            "the AmaliTech Capacity Management System"
-        ),
-        terms_of_service="http://localhost/",
-        contact=openapi.Contact(email="cms@amalitech.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    url=get_env_variable("DEFAULT_URL", "https://acms-api.amalitech-dev.net/"),
+    API_INFO,
+    url=API_URL,
     public=True,
     permission_classes=[AllowAny],
 )
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    # only the page, the schema it loads is prebuilt and served by core:schema
     path(
         "docs/",
-        schema_view.with_ui("swagger", cache_timeout=0),
+        schema_view.as_cached_view(renderer_classes=[SwaggerUIRenderer]),
         name="schema-swagger-ui",
     ),
     path("", generic.RedirectView.as_view(url="/docs/", permanent=False)),
@@ -62,5 +53,13 @@ urlpatterns = [
     path(
         "projects/",
         include(("projects.urls", "projects"), namespace="projects"),
-    )
+    ),
+    path(
+        "analytics/",
+        include(("analytics.urls", "analytics"), namespace="analytics"),
+    ),
+    path(
+        "core/",
+        include(("core.urls", "core"), namespace="core"),
+    ),
 ]
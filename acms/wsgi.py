@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "acms.settings")
 
 application = get_wsgi_application()
+
+# the database is warmed up by each gunicorn worker, see gunicorn.conf.py
+from core.warmup import warm_up_application  # noqa: E402
+
+warm_up_application()
@@ -0,0 +1,38 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+
+class DateRangeSerializer(serializers.Serializer):
+    """Serializer of the `start_date` and `end_date` query params of the
+    analytics, both default to today
+    """
+
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, data):
+        today = timezone.localdate()
+        data.setdefault("start_date", today)
+        data.setdefault("end_date", data["start_date"] if data["start_date"] > today else today)
+        if data["start_date"] > data["end_date"]:
+            raise serializers.ValidationError("start_date must be before end_date")
+        return data
+
+
+class SkillGapSerializer(DateRangeSerializer):
+    """Serializer of the query params of the skill gap analysis: the window
+    of project start dates, the next `WINDOW_DAYS` days by default, and the
+    minimum rating of a developer to count as a supply of a skill
+    """
+
+    WINDOW_DAYS = 90
+    MIN_RATING = 3
+
+    min_rating = serializers.DecimalField(
+        max_digits=3, decimal_places=1, min_value=0, max_value=5, required=False, default=MIN_RATING
+    )
+
+    def validate(self, data):
+        data.setdefault("start_date", timezone.localdate())
+        data.setdefault("end_date", data["start_date"] + timezone.timedelta(days=self.WINDOW_DAYS))
+        return super().validate(data)
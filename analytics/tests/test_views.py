@@ -0,0 +1,173 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import DeveloperProfile, User
+from accounts.tests.factories import UserFactory
+from projects.tests.factories import ProjectFactory
+from skills.tests.factories import (CategoryFactory, SkillFactory,
+                                    SkillRatingFactory)
+
+
+class CapacityAnalyticsTestCase(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.url = reverse("analytics:capacity")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.user.tokens.get('access')}")
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = UserFactory.create()
+        cls.today = timezone.now().date()
+        cls.developers = []
+        for index, (employment_status, job_information) in enumerate([
+            (DeveloperProfile.EMPLOYEE, DeveloperProfile.EXPERT),
+            (DeveloperProfile.EMPLOYEE, DeveloperProfile.ASSOCIATE),
+            (DeveloperProfile.INTERN, DeveloperProfile.ASSOCIATE),
+        ]):
+            # the profile of a developer is created with the user
+            user = UserFactory.create(email=f"developer{index}@amalitech.org", role=User.DEVELOPER)
+            developer = user.developer_profile.get()
+            developer.employment_status = employment_status
+            developer.job_information = job_information
+            developer.save()
+            cls.developers.append(developer)
+        cls.category = CategoryFactory.create(name="Backend")
+        cls.skill = SkillFactory.create(name="Django", category=cls.category)
+        ProjectFactory.create(start_date=cls.today, members=cls.developers[:2], required_skills=[cls.skill])
+        ProjectFactory.create(
+            start_date=cls.today - timezone.timedelta(days=90),
+            end_date=cls.today - timezone.timedelta(days=60),
+            members=cls.developers[2:],
+            required_skills=[cls.skill],
+        )
+        SkillRatingFactory.create(skill=cls.skill, developer_profile=cls.developers[0], rating=4)
+        SkillRatingFactory.create(skill=cls.skill, developer_profile=cls.developers[1], rating=3)
+
+    def test_capacity_analytics(self):
+        """Test that the bench, the utilization, the headcount per skill
+        category and the average rating per skill are computed
+        """
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["headcount"], 3)
+        self.assertEqual(response.data["utilized"], 2)
+        self.assertEqual(response.data["bench"], 1)
+        self.assertEqual(response.data["utilization"], 0.6667)
+        self.assertEqual(
+            response.data["by_employment_status"][0],
+            {"employment_status": DeveloperProfile.EMPLOYEE, "headcount": 2, "utilized": 2, "bench": 0, "utilization": 1.0},
+        )
+        self.assertEqual(response.data["by_job_information"][0]["headcount"], 2)
+        self.assertEqual(response.data["by_job_information"][0]["utilized"], 1)
+        category = next(row for row in response.data["skill_categories"] if row["slug"] == self.category.slug)
+        self.assertEqual(category["headcount"], 2)
+        rating = next(row for row in response.data["skill_ratings"] if row["slug"] == self.skill.slug)
+        self.assertEqual(rating["average_rating"], 3.5)
+        self.assertEqual(rating["ratings"], 2)
+
+    def test_capacity_analytics_date_range(self):
+        """Test that developers are utilized by the projects that overlap the
+        date range
+        """
+        start_date = self.today - timezone.timedelta(days=70)
+        response = self.client.get(self.url, {"start_date": start_date, "end_date": self.today})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["start_date"], start_date.isoformat())
+        self.assertEqual(response.data["utilized"], 3)
+
+        response = self.client.get(self.url, {"start_date": self.today, "end_date": start_date})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_capacity_analytics_cache(self):
+        """Test that the analytics are cached until a developer profile
+        changes
+        """
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        self.developers[2].job_information = DeveloperProfile.EXPERT
+        self.developers[2].save()
+        response = self.client.get(self.url)
+        expert = next(
+            row for row in response.data["by_job_information"] if row["job_information"] == DeveloperProfile.EXPERT
+        )
+        self.assertEqual(expert["headcount"], 2)
+
+    def test_capacity_analytics_developer(self):
+        """Test that a developer can't get the analytics"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.developers[0].user.tokens.get('access')}")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class SkillGapAnalysisTestCase(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.url = reverse("analytics:skill-gaps")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.user.tokens.get('access')}")
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = UserFactory.create()
+        cls.today = timezone.now().date()
+        category = CategoryFactory.create(name="Backend", slug="backend")
+        cls.django, cls.react, cls.go = [
+            SkillFactory.create(name=name, slug=name.lower(), category=category) for name in ("Django", "React", "Go")
+        ]
+        for index in range(3):
+            ProjectFactory.create(
+                start_date=cls.today + timezone.timedelta(days=10 * index), required_skills=[cls.django, cls.go]
+            )
+        ProjectFactory.create(start_date=cls.today, required_skills=[cls.react])
+        # starts after the default window
+        ProjectFactory.create(start_date=cls.today + timezone.timedelta(days=200), required_skills=[cls.react])
+
+        developers = [
+            UserFactory.create(email=f"developer{index}@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+            for index in range(3)
+        ]
+        SkillRatingFactory.create(skill=cls.django, developer_profile=developers[0], rating=4)
+        SkillRatingFactory.create(skill=cls.django, developer_profile=developers[1], rating=2)
+        SkillRatingFactory.create(skill=cls.react, developer_profile=developers[1], rating=5)
+        SkillRatingFactory.create(skill=cls.react, developer_profile=developers[2], rating=3)
+        developers[2].availability = False
+        developers[2].save()
+
+    def test_skill_gaps(self):
+        """Test that the demanded skills are ranked by their shortage of
+        available developers rated above the threshold
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["projects"], 4)
+        self.assertEqual(response.data["available_developers"], 2)
+        self.assertEqual(
+            [(skill["slug"], skill["demand"], skill["supply"], skill["shortage"]) for skill in response.data["skills"]],
+            [(self.go.slug, 3, 0, 3), (self.django.slug, 3, 1, 2), (self.react.slug, 1, 1, 0)],
+        )
+
+    def test_skill_gaps_params(self):
+        """Test that the window and the minimum rating can be chosen"""
+        response = self.client.get(self.url, {
+            "start_date": self.today + timezone.timedelta(days=15),
+            "end_date": self.today + timezone.timedelta(days=365),
+            "min_rating": 2,
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(skill["slug"], skill["demand"], skill["supply"]) for skill in response.data["skills"]],
+            [(self.go.slug, 1, 0), (self.react.slug, 1, 1), (self.django.slug, 1, 2)],
+        )
+
+        response = self.client.get(self.url, {"min_rating": 6})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
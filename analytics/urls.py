@@ -0,0 +1,8 @@
+from django.urls import path
+
+from analytics.views import CapacityAnalyticsView, SkillGapAnalysisView
+
+urlpatterns = [
+    path("capacity/", CapacityAnalyticsView.as_view(), name="capacity"),
+    path("skill-gaps/", SkillGapAnalysisView.as_view(), name="skill-gaps"),
+]
@@ -0,0 +1,205 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Exists, OuterRef, Q
+
+from accounts.models import DeveloperProfile
+from core.cache import (DEVELOPER_PROFILES_TAG, PROJECTS_TAG, SKILLS_TAG,
+                        get_tag_versions)
+from core.replicas import read_replica
+from projects.models import Project
+from skills.models import Skill, SkillRating
+
+ANALYTICS_KEY = "analytics:{}:{}:{}"
+ANALYTICS_TAGS = [DEVELOPER_PROFILES_TAG, PROJECTS_TAG, SKILLS_TAG]
+
+
+def get_utilization(rows, dimension) -> list:
+    """Helper function to sum the (job information, employment status) groups
+    of the developers by one of the two dimensions
+    """
+    totals = {}
+    for row in rows:
+        total = totals.setdefault(row[dimension], {dimension: row[dimension], "headcount": 0, "utilized": 0})
+        total["headcount"] += row["headcount"]
+        total["utilized"] += row["utilized"]
+    for total in totals.values():
+        total["bench"] = total["headcount"] - total["utilized"]
+        total["utilization"] = round(total["utilized"] / total["headcount"], 4) if total["headcount"] else 0.0
+    return sorted(totals.values(), key=lambda total: total[dimension])
+
+
+def compute_capacity_analytics(start_date, end_date) -> dict:
+    """Helper function to compute the capacity of the active developers in
+    three grouped queries. A developer is utilized when they're a member of
+    a project that overlaps the date range, and on the bench otherwise
+
+    Args:
+        start_date (date): first day of the range
+        end_date (date): last day of the range
+
+    Returns:
+        dict: the headcount, bench and utilization overall, by job
+        information and by employment status, the headcount of every skill
+        category and the average rating of every skill
+    """
+    on_project = Project.members.through.objects.filter(
+        developerprofile_id=OuterRef("pk"), project__start_date__lte=end_date, project__end_date__gte=start_date
+    )
+    rows = list(
+        DeveloperProfile.objects.filter(user__is_active=True)
+        .annotate(on_project=Exists(on_project))
+        .values("job_information", "employment_status")
+        .annotate(headcount=Count("pk"), utilized=Count("pk", filter=Q(on_project=True)))
+        .order_by()
+    )
+    headcount = sum(row["headcount"] for row in rows)
+    utilized = sum(row["utilized"] for row in rows)
+
+    categories = (
+        SkillRating.objects.filter(developer_profile__user__is_active=True)
+        .values("skill__category__slug", "skill__category__name")
+        .annotate(headcount=Count("developer_profile", distinct=True))
+        .order_by("skill__category__name")
+    )
+    ratings = (
+        SkillRating.objects.values("skill__slug", "skill__name", "skill__category__slug")
+        .annotate(average_rating=Avg("rating"), ratings=Count("pk"))
+        .order_by("skill__name")
+    )
+
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "headcount": headcount,
+        "utilized": utilized,
+        "bench": headcount - utilized,
+        "utilization": round(utilized / headcount, 4) if headcount else 0.0,
+        "by_job_information": get_utilization(rows, "job_information"),
+        "by_employment_status": get_utilization(rows, "employment_status"),
+        "skill_categories": [
+            {"slug": row["skill__category__slug"], "name": row["skill__category__name"], "headcount": row["headcount"]}
+            for row in categories
+        ],
+        "skill_ratings": [
+            {
+                "slug": row["skill__slug"],
+                "name": row["skill__name"],
+                "category": row["skill__category__slug"],
+                "average_rating": round(float(row["average_rating"]), 2),
+                "ratings": row["ratings"],
+            }
+            for row in ratings
+        ],
+    }
+
+
+def get_incidence(rows, skills):
+    """Helper function to turn (row, skill) pairs, e.g. the required skills
+    of projects, into the coordinates of the row x skill incidence matrix.
+    Duplicate pairs are dropped
+
+    Args:
+        rows (list): (row label, skill slug) tuples
+        skills (np.ndarray): the sorted slugs of the skills, the columns
+
+    Returns:
+        tuple: the row index and the skill index of every pair, and the number of rows
+    """
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0
+    labels, slugs = zip(*rows)
+    _, row_indexes = np.unique(np.array(labels), return_inverse=True)
+    skill_indexes = np.searchsorted(skills, np.array(slugs))
+    cells = np.unique(row_indexes * len(skills) + skill_indexes)
+    return cells // len(skills), cells % len(skills), int(row_indexes.max()) + 1
+
+
+def compute_skill_gaps(start_date, end_date, min_rating) -> dict:
+    """Helper function to compare the demand and the supply of every skill.
+    The demand of a skill is the number of projects starting in the window
+    that require it and its supply the number of available developers rated
+    at least `min_rating` in it, i.e. the column sums of the project x skill
+    and developer x skill incidence matrices
+
+    Args:
+        start_date (date): first start date of the projects
+        end_date (date): last start date of the projects
+        min_rating (Decimal): minimum rating of a developer in a skill
+
+    Returns:
+        dict: the number of projects and developers, and the demanded skills
+        ranked by shortage, i.e. demand minus supply
+    """
+    skills = sorted(Skill.objects.values_list("slug", "name", "category_id"))
+    slugs = np.array([slug for slug, name, category in skills])
+    demand_rows = list(
+        Project.required_skills.through.objects.filter(project__start_date__range=(start_date, end_date))
+        .values_list("project_id", "skill_id")
+    )
+    supply_rows = list(
+        SkillRating.objects.filter(
+            rating__gte=min_rating, developer_profile__availability=True, developer_profile__user__is_active=True
+        ).values_list("developer_profile_id", "skill_id")
+    )
+
+    _, demand_skills, projects = get_incidence(demand_rows, slugs)
+    _, supply_skills, developers = get_incidence(supply_rows, slugs)
+    demand = np.bincount(demand_skills, minlength=len(slugs))
+    supply = np.bincount(supply_skills, minlength=len(slugs))
+    shortage = demand - supply
+    # by shortage then demand, the slugs break ties
+    ranking = np.lexsort((-demand, -shortage))
+
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "min_rating": float(min_rating),
+        "projects": projects,
+        "available_developers": developers,
+        "skills": [
+            {
+                "slug": skills[index][0],
+                "name": skills[index][1],
+                "category": skills[index][2],
+                "demand": int(demand[index]),
+                "supply": int(supply[index]),
+                "shortage": int(shortage[index]),
+            }
+            for index in ranking
+            if demand[index]
+        ],
+    }
+
+
+def get_analytics(name, compute, user=None, **params) -> dict:
+    """Helper function to get analytics computed with the given params,
+    cached until a developer profile, a project or a skill changes, for at
+    most `RESPONSE_CACHE_TIMEOUT` seconds since every range has its key.
+    They're computed on the read replica, see `core.replicas.read_replica`
+
+    Args:
+        name (str): name of the analytics in the cache key
+        compute (callable): computes the analytics from the params
+        user (User, optional): the user the analytics are computed for. Defaults to None.
+    """
+    versions = "-".join(str(version) for version in get_tag_versions(ANALYTICS_TAGS))
+    key = ANALYTICS_KEY.format(name, ":".join(str(value) for value in params.values()), versions)
+    analytics = cache.get(key)
+    if analytics is None:
+        with read_replica(user):
+            analytics = compute(**params)
+        cache.set(key, analytics, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+    return analytics
+
+
+def get_capacity_analytics(start_date, end_date, user=None) -> dict:
+    """See `compute_capacity_analytics` and `get_analytics`"""
+    return get_analytics("capacity", compute_capacity_analytics, user, start_date=start_date, end_date=end_date)
+
+
+def get_skill_gaps(start_date, end_date, min_rating, user=None) -> dict:
+    """See `compute_skill_gaps` and `get_analytics`"""
+    return get_analytics(
+        "skill_gaps", compute_skill_gaps, user, start_date=start_date, end_date=end_date, min_rating=min_rating
+    )
@@ -0,0 +1,38 @@
+from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from analytics.serializers import DateRangeSerializer, SkillGapSerializer
+from analytics.utils import get_capacity_analytics, get_skill_gaps
+from core.mixins import ReadReplicaMixin
+from utils.permissions import IsAdmin, IsProjectManager
+
+
+class CapacityAnalyticsView(ReadReplicaMixin, GenericAPIView):
+    """APIView to get the bench size, the utilization by job information and
+    employment status, the headcount per skill category and the average
+    rating of every skill, over the `start_date` and `end_date` query params
+    """
+
+    permission_classes = [IsAuthenticated & (IsAdmin | IsProjectManager)]
+    serializer_class = DateRangeSerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(get_capacity_analytics(**serializer.validated_data, user=request.user))
+
+
+class SkillGapAnalysisView(ReadReplicaMixin, GenericAPIView):
+    """APIView to rank the skills required by the projects starting between
+    the `start_date` and `end_date` query params by their shortage of
+    available developers rated at least `min_rating`
+    """
+
+    permission_classes = [IsAuthenticated & (IsAdmin | IsProjectManager)]
+    serializer_class = SkillGapSerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(get_skill_gaps(**serializer.validated_data, user=request.user))
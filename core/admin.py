@@ -0,0 +1,105 @@
+import json
+
+from django.contrib import admin
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import format_html
+
+from core.models import AuditLog, OutboxEvent, RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ("create_date", "method", "path", "status_code", "duration_ms", "query_count", "sql_ms", "user")
+    list_filter = ("method", "status_code")
+    search_fields = ("path",)
+    exclude = ("stats", "sql_log")
+    readonly_fields = (
+        "user", "method", "path", "status_code", "duration_ms", "query_count", "sql_ms", "downloads", "summary",
+        "create_date",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="downloads")
+    def downloads(self, obj):
+        return format_html(
+            '<a href="{}">profile</a> | <a href="{}">SQL log</a>',
+            reverse("admin:core_requestprofile_download", args=[obj.pk, "profile"]),
+            reverse("admin:core_requestprofile_download", args=[obj.pk, "sql"]),
+        )
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/<str:kind>/",
+                self.admin_site.admin_view(self.download_view),
+                name="core_requestprofile_download",
+            ),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, pk, kind):
+        """Admin view to download the cProfile stats of a profile, readable
+        with `pstats` or snakeviz, or its SQL log as JSON
+        """
+        if not self.has_view_permission(request):
+            raise Http404
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if kind == "profile":
+            response = HttpResponse(bytes(profile.stats), content_type="application/octet-stream")
+            filename = f"request-{profile.pk}.prof"
+        elif kind == "sql":
+            response = HttpResponse(json.dumps(profile.sql_log, indent=2), content_type="application/json")
+            filename = f"request-{profile.pk}-sql.json"
+        else:
+            raise Http404
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("create_date", "event_type", "status", "attempts", "available_at", "dispatched_at")
+    list_filter = ("status", "event_type")
+    readonly_fields = (
+        "event_type", "payload", "status", "attempts", "available_at", "dispatched_at", "last_error", "create_date",
+    )
+    actions = ["retry_events"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="Retry the selected events now")
+    def retry_events(self, request, queryset):
+        count = queryset.filter(status=OutboxEvent.FAILED).update(
+            status=OutboxEvent.PENDING, attempts=0, available_at=timezone.now(), modify_date=timezone.now()
+        )
+        self.message_user(request, f"{count} events will be dispatched again")
+
+
+@admin.register(AuditLog)
+class AuditLogAdmin(admin.ModelAdmin):
+    list_display = ("create_date", "action", "entity_type", "entity_id", "actor_id")
+    list_filter = ("action", "entity_type")
+    search_fields = ("=entity_id",)
+    readonly_fields = ("actor_id", "action", "entity_type", "entity_id", "changes", "create_date")
+    exclude = ("actor",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
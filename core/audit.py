@@ -0,0 +1,166 @@
+"""Append-only audit log of who assigned whom, rating changes and role
+changes.
+
+`record_change` doesn't write anything itself: a change is buffered once
+its transaction commits, so a rolled back change is never recorded, and
+`AuditMiddleware` writes the buffer of a request in one bulk insert after
+the response was built. Outside of a request, e.g. in a task, use
+`audit_context`, and a change recorded without a buffer is written on
+commit on its own.
+
+The table is partitioned by month, see the migration, and the partitions
+of the next months are created by the `create_audit_partitions` task.
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from core.metrics import AUDIT_RECORDS
+from core.middleware import AsyncCapableMiddleware
+from core.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+DEVELOPER_ASSIGNED = "developer_assigned"
+SKILL_RATING_CREATED = "skill_rating_created"
+SKILL_RATING_CHANGED = "skill_rating_changed"
+SKILL_RATING_DELETED = "skill_rating_deleted"
+ROLE_CHANGED = "role_changed"
+
+# the changes committed by the current request or `audit_context`
+_buffer = ContextVar("audit_buffer", default=None)
+_request = ContextVar("audit_request", default=None)
+
+CREATE_PARTITION_SQL = (
+    "CREATE TABLE IF NOT EXISTS core_auditlog_{start:%Y_%m} PARTITION OF core_auditlog "
+    "FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+)
+
+
+def get_current_actor():
+    """Helper function to get the authenticated user of the current request,
+    DRF sets it on the request when it authenticates
+    """
+    request = _request.get()
+    user = getattr(request, "user", None)
+    return user if user is not None and user.is_authenticated else None
+
+
+def record_change(action, instance, changes=None, actor=None):
+    """Helper function to record a change of a model instance in the audit
+    log once its transaction commits
+
+    Args:
+        action (str): what was done, e.g. `ROLE_CHANGED`
+        instance (Model): the changed instance
+        changes (dict, optional): JSON serializable details, e.g. the old and new values
+        actor (User, optional): who made the change. Defaults to the user of the current request.
+    """
+    actor = actor or get_current_actor()
+    record = AuditLog(
+        actor_id=actor.pk if actor is not None else None,
+        action=action,
+        entity_type=instance._meta.label_lower,
+        entity_id=str(instance.pk),
+        changes=changes or {},
+        create_date=timezone.now(),
+    )
+    buffer = _buffer.get()
+    if buffer is None:
+        transaction.on_commit(partial(write_records, [record]))
+    else:
+        transaction.on_commit(partial(buffer.append, record))
+
+
+def write_records(records):
+    """Helper function to insert audit records in one query. A failure is
+    logged, the changes they record are already committed
+    """
+    if not records:
+        return
+    try:
+        AuditLog.objects.bulk_create(records)
+    except DatabaseError:
+        logger.exception(f"[AUDIT] {len(records)} records couldn't be written")
+        AUDIT_RECORDS.labels("failed").inc(len(records))
+    else:
+        AUDIT_RECORDS.labels("written").inc(len(records))
+
+
+@contextmanager
+def audit_context(request=None):
+    """Context manager to buffer the changes recorded in its block and
+    write them when it exits
+    """
+    buffer = []
+    buffer_token = _buffer.set(buffer)
+    request_token = _request.set(request)
+    try:
+        yield buffer
+    finally:
+        _buffer.reset(buffer_token)
+        _request.reset(request_token)
+        write_records(buffer)
+
+
+class AuditMiddleware(AsyncCapableMiddleware):
+    """Middleware that buffers the audit records of a request and writes
+    them in one query once the view returned
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        with audit_context(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        buffer = []
+        buffer_token = _buffer.set(buffer)
+        request_token = _request.set(request)
+        try:
+            # the ORM runs in threads that copy the context, so they append to this buffer
+            return await self.get_response(request)
+        finally:
+            _buffer.reset(buffer_token)
+            _request.reset(request_token)
+            if buffer:
+                await sync_to_async(write_records)(buffer)
+
+
+def ensure_audit_partitions(months_ahead=None) -> list:
+    """Helper function to create the monthly partitions of the audit log
+    from this month to `months_ahead` months from now. A record of a month
+    without a partition goes to the default partition
+
+    Args:
+        months_ahead (int, optional): Defaults to `AUDIT_PARTITION_MONTHS_AHEAD`.
+
+    Returns:
+        list: the first day of every month that has a partition
+    """
+    if connection.vendor != "postgresql":
+        return []
+
+    months_ahead = settings.AUDIT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    months = []
+    start = timezone.now().date().replace(day=1)
+    for _ in range(months_ahead + 1):
+        end = (start + timezone.timedelta(days=32)).replace(day=1)
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(CREATE_PARTITION_SQL.format(start=start, end=end))
+        except DatabaseError:
+            # the default partition already has records of the month
+            logger.exception(f"[AUDIT] The partition of {start:%Y-%m} couldn't be created")
+        else:
+            months.append(start)
+        start = end
+    return months
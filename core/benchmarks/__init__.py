@@ -0,0 +1,96 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+from core.seeding import OrganizationSeeder
+
+
+def time_callable(func, repeat=5, number=1) -> dict:
+    """Helper function to time a callable a number of times
+
+    Args:
+        func (callable): the callable to be timed
+        repeat (int, optional): number of timed runs. Defaults to 5.
+        number (int, optional): number of calls per run. Defaults to 1.
+
+    Returns:
+        dict: the minimum, median and maximum duration of a call in milliseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        durations.append((time.perf_counter() - start) * 1000 / number)
+    return {
+        "min_ms": round(min(durations), 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "max_ms": round(max(durations), 3),
+    }
+
+
+class BenchmarkError(Exception):
+    """Raised when a benchmark can't produce meaningful results"""
+
+
+def compare_results(results, baseline, tolerance=0.25, path=()) -> list:
+    """Helper function to compare the results of a suite against a stored
+    baseline. A measurement regresses when its median is slower than the
+    baseline by more than the tolerance or when it runs more queries
+
+    Args:
+        results (dict): results of the suite
+        baseline (dict): results of a previous run of the same suite
+        tolerance (float, optional): allowed relative slowdown. Defaults to 0.25.
+
+    Returns:
+        list: a description of every regression
+    """
+    regressions = []
+    for key, value in results.items():
+        if key not in baseline or not isinstance(value, dict):
+            continue
+        expected = baseline[key]
+        name = " > ".join([*path, key])
+        if "median_ms" in value:
+            if value["median_ms"] > expected["median_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: median {value['median_ms']}ms, baseline {expected['median_ms']}ms"
+                )
+            if "queries" in expected and value.get("queries", 0) > expected["queries"]:
+                regressions.append(f"{name}: {value['queries']} queries, baseline {expected['queries']}")
+        else:
+            regressions.extend(compare_results(value, expected, tolerance, (*path, key)))
+    return regressions
+
+
+@contextmanager
+def test_database(enabled=True):
+    """Context manager to run a benchmark in a new test database that is
+    destroyed afterwards, so that the seeded rows never meet existing data
+    """
+    if not enabled:
+        yield
+        return
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def seeded_organization(developers, **kwargs):
+    """Context manager to seed an organization in a transaction that is
+    rolled back on exit
+
+    Args:
+        developers (int): number of developers
+        kwargs: other options of the OrganizationSeeder
+    """
+    with transaction.atomic():
+        OrganizationSeeder(developers=developers, **kwargs).seed()
+        yield
+        transaction.set_rollback(True)
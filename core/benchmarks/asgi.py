@@ -0,0 +1,214 @@
+"""Load test of the user endpoints served by the WSGI deployment (gunicorn
+sync workers) and by the ASGI deployment (uvicorn with the async views),
+with the same number of worker processes: the user config, which does no
+I/O besides its queries, and the profile photo upload.
+
+The servers run against the benchmark's test database and save the photos
+with `SlowFileSystemStorage`, which waits like a remote storage such as S3
+would. The tasks they queue go to an in-memory broker, no worker runs them.
+`rows` is the number of concurrent clients and `repeat` the number of
+requests each client sends.
+"""
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+
+from accounts.models import User
+from acms.settings_utils import get_env_variable
+from core.benchmarks import BenchmarkError, test_database
+
+# seconds the benchmark storage takes to save a file
+STORAGE_DELAY = 0.2
+SERVER_START_TIMEOUT = 30
+
+SERVERS = {
+    "wsgi": ["gunicorn", "acms.wsgi:application", "--workers", "{workers}", "--bind", "127.0.0.1:{port}",
+             "--log-level", "warning"],
+    "asgi": ["uvicorn", "acms.asgi:application", "--workers", "{workers}", "--host", "127.0.0.1", "--port", "{port}",
+             "--log-level", "warning"],
+}
+
+
+class SlowFileSystemStorage(FileSystemStorage):
+    """File system storage that takes `BENCHMARK_STORAGE_DELAY` seconds per
+    saved file, used by the servers of the load test instead of S3
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("base_url", "http://127.0.0.1/media/")
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        time.sleep(float(get_env_variable("BENCHMARK_STORAGE_DELAY", STORAGE_DELAY)))
+        return super()._save(name, content)
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, workers, media_root, storage_delay):
+    """Helper function to start a server of the given deployment against
+    the current database and wait until it accepts requests
+
+    Returns:
+        tuple: the server process and its base URL
+    """
+    port = get_free_port()
+    env = {
+        **os.environ,
+        "ASGI_MODE": "1" if mode == "asgi" else "0",
+        "DB_NAME": connection.settings_dict["NAME"],
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "REQUEST_TIMING_SAMPLE_RATE": "0",
+        "NPLUSONE_MODE": "off",
+        "DEFAULT_FILE_STORAGE": "core.benchmarks.asgi.SlowFileSystemStorage",
+        "MEDIA_ROOT": media_root,
+        "BENCHMARK_STORAGE_DELAY": str(storage_delay),
+        "CELERY_BROKER_URL": "memory://",
+    }
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    command = [part.format(workers=workers, port=port) for part in SERVERS[mode]]
+    try:
+        process = subprocess.Popen(
+            command, env=env, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        raise BenchmarkError(f"{command[0]} isn't installed")
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise BenchmarkError(f"The {mode} server exited:\n{process.stderr.read().decode()}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise BenchmarkError(f"The {mode} server didn't start in {SERVER_START_TIMEOUT} seconds")
+
+
+def send_request(method, url, token, body=None, content_type="application/json"):
+    """Helper function to send a request and time it
+
+    Returns:
+        tuple: the status code and the duration in milliseconds
+    """
+    request = urllib.request.Request(url, data=body, method=method, headers={
+        "Authorization": f"Bearer {token}", "Content-Type": content_type,
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, (time.perf_counter() - start) * 1000
+
+
+def load_test(requests, concurrency) -> dict:
+    """Helper function to send a list of requests from concurrent clients
+
+    Args:
+        requests (list): arguments of `send_request` of every request
+        concurrency (int): number of clients sending requests at once
+
+    Returns:
+        dict: the throughput, latencies and number of failed requests
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda request: send_request(*request), requests))
+    duration = time.perf_counter() - start
+
+    durations = sorted(duration_ms for status, duration_ms in results)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for status, duration_ms in results if status >= 400),
+        "requests_per_second": round(len(results) / duration, 2),
+        "median_ms": round(statistics.median(durations), 3),
+        "p95_ms": round(statistics.quantiles(durations, n=20, method="inclusive")[-1] if len(durations) > 1 else durations[0], 3),
+        "max_ms": round(durations[-1], 3),
+    }
+
+
+def get_photo_upload():
+    """Helper function to encode a profile photo upload once for every request
+
+    Returns:
+        tuple: the multipart body and its content type
+    """
+    buffer = BytesIO()
+    Image.new("RGB", (800, 800), (200, 40, 40)).save(buffer, format="JPEG")
+    photo = SimpleUploadedFile("benchmark.jpg", buffer.getvalue(), content_type="image/jpeg")
+    return encode_multipart(BOUNDARY, {"profile_photo": photo}), MULTIPART_CONTENT
+
+
+def run(rows, repeat, use_test_database=True, workers=1, storage_delay=STORAGE_DELAY, **kwargs) -> dict:
+    """Function to load test the user config and the profile photo upload of
+    both deployments with every number of concurrent clients
+
+    Args:
+        rows (list): numbers of concurrent clients
+        repeat (int): number of requests sent by each client
+        use_test_database (bool, optional): run in a new test database. Defaults to True.
+        workers (int, optional): number of worker processes of each server. Defaults to 1.
+        storage_delay (float, optional): seconds taken to save a photo. Defaults to STORAGE_DELAY.
+
+    Returns:
+        dict: the results of each deployment and the ratio of their throughputs
+    """
+    results = {}
+    domain = get_env_variable("ALLOWED_EMAIL_DOMAINS", "@amalitech.org").split()[0]
+    photo, content_type = get_photo_upload()
+    with test_database(use_test_database), tempfile.TemporaryDirectory() as media_root:
+        admin = User.objects.create_user(
+            email=f"load-test-admin{domain}", password="Password1", role=User.ADMIN, is_active=True
+        )
+        token = admin.tokens["access"]
+        connection.close()
+
+        for mode in SERVERS:
+            process, base_url = start_server(mode, workers, media_root, storage_delay)
+            try:
+                for concurrency in rows:
+                    count = concurrency * repeat
+                    result = results.setdefault(str(concurrency), {})
+                    user_config = [("GET", f"{base_url}/accounts/user/", token)] * count
+                    result.setdefault("user", {})[mode] = load_test(user_config, concurrency)
+                    upload = [("PATCH", f"{base_url}/accounts/update-user/", token, photo, content_type)] * count
+                    result.setdefault("upload", {})[mode] = load_test(upload, concurrency)
+            finally:
+                process.terminate()
+                process.wait()
+
+        admin.refresh_from_db()
+        admin.delete()
+        if not admin.profile_photo:
+            raise BenchmarkError("The profile photo wasn't uploaded")
+
+    for result in results.values():
+        for endpoint in result.values():
+            endpoint["asgi_speedup"] = round(
+                endpoint["asgi"]["requests_per_second"] / endpoint["wsgi"]["requests_per_second"], 2
+            )
+    return results
@@ -0,0 +1,59 @@
+"""Benchmark of the connection handling of a request: Django opens a
+connection, runs the queries of the request and closes it. The default
+PostgreSQL backend opens a new connection to the server every time, the
+pooled backend reuses the connections of the process.
+
+`rows` is the number of queries of each simulated request and `repeat`
+the number of timed runs of `REQUESTS_PER_RUN` requests.
+"""
+from django.db import connection
+from django.db.utils import load_backend
+
+from core.benchmarks import time_callable
+from core.db.pool import close_pools
+
+ENGINES = {
+    "per_request": "django.db.backends.postgresql",
+    "pooled": "core.db.postgresql",
+}
+REQUESTS_PER_RUN = 50
+
+
+def get_wrapper(engine, alias):
+    """Helper function to get a connection of the default database that uses
+    another engine, outside of `django.db.connections`
+    """
+    return load_backend(engine).DatabaseWrapper({**connection.settings_dict, "ENGINE": engine}, alias)
+
+
+def run(rows, repeat) -> dict:
+    """Function to time the requests of both backends with every number of
+    queries per request
+
+    Args:
+        rows (list): numbers of queries per request
+        repeat (int): number of timed runs
+
+    Returns:
+        dict: the duration of a request with each backend and the speedup of the pool
+    """
+    results = {}
+    for queries in rows:
+        result = results[str(queries)] = {}
+        for name, engine in ENGINES.items():
+            wrapper = get_wrapper(engine, f"benchmark-{name}")
+
+            def request():
+                wrapper.ensure_connection()
+                with wrapper.cursor() as cursor:
+                    for _ in range(queries):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                wrapper.close()
+
+            # the first connection of the pool isn't timed
+            request()
+            result[name] = time_callable(request, repeat=repeat, number=REQUESTS_PER_RUN)
+        result["pool_speedup"] = round(result["per_request"]["median_ms"] / result["pooled"]["median_ms"], 2)
+    close_pools()
+    return results
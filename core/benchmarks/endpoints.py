@@ -0,0 +1,200 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, resolve
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APIClient
+
+from accounts.models import Education, User, WorkExperience
+from core.benchmarks import (BenchmarkError, seeded_organization,
+                             test_database, time_callable)
+from projects.models import Project
+from skills.models import Category, Skill
+from utils.auth import TokenGenerator
+
+# URLconfs whose every route must have a benchmarked request
+NAMESPACES = ("accounts", "skills", "projects", "analytics")
+
+# (name, method, url, user, data, expected status code). The url and data
+# are formatted with the objects returned by `get_fixtures`
+REQUESTS = [
+    ("login", "post", "/accounts/login/", None,
+     {"email": "{developer.email}", "password": "Password1"}, 200),
+    ("send-invite", "post", "/accounts/send-invite/", "admin",
+     {"email": "benchmark.invite@amalitech.org", "role": User.DEVELOPER}, 200),
+    ("accept-invite", "patch", "/accounts/accept-invite/{uid}/{token}/", None,
+     {"first_name": "Invited", "last_name": "Developer", "email": "{invited.email}", "password": "Amalitech.2023"}, 200),
+    ("user", "get", "/accounts/user/", "developer", None, 200),
+    ("update-user", "patch", "/accounts/update-user/", "developer", {"first_name": "Updated"}, 200),
+    ("user-list", "get", "/accounts/users/", "admin", None, 200),
+    ("developer-profile-list", "get", "/accounts/developer-profiles/", "admin", None, 200),
+    ("developer-profiles-ending", "get", "/accounts/developer-profiles/ending/", "admin", {"days": 30}, 200),
+    ("developer-profile", "get", "/accounts/developer-profile/", "developer", None, 200),
+    ("view-developer-profile", "get", "/accounts/developer/{developer_profile.pk}", "admin", None, 200),
+    ("similar-developers", "get", "/accounts/developer/{developer_profile.pk}/similar/", "admin", None, 200),
+    ("developer-profile-update", "patch", "/accounts/developer-profile/update/", "developer",
+     {"employment_status": "EMPLOYEE", "job_information": "Senior Associate"}, 200),
+    ("work-experience", "get", "/accounts/work-experience/{work_experience.pk}", "developer", None, 200),
+    ("education", "get", "/accounts/education/{education.pk}", "developer", None, 200),
+    ("list-categories", "get", "/skills/categories/", "admin", None, 200),
+    ("retrieve-category", "get", "/skills/categories/{category.pk}", "admin", None, 200),
+    ("list-skills", "get", "/skills/skills/", "admin", None, 200),
+    ("delete-all-skills", "delete", "/skills/skills/delete-all/", "admin", None, 204),
+    ("retrieve-skill", "get", "/skills/skills/{skill.pk}", "admin", None, 200),
+    ("list-skill-ratings", "get", "/skills/add-to-profile/", "developer", None, 200),
+    ("create-skill-rating", "post", "/skills/add-to-profile/", "developer", {"skill": "{skill.pk}", "rating": "4.0"}, 201),
+    ("project-list", "get", "/projects/", "admin", None, 200),
+    ("project-create", "post", "/projects/create/", "admin",
+     {"name": "Benchmark new project", "description": "Benchmark", "start_date": "2023-01-02", "end_date": "2023-03-31",
+      "required_skills": ["{skill.pk}"]}, 201),
+    ("project-detail", "get", "/projects/{project.pk}/", "admin", None, 200),
+    ("project-update", "patch", "/projects/{project.pk}/update/", "admin",
+     {"description": "Updated", "start_date": "2023-01-02", "end_date": "2023-04-28"}, 200),
+    ("project-delete", "delete", "/projects/{project.pk}/delete/", "admin", None, 204),
+    ("project-assign", "patch", "/projects/{project.pk}/assign/", "admin", {"members": ["{developer_profile.pk}"]}, 200),
+    ("developer-projects", "get", "/projects/{developer.pk}/developer/", "developer", None, 200),
+    ("suggested-developers", "get", "/projects/{project.pk}/suggested-developers/", "admin", None, 200),
+    ("recommended-developers", "get", "/projects/{project.pk}/recommended-developers/", "admin", None, 200),
+    ("capacity-analytics", "get", "/analytics/capacity/", "admin", {"start_date": "2022-10-01", "end_date": "2023-01-02"}, 200),
+    ("skill-gaps", "get", "/analytics/skill-gaps/", "admin", {"start_date": "2022-07-06", "end_date": "2023-01-02"}, 200),
+]
+
+
+class Placeholder:
+    """Stand-in for a fixture when the urls are only resolved"""
+
+    pk = 1
+
+    def __format__(self, format_spec):
+        return "1"
+
+
+FIXTURE_NAMES = [
+    "admin", "developer", "developer_profile", "work_experience", "education", "category",
+    "skill", "project", "invited", "uid", "token",
+]
+
+
+def get_routes() -> set:
+    """Helper function to list the routes of the benchmarked URLconfs"""
+    routes = set()
+    for resolver in get_resolver().url_patterns:
+        if getattr(resolver, "namespace", None) in NAMESPACES:
+            routes.update(f"{resolver.pattern}{pattern.pattern}" for pattern in resolver.url_patterns)
+    return routes
+
+
+def check_coverage():
+    """Helper function to make sure that every route of the benchmarked
+    URLconfs has a request
+
+    Raises:
+        BenchmarkError: if a route isn't benchmarked
+    """
+    fixtures = {name: Placeholder() for name in FIXTURE_NAMES}
+    covered = {resolve(url.format(**fixtures)).route for name, method, url, *rest in REQUESTS}
+    missing = sorted(get_routes() - covered)
+    if missing:
+        raise BenchmarkError(f"No benchmark request for the routes: {', '.join(missing)}")
+
+
+def get_fixtures() -> dict:
+    """Helper function to create the users that send the requests and pick
+    the objects the requests refer to from the seeded data
+    """
+    admin = User.objects.create_user(
+        email="benchmark.admin@amalitech.org", password="Password1", role=User.ADMIN, is_active=True
+    )
+    invited = User.objects.create(
+        email="benchmark.invited@amalitech.org", role=User.DEVELOPER, is_active=False
+    )
+    project = Project.objects.order_by("pk").first()
+    developer_profile = project.members.order_by("pk").first()
+    return {
+        "admin": admin,
+        "developer": developer_profile.user,
+        "developer_profile": developer_profile,
+        "work_experience": WorkExperience.objects.filter(developer_profile=developer_profile).first(),
+        "education": Education.objects.filter(developer_profile=developer_profile).first(),
+        "category": Category.objects.order_by("pk").first(),
+        "skill": Skill.objects.order_by("pk").first(),
+        "project": project,
+        "invited": invited,
+        "uid": urlsafe_base64_encode(force_bytes(invited.pk)),
+        "token": TokenGenerator().make_token(invited),
+    }
+
+
+def format_data(data, fixtures):
+    if isinstance(data, dict):
+        return {key: format_data(value, fixtures) for key, value in data.items()}
+    if isinstance(data, list):
+        return [format_data(value, fixtures) for value in data]
+    if isinstance(data, str):
+        return data.format(**fixtures)
+    return data
+
+
+def benchmark_requests(fixtures, repeat) -> dict:
+    """Helper function to time every request. Each request runs in a
+    savepoint that is rolled back so that it sees the same data every time
+    """
+    tokens = {
+        role: fixtures[role].tokens["access"] for role in ("admin", "developer")
+    }
+    results = {}
+    for name, method, url, user, data, status_code in REQUESTS:
+        client = APIClient()
+        if user:
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens[user]}")
+        path = url.format(**fixtures)
+        payload = format_data(data, fixtures)
+
+        def send_request():
+            with transaction.atomic():
+                response = getattr(client, method)(path, payload, format="json")
+                transaction.set_rollback(True)
+            return response
+
+        with CaptureQueriesContext(connection) as queries:
+            response = send_request()
+        if response.status_code != status_code:
+            raise BenchmarkError(
+                f"{method.upper()} {path} returned {response.status_code} instead of {status_code}: "
+                f"{response.content.decode()}"
+            )
+        results[name] = {
+            "queries": len(queries),
+            **time_callable(send_request, repeat=repeat),
+        }
+    return results
+
+
+def run(rows=(1000,), repeat=20, use_test_database=True, **kwargs) -> dict:
+    """Benchmark every endpoint of the accounts, skills, projects and
+    analytics apps on seeded data and count their queries. Responses aren't
+    cached and emails aren't sent
+
+    Args:
+        rows (tuple, optional): number of developers. Defaults to (1000,).
+        repeat (int, optional): number of timed runs. Defaults to 20.
+        use_test_database (bool, optional): whether to run in a new test
+        database instead of the configured one. Defaults to True.
+
+    Returns:
+        dict: query count and timings of every endpoint per number of developers
+    """
+    check_coverage()
+    results = {}
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+        EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+        REQUEST_TIMING_SAMPLE_RATE=0,
+        NPLUSONE_MODE="off",
+    ), test_database(use_test_database):
+        for size in rows:
+            with seeded_organization(size, projects=max(size // 5, 1), skill_experience=True):
+                results[str(size)] = benchmark_requests(get_fixtures(), repeat)
+    return results
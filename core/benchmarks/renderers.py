@@ -0,0 +1,109 @@
+import datetime
+import random
+
+from rest_framework.response import Response
+
+from core.benchmarks import time_callable
+from core.renderers import CustomJSONRenderer, FastJSONRenderer
+
+
+def build_profile_payload(rows: int, seed: int = 0) -> list:
+    """Helper function to build a list shaped like the output of the
+    DeveloperProfileSerializer without touching the database
+
+    Args:
+        rows (int): number of developer profiles
+        seed (int, optional): seed of the random generator. Defaults to 0.
+
+    Returns:
+        list: a list of serialized developer profiles
+    """
+    generator = random.Random(seed)
+    timestamp = datetime.datetime(2023, 5, 16, 9, 55, 12, 123456).isoformat() + "Z"
+    payload = []
+    for index in range(1, rows + 1):
+        payload.append({
+            "id": index,
+            "user": {
+                "id": index,
+                "last_login": None,
+                "is_superuser": False,
+                "first_name": f"First {index}",
+                "last_name": f"Last {index}",
+                "is_staff": False,
+                "date_joined": timestamp,
+                "create_date": timestamp,
+                "modify_date": timestamp,
+                "email": f"developer{index}@amalitech.org",
+                "role": "DEVELOPER",
+                "is_active": True,
+                "profile_photo": "",
+                "profile_photo_variants": {},
+                "country": "GH",
+                "groups": [],
+                "user_permissions": [],
+            },
+            "education": [
+                {
+                    "id": index,
+                    "create_date": timestamp,
+                    "modify_date": timestamp,
+                    "school_name": "Kwame Nkrumah University of Science and Technology",
+                    "program": "BSc. Computer Science",
+                    "start_date": "2015-09-01",
+                    "end_date": "2019-07-31",
+                }
+            ],
+            "work_experience": [
+                {
+                    "id": index * 2 + offset,
+                    "skills_used": generator.sample(["Python", "Django", "React", "Java", "SQL", "AWS"], 3),
+                    "create_date": timestamp,
+                    "modify_date": timestamp,
+                    "job_title": "Software Developer",
+                    "company_name": "AmaliTech",
+                    "start_date": "2020-01-06",
+                    "end_date": "2022-12-16",
+                }
+                for offset in range(2)
+            ],
+            "create_date": timestamp,
+            "modify_date": timestamp,
+            "availability": generator.random() < 0.5,
+            "occupied": {},
+            "current_project_start_date": None,
+            "current_project_end_date": None,
+            "employment_status": "EMPLOYEE",
+            "job_information": "Junior Associate",
+            "current_project": "",
+            "skills": generator.sample(["python", "django", "react", "java", "sql", "aws"], 4),
+        })
+    return payload
+
+
+def run(rows=(1000,), repeat=20, **kwargs) -> dict:
+    """Benchmark CustomJSONRenderer against FastJSONRenderer on successful
+    developer profile list responses
+
+    Args:
+        rows (tuple, optional): payload sizes. Defaults to (1000,).
+        repeat (int, optional): number of timed runs. Defaults to 20.
+
+    Returns:
+        dict: timings of both renderers and the speedup per payload size
+    """
+    results = {}
+    for size in rows:
+        payload = build_profile_payload(size)
+        renderer_context = {"response": Response(status=200)}
+        timings = {}
+        for renderer_class in [CustomJSONRenderer, FastJSONRenderer]:
+            renderer = renderer_class()
+            timings[renderer_class.__name__] = time_callable(
+                lambda: renderer.render(payload, "application/json", renderer_context), repeat=repeat
+            )
+        timings["speedup"] = round(
+            timings["CustomJSONRenderer"]["median_ms"] / timings["FastJSONRenderer"]["median_ms"], 2
+        )
+        results[str(size)] = timings
+    return results
@@ -0,0 +1,80 @@
+from django.db.models import Prefetch
+
+from accounts.models import DeveloperProfile, User
+from accounts.serializers import DeveloperProfileSerializer
+from core.benchmarks import seeded_organization, test_database, time_callable
+from core.serializers import FlatSerializer
+from projects.models import Project
+from projects.serializers import ProjectSerializer
+from skills.models import SkillRating
+from skills.serializers import ListSkillRatingsSerializer
+
+USERS = User.objects.prefetch_related("groups", "user_permissions")
+
+
+def get_cases(rows: int) -> dict:
+    """Helper function to build the querysets of the benchmarked endpoints.
+    The DRF querysets prefetch every relation so that both serializers run
+    the same number of queries per relation
+    """
+    profiles = DeveloperProfile.objects.order_by("pk")[:rows]
+    projects = Project.objects.order_by("pk")[:max(rows // 5, 1)]
+    skill_ratings = SkillRating.objects.order_by("pk")[:rows]
+    return {
+        "DeveloperProfileSerializer": (
+            DeveloperProfileSerializer,
+            profiles,
+            profiles.select_related("user").prefetch_related(
+                Prefetch("user", queryset=USERS), "education", "work_experience", "skills"
+            ),
+        ),
+        "ProjectSerializer": (
+            ProjectSerializer,
+            projects,
+            projects.prefetch_related(
+                "required_skills",
+                Prefetch("created_by", queryset=USERS),
+                Prefetch("members", queryset=DeveloperProfile.objects.prefetch_related(
+                    Prefetch("user", queryset=USERS), "education", "work_experience", "skills"
+                )),
+            ),
+        ),
+        "ListSkillRatingsSerializer": (
+            ListSkillRatingsSerializer,
+            skill_ratings,
+            skill_ratings.select_related("skill__category"),
+        ),
+    }
+
+
+def run(rows=(1000,), repeat=20, use_test_database=True, **kwargs) -> dict:
+    """Benchmark the DRF serializers against FlatSerializer on seeded data.
+    The data is seeded in a transaction that is rolled back after each size
+
+    Args:
+        rows (tuple, optional): number of developer profiles. Defaults to (1000,).
+        repeat (int, optional): number of timed runs. Defaults to 20.
+        use_test_database (bool, optional): whether to run in a new test
+        database instead of the configured one. Defaults to True.
+
+    Returns:
+        dict: timings of both serializers and the speedup per serializer and size
+    """
+    results = {}
+    with test_database(use_test_database):
+        for size in rows:
+            with seeded_organization(size, projects=max(size // 5, 1)):
+                timings = {}
+                for name, (serializer_class, queryset, prefetched_queryset) in get_cases(size).items():
+                    flat_serializer = FlatSerializer(serializer_class)
+                    drf = time_callable(
+                        lambda: serializer_class(prefetched_queryset.all(), many=True).data, repeat=repeat
+                    )
+                    flat = time_callable(lambda: flat_serializer.serialize(queryset), repeat=repeat)
+                    timings[name] = {
+                        "drf": drf,
+                        "flat": flat,
+                        "speedup": round(drf["median_ms"] / flat["median_ms"], 2),
+                    }
+                results[str(size)] = timings
+    return results
@@ -0,0 +1,103 @@
+"""Benchmark of the similar developer search: the cosine similarities of
+the normalized rating vectors of the similarity index computed with numpy,
+against computing them from the ratings of every developer in Python. The
+incremental refresh of the index, after the ratings of 1% of the developers
+changed, and its full build are timed as well.
+
+`rows` is the number of developers, e.g. `--rows 50000`.
+"""
+import math
+
+from django.utils import timezone
+
+from core.benchmarks import (BenchmarkError, seeded_organization,
+                             test_database, time_callable)
+from skills import similarity
+from skills.models import SkillRating
+from skills.similarity import SkillVectorIndex, find_similar_developers
+
+LIMIT = 10
+
+
+def rank_per_developer(ratings, developer_profile_id, count) -> list:
+    """Helper function to rank the developers by the cosine similarity of
+    their ratings to a developer's, one developer at a time
+
+    Args:
+        ratings (dict): developer profile id: {skill: rating}
+    """
+    target = ratings[developer_profile_id]
+    target_norm = math.sqrt(sum(value * value for value in target.values()))
+    scores = []
+    for profile_id, vector in ratings.items():
+        if profile_id == developer_profile_id:
+            continue
+        dot = sum(value * vector[skill] for skill, value in target.items() if skill in vector)
+        if dot > 0:
+            norm = math.sqrt(sum(value * value for value in vector.values()))
+            scores.append((-dot / (norm * target_norm), profile_id))
+    return [(profile_id, -score) for score, profile_id in sorted(scores)[:count]]
+
+
+def run(rows=(1000,), repeat=20, use_test_database=True, **kwargs) -> dict:
+    """Benchmark the similar developer search on seeded developers
+
+    Args:
+        rows (tuple, optional): number of developers. Defaults to (1000,).
+        repeat (int, optional): number of timed runs. Defaults to 20.
+        use_test_database (bool, optional): whether to run in a new test
+        database instead of the configured one. Defaults to True.
+
+    Raises:
+        BenchmarkError: if both searches don't find the same similarities
+
+    Returns:
+        dict: timings of the index and of both searches per number of developers
+    """
+    results = {}
+    with test_database(use_test_database):
+        for size in rows:
+            with seeded_organization(size, projects=max(size // 10, 1)):
+                index = SkillVectorIndex.build()
+                developer_profile_id = int(index.profile_ids[0])
+                ratings = {}
+                for profile_id, skill, rating in SkillRating.objects.values_list(
+                    "developer_profile_id", "skill_id", "rating"
+                ):
+                    ratings.setdefault(profile_id, {})[skill] = float(rating)
+
+                def search():
+                    return index.rank(index.get_scores(developer_profile_id), LIMIT * similarity.CANDIDATE_FACTOR)
+
+                vectorized = search()[1].tolist()
+                per_developer = rank_per_developer(ratings, developer_profile_id, LIMIT * similarity.CANDIDATE_FACTOR)
+                if len(vectorized) != len(per_developer) or any(
+                    abs(score - expected) > 1e-4 for score, (_, expected) in zip(vectorized, per_developer)
+                ):
+                    raise BenchmarkError(f"The similar developers of {size} developers differ")
+
+                changed = list(index.profile_ids[: max(size // 100, 1)].tolist())
+                SkillRating.objects.filter(developer_profile_id__in=changed).update(modify_date=timezone.now())
+                result = {
+                    "build": time_callable(SkillVectorIndex.build, repeat=min(repeat, 5)),
+                    "refresh": time_callable(index.refresh, repeat=repeat),
+                }
+                # the search uses this index without refreshing it
+                similarity._index = index
+                index.refreshed_at = float("inf")
+                try:
+                    result.update({
+                        "per_developer": time_callable(
+                            lambda: rank_per_developer(ratings, developer_profile_id, LIMIT), repeat=min(repeat, 5)
+                        ),
+                        "vectorized": time_callable(search, repeat=repeat),
+                        "find_similar": time_callable(
+                            lambda: find_similar_developers(developer_profile_id, LIMIT), repeat=repeat
+                        ),
+                        "matrix_mb": round(index.matrix.nbytes / 1e6, 2),
+                    })
+                finally:
+                    similarity._index = None
+                result["speedup"] = round(result["per_developer"]["median_ms"] / result["vectorized"]["median_ms"], 2)
+                results[str(size)] = result
+    return results
@@ -0,0 +1,90 @@
+"""Benchmark of the skill gap analysis: the column sums of the project x
+skill and developer x skill incidence matrices computed with numpy, against
+counting the skills of every project and every developer in Python.
+
+`rows` is the number of projects, which is also the number of developers.
+"""
+import datetime
+from collections import Counter
+
+from django.db.models import Prefetch
+
+from accounts.models import DeveloperProfile
+from analytics.serializers import SkillGapSerializer
+from analytics.utils import compute_skill_gaps
+from core.benchmarks import (BenchmarkError, seeded_organization,
+                             test_database, time_callable)
+from projects.models import Project
+from skills.models import Skill, SkillRating
+
+ANCHOR_DATE = datetime.date(2023, 1, 2)
+# the seeded projects start in the 180 days before the anchor date
+START_DATE = ANCHOR_DATE - datetime.timedelta(days=180)
+
+
+def compute_skill_gaps_per_project(start_date, end_date, min_rating) -> dict:
+    """Helper function to compute the demand and supply of every skill with
+    a loop over the projects and the developers
+    """
+    demand = Counter()
+    projects = Project.objects.filter(start_date__range=(start_date, end_date)).prefetch_related("required_skills")
+    for project in projects:
+        for skill in project.required_skills.all():
+            demand[skill.slug] += 1
+
+    supply = Counter()
+    ratings = SkillRating.objects.filter(rating__gte=min_rating)
+    developers = DeveloperProfile.objects.filter(availability=True, user__is_active=True).prefetch_related(
+        Prefetch("skillrating_set", queryset=ratings)
+    )
+    for developer in developers:
+        for slug in {rating.skill_id for rating in developer.skillrating_set.all()}:
+            supply[slug] += 1
+
+    skills = {skill.slug: skill for skill in Skill.objects.all()}
+    gaps = [
+        {"slug": slug, "demand": demand[slug], "supply": supply[slug], "shortage": demand[slug] - supply[slug]}
+        for slug in sorted(demand)
+    ]
+    gaps.sort(key=lambda gap: (-gap["shortage"], -gap["demand"]))
+    return {"skills": [{**gap, "name": skills[gap["slug"]].name} for gap in gaps]}
+
+
+def run(rows=(1000,), repeat=20, use_test_database=True, **kwargs) -> dict:
+    """Benchmark the skill gap analysis on seeded projects
+
+    Args:
+        rows (tuple, optional): number of projects. Defaults to (1000,).
+        repeat (int, optional): number of timed runs. Defaults to 20.
+        use_test_database (bool, optional): whether to run in a new test
+        database instead of the configured one. Defaults to True.
+
+    Raises:
+        BenchmarkError: if both analyses don't rank the same skills
+
+    Returns:
+        dict: timings of both analyses and the speedup of the vectorized one per number of projects
+    """
+    params = {"start_date": START_DATE, "end_date": ANCHOR_DATE, "min_rating": SkillGapSerializer.MIN_RATING}
+    results = {}
+    with test_database(use_test_database):
+        for size in rows:
+            with seeded_organization(size, projects=size, anchor_date=ANCHOR_DATE):
+                vectorized = [
+                    (gap["slug"], gap["demand"], gap["supply"]) for gap in compute_skill_gaps(**params)["skills"]
+                ]
+                per_project = [
+                    (gap["slug"], gap["demand"], gap["supply"])
+                    for gap in compute_skill_gaps_per_project(**params)["skills"]
+                ]
+                if vectorized != per_project:
+                    raise BenchmarkError(f"The skill gaps of {size} projects differ")
+
+                per_project = time_callable(lambda: compute_skill_gaps_per_project(**params), repeat=repeat)
+                vectorized = time_callable(lambda: compute_skill_gaps(**params), repeat=repeat)
+                results[str(size)] = {
+                    "per_project": per_project,
+                    "vectorized": vectorized,
+                    "speedup": round(per_project["median_ms"] / vectorized["median_ms"], 2),
+                }
+    return results
@@ -0,0 +1,104 @@
+"""Benchmark of the staffing recommendations: the Jaccard similarities of
+the required skills of every project computed with the numpy index, against
+computing them from the skill sets of every project in Python. The build of
+the index, writing and reading it, and its incremental refresh, after 1% of
+the projects changed, are timed as well.
+
+`rows` is the number of projects, e.g. `--rows 20000`.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.benchmarks import (BenchmarkError, seeded_organization,
+                             test_database, time_callable)
+from core.cache import SKILLS_TAG, get_tag_versions
+from projects import staffing
+from projects.models import Project
+from projects.staffing import ProjectSkillIndex, recommend_developers
+
+
+def rank_per_project(project_skills, skills, exclude, count) -> list:
+    """Helper function to rank the projects by the Jaccard similarity of
+    their required skills to a set of skills, one project at a time
+
+    Args:
+        project_skills (dict): project slug: set of skill slugs
+    """
+    scores = []
+    for slug, required_skills in project_skills.items():
+        if slug == exclude:
+            continue
+        intersection = len(skills & required_skills)
+        if intersection:
+            scores.append((-intersection / len(skills | required_skills), slug))
+    return [(slug, -score) for score, slug in sorted(scores)[:count]]
+
+
+def run(rows=(1000,), repeat=20, use_test_database=True, **kwargs) -> dict:
+    """Benchmark the staffing recommendations on seeded projects
+
+    Args:
+        rows (tuple, optional): number of projects. Defaults to (1000,).
+        repeat (int, optional): number of timed runs. Defaults to 20.
+        use_test_database (bool, optional): whether to run in a new test
+        database instead of the configured one. Defaults to True.
+
+    Raises:
+        BenchmarkError: if both rankings don't find the same similarities
+
+    Returns:
+        dict: timings of the index and of both rankings per number of projects
+    """
+    results = {}
+    count = settings.STAFFING_SIMILAR_PROJECTS
+    ended_before = timezone.now().date()
+    with test_database(use_test_database), tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "staffing.npz")
+        for size in rows:
+            with seeded_organization(max(size, 1), projects=size):
+                index = ProjectSkillIndex.build(get_tag_versions([SKILLS_TAG])[0])
+                project = Project.objects.order_by("slug").first()
+                project_skills = {}
+                for slug, skill in Project.required_skills.through.objects.values_list("project_id", "skill_id"):
+                    project_skills.setdefault(slug, set()).add(skill)
+                skills = project_skills[project.pk]
+
+                def search():
+                    return index.rank(index.get_scores(skills, ended_before, exclude=project.pk), count)
+
+                vectorized = search()[1].tolist()
+                per_project = rank_per_project(project_skills, skills, project.pk, count)
+                if len(vectorized) != len(per_project) or any(
+                    abs(score - expected) > 1e-4 for score, (_, expected) in zip(vectorized, per_project)
+                ):
+                    raise BenchmarkError(f"The similar projects of {size} projects differ")
+
+                changed = list(index.slugs[: max(size // 100, 1)].tolist())
+                Project.objects.filter(pk__in=changed).update(modify_date=timezone.now())
+                result = {
+                    "build": time_callable(ProjectSkillIndex.build, repeat=min(repeat, 5)),
+                    "save": time_callable(lambda: index.save(path), repeat=min(repeat, 5)),
+                    "read": time_callable(lambda: ProjectSkillIndex.read(path), repeat=min(repeat, 5)),
+                    "refresh": time_callable(index.refresh, repeat=repeat),
+                    "index_mb": round(os.path.getsize(path) / 1e6, 2),
+                    "matrix_mb": round(index.matrix.nbytes / 1e6, 2),
+                }
+                # the recommendations use this index without refreshing it
+                staffing._index = index
+                index.refreshed_at = float("inf")
+                try:
+                    result.update({
+                        "per_project": time_callable(
+                            lambda: rank_per_project(project_skills, skills, project.pk, count), repeat=min(repeat, 5)
+                        ),
+                        "vectorized": time_callable(search, repeat=repeat),
+                        "recommend": time_callable(lambda: recommend_developers(project), repeat=repeat),
+                    })
+                finally:
+                    staffing._index = None
+                result["speedup"] = round(result["per_project"]["median_ms"] / result["vectorized"]["median_ms"], 2)
+                results[str(size)] = result
+    return results
@@ -0,0 +1,157 @@
+import hashlib
+import time
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+TAG_VERSION_KEY = "response-cache:tag:{}"
+STATS_KEY = "response-cache:stats:{}:{}"
+RESPONSE_KEY = "response-cache:response:{}"
+
+# tags invalidated by model signals, see the `signals` module of each app
+USERS_TAG = "users"
+DEVELOPER_PROFILES_TAG = "developer-profiles"
+PROJECTS_TAG = "projects"
+SKILLS_TAG = "skills"
+
+_namespaces = set()
+
+
+def get_tag_versions(tags) -> list:
+    """Helper function to fetch the current version of every tag. A tag that
+    isn't in the cache yet gets a time based version so that it can never
+    collide with a version that was evicted
+
+    Args:
+        tags (list): names of the tags
+
+    Returns:
+        list: the version of each tag, in the same order
+    """
+    keys = [TAG_VERSION_KEY.format(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Helper function to invalidate every cached response that depends on
+    any of the given tags
+
+    Args:
+        tags (str): names of the tags to invalidate
+    """
+    for tag in tags:
+        key = TAG_VERSION_KEY.format(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_tags_on_commit(*tags):
+    """Helper function to invalidate tags for the changes of the current
+    transaction: right away, so that the transaction itself doesn't read
+    responses cached before its changes, and again once it commits, since a
+    concurrent request could cache the rows it still sees, the old ones,
+    under the new versions in between
+
+    Args:
+        tags (str): names of the tags to invalidate
+    """
+    invalidate_tags(*tags)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(invalidate_tags, *tags))
+
+
+def _increment_counter(namespace, counter):
+    key = STATS_KEY.format(namespace, counter)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats() -> dict:
+    """Helper function to read the hit and miss counters of every cached view
+
+    Returns:
+        dict: mapping of the cache namespace to its hits, misses and hit ratio
+    """
+    stats = {}
+    for namespace in sorted(_namespaces):
+        hits = cache.get(STATS_KEY.format(namespace, "hits"), 0)
+        misses = cache.get(STATS_KEY.format(namespace, "misses"), 0)
+        total = hits + misses
+        stats[namespace] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
+    return stats
+
+
+def get_response_cache_key(namespace, request, tags, kwargs) -> str:
+    """Helper function to build the cache key of a response from the role
+    of the user, the query params, the URL kwargs and the versions of
+    the tags the response depends on
+    """
+    role = getattr(request.user, "role", None)
+    query_params = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+    parts = [namespace, str(role), str(query_params), str(sorted(kwargs.items()))]
+    parts.extend(str(version) for version in get_tag_versions(tags))
+    return RESPONSE_KEY.format(hashlib.md5("|".join(parts).encode()).hexdigest())
+
+
+def cache_response(tags, namespace=None, timeout=None):
+    """Decorator function to cache the data of a successful response per user
+    role and query params until one of the tags is invalidated
+
+    Only use it on views whose response is the same for every user with
+    the same role.
+
+    Args:
+        tags (list): tags the response depends on
+        namespace (str, optional): name of the cache used in the stats.
+        Defaults to the qualified name of the decorated method.
+        timeout (int, optional): number of seconds to keep a response.
+        Defaults to the RESPONSE_CACHE_TIMEOUT setting.
+    """
+
+    def decorator(f):
+        cache_namespace = namespace or f.__qualname__
+        _namespaces.add(cache_namespace)
+
+        @wraps(f)
+        def func_wrap(view, request, *args, **kwargs):
+            key = get_response_cache_key(cache_namespace, request, tags, kwargs)
+            data = cache.get(key)
+            if data is not None:
+                _increment_counter(cache_namespace, "hits")
+                response = Response(data, status=status.HTTP_200_OK)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _increment_counter(cache_namespace, "misses")
+            # a cached response outlives the lag of the replica, so it's built
+            # from the primary. core.replicas imports this module
+            from core.replicas import read_primary
+            with read_primary():
+                response = f(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache_timeout = timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT
+                cache.set(key, response.data, cache_timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return func_wrap
+
+    return decorator
@@ -0,0 +1,246 @@
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError, extensions
+
+from core.metrics import (DB_POOL_CHECKOUT_WAIT, DB_POOL_CLOSED,
+                          DB_POOL_CONNECTIONS, DB_POOL_OPENED,
+                          DB_POOL_TIMEOUTS)
+
+_pools = {}
+_pools_lock = threading.Lock()
+# connections inherited from a parent process. They are kept referenced so
+# that they are never closed or garbage collected in the child, which would
+# send a terminate message on the socket the parent is still using
+_inherited_connections = []
+
+
+class PooledConnection:
+    """A psycopg2 connection with the times the pool needs to check its
+    lifetime and health
+    """
+
+    def __init__(self, connection, isolation_level):
+        self.connection = connection
+        self.isolation_level = isolation_level
+        self.created_at = time.monotonic()
+        self.released_at = self.created_at
+
+
+class ConnectionPool:
+    """Thread safe pool of the connections of one process to one database.
+
+    A connection is checked out by a thread for the length of a request or
+    a task and returned when Django closes it. A connection older than
+    `max_lifetime` seconds is closed instead of being reused, and an idle
+    connection that wasn't used for `health_check_interval` seconds is
+    pinged before it's reused. When `max_size` connections are checked out,
+    a checkout waits up to `timeout` seconds for one to be returned.
+    """
+
+    def __init__(self, alias, max_size=10, max_lifetime=1800, health_check_interval=30, timeout=10):
+        self.alias = alias
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self.idle = deque()
+        self.checked_out = {}
+        self.opening = 0
+        self.condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self.idle) + len(self.checked_out) + self.opening
+
+    def checkout(self, connect) -> PooledConnection:
+        """Method to get a healthy connection, opening a new one with
+        `connect` when none is idle and the pool isn't full
+
+        Args:
+            connect (callable): returns a new connection and its isolation level
+
+        Raises:
+            OperationalError: if no connection is returned within the timeout
+        """
+        start = time.monotonic()
+        with self.condition:
+            while True:
+                pooled = self._take_idle()
+                if pooled is not None:
+                    self.checked_out[id(pooled.connection)] = pooled
+                    break
+                if self.size < self.max_size:
+                    self.opening += 1
+                    break
+                remaining = start + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    DB_POOL_TIMEOUTS.labels(self.alias).inc()
+                    raise OperationalError(
+                        f"No connection of the '{self.alias}' pool was returned within {self.timeout} seconds"
+                    )
+                self.condition.wait(remaining)
+
+        if pooled is None:
+            try:
+                pooled = PooledConnection(*connect())
+                DB_POOL_OPENED.labels(self.alias).inc()
+            finally:
+                with self.condition:
+                    self.opening -= 1
+                    if pooled is not None:
+                        self.checked_out[id(pooled.connection)] = pooled
+                    else:
+                        self.condition.notify()
+
+        DB_POOL_CHECKOUT_WAIT.labels(self.alias).observe(time.monotonic() - start)
+        self._report()
+        return pooled
+
+    def release(self, connection, discard=False):
+        """Method to return a connection to the pool. An open transaction is
+        rolled back, and the connection is closed instead when it's broken,
+        too old or discarded
+        """
+        with self.condition:
+            pooled = self.checked_out.pop(id(connection), None)
+        reason = "discarded" if discard or pooled is None else self._get_close_reason(pooled)
+
+        if reason is None:
+            pooled.released_at = time.monotonic()
+        else:
+            DB_POOL_CLOSED.labels(self.alias, reason).inc()
+            connection.close()
+        with self.condition:
+            if reason is None:
+                self.idle.append(pooled)
+            self.condition.notify()
+        self._report()
+
+    def close(self):
+        """Method to close the idle connections. The checked out connections
+        are closed when they are returned
+        """
+        with self.condition:
+            idle, self.idle = self.idle, deque()
+            self.max_lifetime = 0
+        for pooled in idle:
+            DB_POOL_CLOSED.labels(self.alias, "pool closed").inc()
+            pooled.connection.close()
+        self._report()
+
+    def _take_idle(self):
+        while self.idle:
+            # the most recently used connection is the least likely to be stale
+            pooled = self.idle.pop()
+            now = time.monotonic()
+            if now - pooled.created_at >= self.max_lifetime:
+                reason = "lifetime"
+            elif now - pooled.released_at >= self.health_check_interval and not self._ping(pooled.connection):
+                reason = "unhealthy"
+            else:
+                return pooled
+            DB_POOL_CLOSED.labels(self.alias, reason).inc()
+            pooled.connection.close()
+        return None
+
+    def _ping(self, connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _get_close_reason(self, pooled):
+        connection = pooled.connection
+        if connection.closed:
+            return "broken"
+        if time.monotonic() - pooled.created_at >= self.max_lifetime:
+            return "lifetime"
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return "broken"
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                return "broken"
+        return None
+
+    def _report(self):
+        DB_POOL_CONNECTIONS.labels(self.alias, "idle").set(len(self.idle))
+        DB_POOL_CONNECTIONS.labels(self.alias, "checked_out").set(len(self.checked_out))
+
+
+def get_pool(alias, conn_params, options) -> ConnectionPool:
+    """Helper function to get the pool of a database in the current process,
+    creating it on first use. Pools inherited from a parent process are
+    replaced
+
+    Args:
+        alias (str): alias of the database
+        conn_params (dict): the connection parameters, a pool is kept per database
+        options (dict): the POOL settings of the database
+    """
+    key = (
+        tuple(sorted((name, str(value)) for name, value in conn_params.items())),
+        tuple(sorted(options.items())),
+    )
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            pool = ConnectionPool(
+                alias,
+                max_size=options.get("MAX_SIZE", 10),
+                max_lifetime=options.get("MAX_LIFETIME", 1800),
+                health_check_interval=options.get("HEALTH_CHECK_INTERVAL", 30),
+                timeout=options.get("TIMEOUT", 10),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_pools(database_name=None):
+    """Helper function to close the pools of this process, e.g. before a
+    database is dropped
+
+    Args:
+        database_name (str, optional): only close the pools of this database.
+        Defaults to every pool.
+    """
+    with _pools_lock:
+        keys = [key for key in _pools if database_name is None or dict(key[0]).get("database") == database_name]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+def forget_inherited_connection(connection):
+    """Helper function to give up a connection that was opened by a parent
+    process without closing it
+    """
+    _inherited_connections.append(connection)
+
+
+def forget_inherited_pools():
+    """Helper function to drop the pools inherited from a parent process
+    without closing their connections. Runs in every forked child, such as
+    gunicorn workers and Celery prefork children
+    """
+    global _pools_lock
+    # the lock may have been held by another thread of the parent when it forked
+    _pools_lock = threading.Lock()
+    for key, pool in list(_pools.items()):
+        if pool.pid != os.getpid():
+            for pooled in [*pool.idle, *pool.checked_out.values()]:
+                forget_inherited_connection(pooled.connection)
+            del _pools[key]
+
+
+os.register_at_fork(after_in_child=forget_inherited_pools)
@@ -0,0 +1,75 @@
+"""PostgreSQL backend that reuses the connections of a process through a
+`core.db.pool.ConnectionPool` instead of opening one per request.
+
+Django still opens and closes the connection of every request or task,
+opening checks out a pooled connection and closing returns it. Enable it
+with `"ENGINE": "core.db.postgresql"` and configure the pool with the
+`POOL` key of the database settings:
+
+- `MAX_SIZE`: connections per process. Defaults to 10.
+- `MAX_LIFETIME`: seconds after which a connection is replaced. Defaults to 1800.
+- `HEALTH_CHECK_INTERVAL`: seconds a connection can be idle before it's
+  pinged on checkout. Defaults to 30.
+- `TIMEOUT`: seconds a checkout waits when every connection is in use.
+  Defaults to 10.
+"""
+import os
+
+from django.db.backends.postgresql import base, creation
+
+from core.db.pool import close_pools, forget_inherited_connection, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        # a test database left by a previous run may have to be dropped
+        close_pools(self._get_test_db_name())
+        return super()._create_test_db(verbosity, autoclobber, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # PostgreSQL can't drop a database while idle connections use it
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.pool_pid = None
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, conn_params, self.settings_dict.get("POOL", {}))
+        self.pool_pid = os.getpid()
+
+        def connect():
+            connection = super(DatabaseWrapper, self).get_new_connection(conn_params)
+            return connection, self.isolation_level
+
+        pooled = self.pool.checkout(connect)
+        self.isolation_level = pooled.isolation_level
+        return pooled.connection
+
+    def ensure_connection(self):
+        self.forget_inherited_connection()
+        super().ensure_connection()
+
+    def forget_inherited_connection(self):
+        """Method to give up, without closing it, a connection this wrapper
+        opened in a parent process before it forked
+        """
+        if self.connection is not None and self.pool_pid != os.getpid():
+            forget_inherited_connection(self.connection)
+            self.connection = None
+            self.pool = None
+
+    def _close(self):
+        self.forget_inherited_connection()
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # a connection closed in an atomic block stays referenced by this
+            # wrapper until the block exits, so it can't be reused by another
+            self.pool.release(self.connection, discard=self.in_atomic_block)
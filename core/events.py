@@ -0,0 +1,209 @@
+"""Domain events and the transactional outbox.
+
+Code that changes data publishes the events of the change with
+`publish_event` in the same transaction, so an event exists if and only if
+its change was committed. `dispatch_events` claims the pending events in
+batches with `SELECT ... FOR UPDATE SKIP LOCKED`, so that several
+dispatchers never claim the same event, and marks them PROCESSING with a
+lease of `OUTBOX_LEASE_SECONDS` on `available_at` in a short transaction.
+The handlers registered for their type with `event_handler` then run outside
+of it, one event at a time, and the result of each event is recorded on its
+own, so a slow handler, e.g. an email sent over SMTP, holds no locks. An
+event whose lease expired, because its dispatcher died, is claimed again.
+An event whose handler fails is retried with an exponential backoff, every
+handler of the event runs again, so handlers must be idempotent.
+
+The `dispatch_outbox_events` task dispatches the events after every commit
+that published some (`OUTBOX_DISPATCH_ON_COMMIT`) and on the beat schedule.
+"""
+import logging
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.metrics import OUTBOX_EVENTS
+from core.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+USER_INVITED = "user_invited"
+DEVELOPER_ASSIGNED = "developer_assigned"
+DEVELOPER_ROLLED_OFF = "developer_rolled_off"
+SKILL_RATING_CHANGED = "skill_rating_changed"
+PROJECT_UPDATED = "project_updated"
+
+# event type: handlers
+_handlers = defaultdict(list)
+
+
+class EventHandlerError(Exception):
+    """Raised by a handler to retry its event later, e.g. when an email
+    couldn't be sent
+    """
+
+
+def event_handler(event_type):
+    """Decorator to register a function as a handler of an event type. The
+    function is called with the `OutboxEvent`
+    """
+    def decorator(func):
+        _handlers[event_type].append(func)
+        return func
+    return decorator
+
+
+def get_handlers(event_type) -> list:
+    return list(_handlers[event_type])
+
+
+def publish_event(event_type, payload) -> OutboxEvent:
+    """Helper function to write an event to the outbox. Call it in the
+    transaction of the change, the event is dispatched once it's committed
+
+    Args:
+        event_type (str): type of the event, e.g. `USER_INVITED`
+        payload (dict): JSON serializable data of the event, e.g. primary keys
+    """
+    event = OutboxEvent.objects.create(event_type=event_type, payload=payload)
+    notify_dispatcher()
+    return event
+
+
+def publish_events(event_type, payloads) -> list:
+    """Helper function to write several events of a type to the outbox in
+    one query, see `publish_event`
+    """
+    events = OutboxEvent.objects.bulk_create(
+        [OutboxEvent(event_type=event_type, payload=payload) for payload in payloads]
+    )
+    if events:
+        notify_dispatcher()
+    return events
+
+
+def notify_dispatcher():
+    if settings.OUTBOX_DISPATCH_ON_COMMIT:
+        transaction.on_commit(start_dispatcher)
+
+
+def start_dispatcher():
+    from core.tasks import dispatch_outbox_events
+
+    try:
+        dispatch_outbox_events.apply_async(retry=False)
+    except Exception:
+        # the events stay pending until the next scheduled dispatch
+        logger.warning("[OUTBOX] Could not queue the dispatcher", exc_info=True)
+
+
+def handle_event(event) -> str:
+    """Helper function to call the handlers of a claimed event and set its
+    result on it. The handlers run in a transaction so that the writes of a
+    failed attempt are rolled back
+
+    Returns:
+        str: dispatched, retried or failed
+    """
+    now = timezone.now()
+    event.modify_date = now
+    try:
+        with transaction.atomic():
+            for handler in get_handlers(event.event_type):
+                handler(event)
+    except Exception as e:
+        event.last_error = f"{type(e).__name__}: {e}"
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            logger.exception(f"[OUTBOX] {event} failed {event.attempts} times, giving up")
+            event.status = OutboxEvent.FAILED
+            return "failed"
+        delay = min(settings.OUTBOX_RETRY_DELAY * 2 ** (event.attempts - 1), settings.OUTBOX_MAX_RETRY_DELAY)
+        logger.warning(f"[OUTBOX] {event} failed, retrying in {delay}s: {event.last_error}")
+        event.status = OutboxEvent.PENDING
+        event.available_at = now + timezone.timedelta(seconds=delay)
+        return "retried"
+
+    event.status = OutboxEvent.DISPATCHED
+    event.dispatched_at = now
+    return "dispatched"
+
+
+def claim_events(batch_size=None) -> list:
+    """Helper function to claim a batch of the events that are due, oldest
+    first: the pending events and those whose lease expired. They're marked
+    PROCESSING with a new lease and their attempt is counted. The events
+    whose lease expired on their last attempt are marked FAILED instead
+
+    Args:
+        batch_size (int, optional): maximum number of events. Defaults to
+        `OUTBOX_BATCH_SIZE`.
+
+    Returns:
+        list: the claimed events
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        OutboxEvent.objects.filter(
+            status=OutboxEvent.PROCESSING, available_at__lte=now, attempts__gte=settings.OUTBOX_MAX_ATTEMPTS
+        ).update(status=OutboxEvent.FAILED, last_error="The lease of the dispatcher expired", modify_date=now)
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[OutboxEvent.PENDING, OutboxEvent.PROCESSING], available_at__lte=now)
+            .order_by("available_at", "pk")[:batch_size or settings.OUTBOX_BATCH_SIZE]
+        )
+        lease = now + timezone.timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        for event in events:
+            event.status = OutboxEvent.PROCESSING
+            event.available_at = lease
+            event.attempts += 1
+            event.modify_date = now
+        OutboxEvent.objects.bulk_update(events, ["status", "available_at", "attempts", "modify_date"])
+    return events
+
+
+def dispatch_events(batch_size=None) -> dict:
+    """Function to claim a batch of the due events and dispatch them to their
+    handlers, see `claim_events`. The result of an event is recorded unless
+    its lease expired and another dispatcher claimed it again
+
+    Args:
+        batch_size (int, optional): maximum number of events. Defaults to
+        `OUTBOX_BATCH_SIZE`.
+
+    Returns:
+        dict: the number of events per result
+    """
+    results = Counter()
+    for event in claim_events(batch_size):
+        lease = event.available_at
+        result = handle_event(event)
+        recorded = OutboxEvent.objects.filter(pk=event.pk, status=OutboxEvent.PROCESSING, available_at=lease).update(
+            status=event.status,
+            available_at=event.available_at,
+            dispatched_at=event.dispatched_at,
+            last_error=event.last_error,
+            modify_date=event.modify_date,
+        )
+        if not recorded:
+            logger.warning(f"[OUTBOX] The lease of {event} expired before it was {result}")
+            result = "expired"
+        results[result] += 1
+        OUTBOX_EVENTS.labels(event.event_type, result).inc()
+    return dict(results)
+
+
+def purge_events(days=None) -> int:
+    """Helper function to delete the events dispatched more than `days` ago
+
+    Args:
+        days (int, optional): Defaults to `OUTBOX_RETENTION_DAYS`.
+
+    Returns:
+        int: the number of deleted events
+    """
+    days = settings.OUTBOX_RETENTION_DAYS if days is None else days
+    deleted, _ = OutboxEvent.objects.filter(
+        status=OutboxEvent.DISPATCHED, dispatched_at__lt=timezone.now() - timezone.timedelta(days=days)
+    ).delete()
+    return deleted
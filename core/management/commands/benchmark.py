@@ -0,0 +1,61 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from core.benchmarks import (BenchmarkError, asgi, compare_results,
+                             connections, endpoints, renderers, serializers,
+                             similarity, skill_gaps, staffing)
+
+SUITES = {
+    "asgi": asgi.run,
+    "connections": connections.run,
+    "endpoints": endpoints.run,
+    "renderers": renderers.run,
+    "serializers": serializers.run,
+    "similarity": similarity.run,
+    "skill_gaps": skill_gaps.run,
+    "staffing": staffing.run,
+}
+
+
+class Command(BaseCommand):
+    """Django command to run one of the benchmark suites and print or save
+    its results as JSON, optionally failing when they regress against a
+    stored baseline
+    """
+
+    help = "Run a benchmark suite and report the results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("suite", choices=sorted(SUITES))
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[1000], help="Number of rows of each run"
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Number of timed runs")
+        parser.add_argument("--output", help="Path of a file to write the JSON results to")
+        parser.add_argument("--baseline", help="Path of the JSON results of a previous run to compare against")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25, help="Allowed relative slowdown against the baseline"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = SUITES[options["suite"]](rows=options["rows"], repeat=options["repeat"])
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        report = json.dumps({"suite": options["suite"], "results": results}, indent=2)
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(report)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as baseline:
+                baseline_results = json.load(baseline)["results"]
+            regressions = compare_results(results, baseline_results, options["tolerance"])
+            if regressions:
+                raise CommandError("Performance regressions:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from core.schema import build_schema, get_code_version
+
+
+class Command(BaseCommand):
+    """Django command to build the OpenAPI schema of the current code version
+    before the server starts, so that no request has to wait for it
+    """
+
+    help = "Build the OpenAPI schema served by the docs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild the schema if it already exists")
+
+    def handle(self, *args, **options):
+        path = build_schema(force=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"OpenAPI schema of version {get_code_version()} at {path}"))
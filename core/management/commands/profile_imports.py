@@ -0,0 +1,83 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+# loads the application like a gunicorn worker and prints the warm up timings
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import acms.wsgi
+from core.warmup import get_warm_up_timings
+print(json.dumps({"startup_s": time.perf_counter() - start, "warm_up": get_warm_up_timings()}))
+"""
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_import_times(output) -> list:
+    """Helper function to parse the report of `python -X importtime`
+
+    Returns:
+        list: (module, self microseconds, cumulative microseconds, depth) tuples
+    """
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            modules.append((module, int(own), int(cumulative), len(indent) // 2))
+    return modules
+
+
+class Command(BaseCommand):
+    """Django command to report the time a new process takes to import and
+    warm up the application, with the slowest modules and packages
+    """
+
+    help = "Profile the imports and the warm up of the application"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20, help="Number of modules and packages listed")
+        parser.add_argument("--output", help="Path of a file to write the JSON report to")
+
+    def handle(self, *args, **options):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "acms.settings"},
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError(f"The application failed to start:\n{process.stderr[-2000:]}")
+
+        startup = json.loads(process.stdout.strip().splitlines()[-1])
+        modules = parse_import_times(process.stderr)
+        packages = Counter()
+        for module, own, cumulative, depth in modules:
+            packages[module.split(".")[0]] += own
+
+        limit = options["limit"]
+        report = {
+            "startup_s": round(startup["startup_s"], 3),
+            "imports_s": round(sum(own for _, own, _, _ in modules) / 1e6, 3),
+            "modules": len(modules),
+            "warm_up_s": startup["warm_up"],
+            "slowest_modules_ms": {
+                module: round(cumulative / 1000, 1)
+                for module, own, cumulative, depth in sorted(modules, key=lambda item: -item[2])[:limit]
+            },
+            "slowest_packages_ms": {package: round(own / 1000, 1) for package, own in packages.most_common(limit)},
+        }
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
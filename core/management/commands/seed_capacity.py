@@ -0,0 +1,74 @@
+import datetime
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from core.seeding import SEED_PASSWORD, OrganizationSeeder, clear_seeded_data
+
+
+class Command(BaseCommand):
+    """Django command to generate a synthetic organization with developers,
+    skills, ratings and projects to reproduce production volumes locally
+    """
+
+    help = "Generate a deterministic synthetic organization with bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--developers", type=int, default=1000, help="Number of developers")
+        parser.add_argument("--admins", type=int, default=2, help="Number of admins")
+        parser.add_argument("--project-managers", type=int, default=10, help="Number of project managers")
+        parser.add_argument("--categories", type=int, default=8, help="Number of skill categories")
+        parser.add_argument("--skills-per-category", type=int, default=10, help="Number of skills per category")
+        parser.add_argument("--ratings-per-developer", type=int, default=5, help="Number of rated skills per developer")
+        parser.add_argument("--projects", type=int, help="Number of projects. Defaults to a tenth of the developers")
+        parser.add_argument("--members-per-project", type=int, default=5, help="Number of developers per project")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator")
+        parser.add_argument("--chunk-size", type=int, default=10000, help="Number of rows per COPY")
+        parser.add_argument(
+            "--anchor-date",
+            type=datetime.date.fromisoformat,
+            help="Date that every generated date is relative to, YYYY-MM-DD. Defaults to 2023-01-02",
+        )
+        parser.add_argument(
+            "--skill-experience",
+            action="store_true",
+            help="Also link the skills used in the work experiences to skills and compute the years of experience",
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Delete the previously generated organization first"
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted = clear_seeded_data()
+            self.stdout.write(f"Deleted {deleted} generated users and their data")
+
+        if options["skills_per_category"] < 1 or options["categories"] < 1:
+            raise CommandError("At least one category with one skill is required.")
+
+        start = time.perf_counter()
+        seeder = OrganizationSeeder(
+            developers=options["developers"],
+            admins=options["admins"],
+            project_managers=options["project_managers"],
+            categories=options["categories"],
+            skills_per_category=options["skills_per_category"],
+            ratings_per_developer=options["ratings_per_developer"],
+            projects=options["projects"],
+            members_per_project=options["members_per_project"],
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            anchor_date=options["anchor_date"],
+            skill_experience=options["skill_experience"],
+        )
+        try:
+            counts = seeder.seed()
+        except Exception as e:
+            raise CommandError(f"Could not generate the organization, run with --clear if it already exists: {e}")
+
+        for model, count in counts.items():
+            self.stdout.write(f"{model}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Organization generated in {time.perf_counter() - start:.1f}s. "
+            f"Every user's password is {SEED_PASSWORD}"
+        ))
@@ -1,6 +1,6 @@
 import time
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
 from django.db import connections
 from django.db.utils import OperationalError
 
@@ -8,14 +8,25 @@ from django.db.utils import OperationalError
 class Command(BaseCommand):
     """Django command to pause execution until db is available"""
 
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Alias of the database to wait for")
+        parser.add_argument("--timeout", type=int, default=60, help="Seconds to wait before failing")
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database . . .")
-        db_connection = None
+        connection = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
 
-        while not db_connection:
+        while True:
             try:
-                db_connection = connections["default"]
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                break
             except OperationalError:
+                connection.close()
+                if time.monotonic() >= deadline:
+                    raise CommandError(f"Database unavailable after {options['timeout']} seconds")
                 self.stdout.write("Database unavailable, waiting 1 second . . .")
                 time.sleep(1)
+        connection.close()
         self.stdout.write(self.style.SUCCESS("Database available!"))
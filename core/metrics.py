@@ -0,0 +1,126 @@
+import os
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from core.cache import get_cache_stats
+
+# every gunicorn worker writes its samples to files in this directory when
+# it's set, see gunicorn.conf.py
+MULTIPROCESS_DIR_VARIABLE = "PROMETHEUS_MULTIPROC_DIR"
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+REQUEST_LATENCY = Histogram(
+    "acms_request_duration_seconds",
+    "Time spent handling a request",
+    ["view", "method"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    registry=REGISTRY,
+)
+RESPONSES = Counter(
+    "acms_responses",
+    "Responses by status code",
+    ["view", "method", "status"],
+    registry=REGISTRY,
+)
+DB_QUERIES = Histogram(
+    "acms_request_db_queries",
+    "Number of database queries of a request",
+    ["view", "method"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250, 500),
+    registry=REGISTRY,
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "acms_db_pool_connections",
+    "Connections of the database pools by state",
+    ["database", "state"],
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+DB_POOL_OPENED = Counter(
+    "acms_db_pool_opened_connections",
+    "Connections opened by the database pools",
+    ["database"],
+    registry=REGISTRY,
+)
+DB_POOL_CLOSED = Counter(
+    "acms_db_pool_closed_connections",
+    "Connections closed by the database pools by reason",
+    ["database", "reason"],
+    registry=REGISTRY,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "acms_db_pool_checkout_wait_seconds",
+    "Time spent getting a connection from a database pool",
+    ["database"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+    registry=REGISTRY,
+)
+DB_POOL_TIMEOUTS = Counter(
+    "acms_db_pool_timeouts",
+    "Checkouts that timed out because every connection was in use",
+    ["database"],
+    registry=REGISTRY,
+)
+
+DB_REPLICA_LAG = Gauge(
+    "acms_db_replica_lag_seconds",
+    "Replication lag of the read replica at its last check",
+    ["database"],
+    multiprocess_mode="max",
+    registry=REGISTRY,
+)
+
+OUTBOX_EVENTS = Counter(
+    "acms_outbox_events",
+    "Outbox events handled by the dispatcher by event type and result",
+    ["event_type", "result"],
+    registry=REGISTRY,
+)
+
+AUDIT_RECORDS = Counter(
+    "acms_audit_records",
+    "Audit log records by result of their bulk insert",
+    ["result"],
+    registry=REGISTRY,
+)
+
+
+class CacheStatsCollector:
+    """Collector that reads the hit and miss counters of the cached views at
+    scrape time. The counters live in the shared cache so every worker
+    reports the same values
+    """
+
+    def collect(self):
+        hits = CounterMetricFamily("acms_response_cache_hits", "Cached response hits", labels=["cache"])
+        misses = CounterMetricFamily("acms_response_cache_misses", "Cached response misses", labels=["cache"])
+        ratio = GaugeMetricFamily("acms_response_cache_hit_ratio", "Cached response hit ratio", labels=["cache"])
+        for namespace, stats in get_cache_stats().items():
+            hits.add_metric([namespace], stats["hits"])
+            misses.add_metric([namespace], stats["misses"])
+            ratio.add_metric([namespace], stats["hit_ratio"])
+        return [hits, misses, ratio]
+
+
+REGISTRY.register(CacheStatsCollector())
+
+
+def get_registry() -> CollectorRegistry:
+    """Helper function to get the registry to scrape. With several worker
+    processes the samples of every worker are read from the multiprocess
+    directory instead of the current process
+
+    Returns:
+        CollectorRegistry: the registry to expose
+    """
+    if not os.environ.get(MULTIPROCESS_DIR_VARIABLE):
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    registry.register(CacheStatsCollector())
+    return registry
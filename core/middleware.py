@@ -0,0 +1,129 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core.metrics import DB_QUERIES, REQUEST_LATENCY, RESPONSES
+from core.timing import record_request_timings, sql_timer
+
+logger = logging.getLogger("acms.requests")
+
+
+class QueryCounter:
+    """Database execute wrapper that counts queries"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class AsyncCapableMiddleware:
+    """Base class of the middleware that runs in both the WSGI and the ASGI
+    deployments, so that async views aren't run through a thread. Subclasses
+    return `self.__acall__(request)` from `__call__` when `self.is_async`,
+    by default async requests are passed on without instrumentation
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # tells Django to await the middleware, like MiddlewareMixin does
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Middleware that records the latency, status code and number of queries
+    of every request, labelled by the view that handled it. The queries of
+    async requests run in the ORM's threads and aren't counted
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        query_counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_counter))
+            response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        DB_QUERIES.labels(self.get_view(request), request.method).observe(query_counter.count)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    def get_view(self, request) -> str:
+        match = request.resolver_match
+        return match._func_path if match else "<unmatched>"
+
+    def observe(self, request, response, duration):
+        view = self.get_view(request)
+        REQUEST_LATENCY.labels(view, request.method).observe(duration)
+        RESPONSES.labels(view, request.method, response.status_code).inc()
+
+
+class RequestTimingMiddleware(AsyncCapableMiddleware):
+    """Middleware that measures the number of queries, the SQL time, the
+    serializer time and the renderer time of a sample of the requests.
+
+    The timings are added to the response as a `Server-Timing` header and
+    logged as one JSON line per request. `REQUEST_TIMING_SAMPLE_RATE` is the
+    fraction of requests that are measured, the others and async requests
+    aren't instrumented at all.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            timings = stack.enter_context(record_request_timings())
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sql_timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        if settings.REQUEST_TIMING_HEADER:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={timings.sql * 1000:.1f};desc="{timings.queries} queries"',
+                f"serializer;dur={timings.serializer * 1000:.1f}",
+                f"render;dur={timings.renderer * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ])
+        logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "route": request.resolver_match.route if request.resolver_match else None,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 1),
+            "db_queries": timings.queries,
+            "db_ms": round(timings.sql * 1000, 1),
+            "serializer_ms": round(timings.serializer * 1000, 1),
+            "renderer_ms": round(timings.renderer * 1000, 1),
+        }))
+        return response
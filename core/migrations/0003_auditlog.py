@@ -0,0 +1,94 @@
+# Generated by Django 4.1.7 on 2026-10-19 19:01
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# the model isn't managed, on PostgreSQL the table is partitioned by month and
+# a trigger rejects updates and deletes. The primary key of a partitioned
+# table must include the partition key, and the trigger is a statement
+# trigger since PostgreSQL 11 has no row triggers on partitioned tables
+CREATE_TABLE_SQL = """
+CREATE TABLE core_auditlog (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    actor_id bigint NULL,
+    action varchar(64) NOT NULL,
+    entity_type varchar(64) NOT NULL,
+    entity_id varchar(255) NOT NULL,
+    changes jsonb NOT NULL,
+    create_date timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, create_date)
+) PARTITION BY RANGE (create_date);
+CREATE INDEX core_auditlog_entity_idx ON core_auditlog (entity_type, entity_id, create_date DESC);
+CREATE INDEX core_auditlog_actor_idx ON core_auditlog (actor_id, create_date DESC);
+CREATE TABLE core_auditlog_default PARTITION OF core_auditlog DEFAULT;
+CREATE FUNCTION core_auditlog_append_only() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'core_auditlog is append-only';
+END;
+$$ LANGUAGE plpgsql;
+CREATE TRIGGER core_auditlog_append_only BEFORE UPDATE OR DELETE ON core_auditlog
+    FOR EACH STATEMENT EXECUTE FUNCTION core_auditlog_append_only();
+"""
+CREATE_PARTITION_SQL = (
+    "CREATE TABLE IF NOT EXISTS core_auditlog_{start:%Y_%m} PARTITION OF core_auditlog "
+    "FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+)
+DROP_TABLE_SQL = """
+DROP TABLE core_auditlog;
+DROP FUNCTION core_auditlog_append_only();
+"""
+
+
+def create_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.create_model(apps.get_model("core", "AuditLog"))
+        return
+
+    schema_editor.execute(CREATE_TABLE_SQL)
+    # the partitions of this month and the next two, `ensure_audit_partitions`
+    # creates the following ones
+    start = timezone.now().date().replace(day=1)
+    for _ in range(3):
+        end = (start + timezone.timedelta(days=32)).replace(day=1)
+        schema_editor.execute(CREATE_PARTITION_SQL.format(start=start, end=end))
+        start = end
+
+
+def drop_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.delete_model(apps.get_model("core", "AuditLog"))
+        return
+    schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0002_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=64)),
+                ('entity_type', models.CharField(max_length=64)),
+                ('entity_id', models.CharField(max_length=255)),
+                ('changes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('create_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date created')),
+                ('actor', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'core_auditlog',
+                'ordering': ['-create_date'],
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_table, drop_table),
+    ]
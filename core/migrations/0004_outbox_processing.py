@@ -0,0 +1,26 @@
+# Generated by Django 4.1.7 on 2026-10-19 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_auditlog'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboxevent',
+            name='core_outbox_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'PENDING'), ('PROCESSING', 'PROCESSING'), ('DISPATCHED', 'DISPATCHED'), ('FAILED', 'FAILED')], default='PENDING', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('status__in', ['PENDING', 'PROCESSING'])), fields=['available_at'], name='core_outbox_due_idx'),
+        ),
+    ]
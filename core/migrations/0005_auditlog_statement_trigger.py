@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# the row trigger created by the previous version of 0003 can't be created on
+# PostgreSQL 11, a statement trigger rejects the updates and deletes through
+# core_auditlog instead. Statement triggers of a partitioned table don't fire
+# for statements on its partitions, which the ORM never runs
+CREATE_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS core_auditlog_append_only ON core_auditlog;
+CREATE TRIGGER core_auditlog_append_only BEFORE UPDATE OR DELETE ON core_auditlog
+    FOR EACH STATEMENT EXECUTE FUNCTION core_auditlog_append_only();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_outbox_processing'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigger, migrations.RunPython.noop),
+    ]
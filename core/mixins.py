@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import (get_conditional_response, patch_vary_headers,
+                                quote_etag)
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from core.replicas import read_replica
+
+
+class ConditionalGetMixin:
+    """View mixin that adds `ETag` and `Last-Modified` headers to GET responses
+    and answers a matching `If-None-Match` with `304 Not Modified` before any
+    serializer runs.
+
+    The validators are computed in the database from the row count and
+    `MAX(modify_date)` of the view's queryset and of every relation listed in
+    `conditional_dependencies`, so that changes to nested objects also change
+    the ETag. Every model involved has to extend `TimestampMixin`.
+    """
+
+    conditional_dependencies = ()
+
+    def get_conditional_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_conditional_state(self):
+        """Method to compute the (count, last modified) pairs that identify
+        the current version of the response
+
+        Returns:
+            list: a list of (count, datetime) tuples or None if the response
+            can't be validated
+        """
+        queryset = self.get_conditional_queryset()
+        if queryset is None:
+            return None
+
+        state = [self._aggregate_state(queryset, "pk", "modify_date")]
+        for dependency in self.conditional_dependencies:
+            state.append(self._aggregate_state(queryset, dependency, f"{dependency}__modify_date"))
+        return state
+
+    def _aggregate_state(self, queryset, count_field, modify_date_field):
+        result = queryset.aggregate(
+            count=Count(count_field, distinct=True), modify_date=Max(modify_date_field)
+        )
+        return result["count"], result["modify_date"]
+
+    def get_conditional_validators(self):
+        """Method to build the ETag and last modified date of the response
+
+        Returns:
+            tuple: the quoted ETag and the last modified datetime or None if
+            the response can't be validated
+        """
+        state = self.get_conditional_state()
+        if state is None:
+            return None
+
+        user = self.request.user
+        fingerprint = [self.__class__.__name__, self.request.get_full_path(), str(user.pk)]
+        for count, modify_date in state:
+            fingerprint.append(f"{count}:{modify_date.isoformat() if modify_date else ''}")
+        etag = hashlib.md5("|".join(fingerprint).encode()).hexdigest()
+
+        modify_dates = [modify_date for count, modify_date in state if modify_date]
+        return quote_etag(etag), max(modify_dates, default=None)
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_conditional_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        # deleting rows doesn't move MAX(modify_date) forward so only the ETag
+        # is used to decide whether the client's copy is still fresh
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """`ConditionalGetMixin` for views that return a single object. The
+    object itself is validated without an extra query
+    """
+
+    def get_conditional_state(self):
+        instance = self.get_object()
+        if instance is None:
+            return None
+        # the response is built from the same instance instead of fetching it again
+        self.get_object = lambda: instance
+
+        state = [(1, instance.modify_date)]
+        if self.conditional_dependencies:
+            queryset = type(instance)._default_manager.filter(pk=instance.pk)
+            for dependency in self.conditional_dependencies:
+                state.append(self._aggregate_state(queryset, dependency, f"{dependency}__modify_date"))
+        return state
+
+
+class FlatListMixin:
+    """List view mixin that serializes the page with a `FlatSerializer`
+    instead of instantiating the view's serializer for every object.
+
+    Only the primary keys of the page are selected with the view's filters,
+    ordering and pagination, the page is then loaded in one query per
+    relation. The output is the same as the view's serializer.
+    """
+
+    flat_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset.values_list("pk", flat=True))
+        if page is not None:
+            return self.get_paginated_response(self.flat_serializer.serialize_pks(list(page)))
+
+        return Response(self.flat_serializer.serialize(queryset))
+
+
+class ReadReplicaMixin:
+    """View mixin that runs the GET requests of the view on the read replica,
+    see `core.replicas.read_replica`. The user is authenticated on the
+    primary first so that users who just wrote keep reading from it. The
+    block is entered after `initial` and exited in `finalize_response`, so it
+    covers the handler of views that define their own `get`
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in ("GET", "HEAD"):
+            self.replica_block = ExitStack()
+            self.replica_block.enter_context(read_replica(request.user))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica_block = self.__dict__.pop("replica_block", None)
+        if replica_block is not None:
+            replica_block.close()
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class AsyncViewMixin:
+    """APIView mixin that serves the view as an async view in the ASGI
+    deployment. Handlers defined with `async def` run on the event loop,
+    the view's sync handlers run in Django's database thread like any sync
+    view. Authentication, permissions and throttling also run there since
+    they may query the database.
+
+    Async handlers must not use the ORM synchronously: use the async
+    queryset methods or `sync_to_async`, and send blocking I/O such as SMTP
+    or S3 calls to `sync_to_async(..., thread_sensitive=False)` so that it
+    doesn't hold the database thread.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -1,4 +1,7 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 
 class TimestampMixin(models.Model):
@@ -11,3 +14,92 @@ class TimestampMixin(models.Model):
 
     class Meta:
         abstract = True
+
+
+class RequestProfile(TimestampMixin, models.Model):
+    """Model class for the cProfile stats and the SQL log of a request that
+    an admin profiled, see `core.profiling.ProfilerMiddleware`
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="request_profiles"
+    )
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    sql_ms = models.FloatField()
+    sql_log = models.JSONField(default=list)
+    stats = models.BinaryField()
+    summary = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-create_date"]
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path} - {self.create_date:%Y-%m-%d %H:%M:%S}"
+
+
+class OutboxEvent(TimestampMixin, models.Model):
+    """Model class for a domain event written in the transaction of the
+    change it records and dispatched to its handlers once committed, see
+    `core.events`
+    """
+
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    DISPATCHED = "DISPATCHED"
+    FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (PENDING, "PENDING"),
+        (PROCESSING, "PROCESSING"),
+        (DISPATCHED, "DISPATCHED"),
+        (FAILED, "FAILED"),
+    ]
+
+    event_type = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # the next time the event may be dispatched, pushed back after every failed attempt.
+    # While it's processed, the end of the lease of its dispatcher
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-create_date"]
+        indexes = [
+            models.Index(
+                fields=["available_at"], condition=models.Q(status__in=["PENDING", "PROCESSING"]), name="core_outbox_due_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_type} {self.pk} - {self.status}"
+
+
+class AuditLog(models.Model):
+    """Model class for an append-only record of a change: who assigned
+    whom, rating changes and role changes. The table is partitioned by month
+    of `create_date` and a trigger rejects updates and deletes, so it isn't
+    managed by Django, see the migration and `core.audit`
+    """
+
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+"
+    )
+    action = models.CharField(max_length=64)
+    entity_type = models.CharField(max_length=64)
+    entity_id = models.CharField(max_length=255)
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    create_date = models.DateTimeField("date created", default=timezone.now)
+
+    class Meta:
+        managed = False
+        db_table = "core_auditlog"
+        ordering = ["-create_date"]
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.entity_type} {self.entity_id} - {self.create_date:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,164 @@
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from core.middleware import AsyncCapableMiddleware
+
+logger = logging.getLogger("acms.nplusone")
+
+_allowed = ContextVar("nplusone_allowed", default=False)
+
+# only the frames of the project are reported, without these modules
+IGNORED_FRAMES = ("site-packages", "dist-packages", "core/nplusone.py", "core/middleware.py", "core/timing.py")
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+VALUE_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)")
+
+
+class NPlusOneError(Exception):
+    """Raised when a query shape is repeated within a request in the tests"""
+
+
+def normalize_sql(sql) -> str:
+    """Helper function to reduce a query to its shape by replacing literals
+    and lists of parameters, so that queries that only differ by their
+    values are the same
+
+    Args:
+        sql (str): the SQL of the query, with or without parameters
+
+    Returns:
+        str: the shape of the query
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    return VALUE_LIST.sub("(...)", sql)
+
+
+def get_call_site() -> list:
+    """Helper function to get the frames of the project's code that issued
+    the current query, innermost last
+    """
+    base_dir = str(settings.BASE_DIR)
+    return [
+        f"{frame.filename}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir) and not any(ignored in frame.filename for ignored in IGNORED_FRAMES)
+    ]
+
+
+class QueryShapeTracker:
+    """Database execute wrapper that counts the SELECT queries of every shape
+    and keeps the call site of the first repetition of each shape
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.call_sites = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not _allowed.get() and sql.lstrip()[:6].upper() == "SELECT":
+            shape = normalize_sql(sql)
+            self.counts[shape] += 1
+            if self.counts[shape] == 2:
+                self.call_sites[shape] = get_call_site()
+        return execute(sql, params, many, context)
+
+    def get_repeated_queries(self, threshold, allowlist=()) -> list:
+        """Method to list the shapes that ran at least `threshold` times and
+        don't match any pattern of the allowlist
+
+        Returns:
+            list: (shape, count, call site) tuples, most repeated first
+        """
+        repeated = []
+        for shape, count in self.counts.most_common():
+            if count < threshold:
+                break
+            call_site = self.call_sites.get(shape, [])
+            searched = [shape, *call_site]
+            if any(re.search(pattern, text) for pattern in allowlist for text in searched):
+                continue
+            repeated.append((shape, count, call_site))
+        return repeated
+
+
+def format_report(repeated, label="") -> str:
+    lines = [f"Repeated queries{f' in {label}' if label else ''}:"]
+    for shape, count, call_site in repeated:
+        lines.append(f"\n{count} x {shape}")
+        lines.extend(f"    {frame}" for frame in call_site)
+    return "\n".join(lines)
+
+
+@contextmanager
+def detect_nplusone(label="", mode=None, threshold=None):
+    """Context manager that reports the query shapes that ran at least
+    `NPLUSONE_THRESHOLD` times within the block
+
+    Args:
+        label (str, optional): name of the block in the report, e.g. the path
+        of the request. Defaults to "".
+        mode (str, optional): "raise" to raise NPlusOneError, "log" to log a
+        warning or "off". Defaults to the NPLUSONE_MODE setting.
+        threshold (int, optional): number of runs of a shape that are reported.
+        Defaults to the NPLUSONE_THRESHOLD setting.
+
+    Raises:
+        NPlusOneError: if a shape is repeated and the mode is "raise"
+    """
+    mode = mode or settings.NPLUSONE_MODE
+    if mode == "off":
+        yield
+        return
+
+    tracker = QueryShapeTracker()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(tracker))
+        yield tracker
+
+    repeated = tracker.get_repeated_queries(
+        threshold or settings.NPLUSONE_THRESHOLD, settings.NPLUSONE_ALLOWLIST
+    )
+    if not repeated:
+        return
+    report = format_report(repeated, label)
+    if mode == "raise":
+        raise NPlusOneError(report)
+    logger.warning(report)
+
+
+@contextmanager
+def allow_nplusone():
+    """Context manager for code whose repeated queries are intentional, they
+    aren't counted by the detector
+    """
+    token = _allowed.set(True)
+    try:
+        yield
+    finally:
+        _allowed.reset(token)
+
+
+class NPlusOneMiddleware(AsyncCapableMiddleware):
+    """Middleware that detects repeated query shapes within a sync request,
+    see `detect_nplusone`
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if settings.NPLUSONE_MODE == "off":
+            return self.get_response(request)
+
+        with detect_nplusone(label=f"{request.method} {request.path}"):
+            response = self.get_response(request)
+        return response
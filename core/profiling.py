@@ -0,0 +1,132 @@
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+from accounts.models import User
+from core.middleware import AsyncCapableMiddleware
+from core.models import RequestProfile
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY_PARAM = "_profile"
+PROFILE_TOKEN_SALT = "core.profiling"
+# number of functions in the text summary of a profile
+SUMMARY_LIMIT = 40
+
+
+def get_profile_token(user) -> str:
+    """Helper function to sign a token that profiles the requests it is sent
+    with, for `PROFILER_TOKEN_MAX_AGE` seconds
+
+    Args:
+        user (User): the admin who requested the token
+
+    Returns:
+        str: the signed token
+    """
+    return signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).sign(str(user.pk))
+
+
+def get_profiling_user(token):
+    """Helper function to get the admin who signed a profile token
+
+    Args:
+        token (str): the token sent with the request
+
+    Returns:
+        User: the admin, or None if the token is invalid or expired
+    """
+    try:
+        pk = signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).unsign(token, max_age=settings.PROFILER_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=pk, role=User.ADMIN, is_active=True).first()
+
+
+def get_path_without_token(request) -> str:
+    query_params = request.GET.copy()
+    query_params.pop(PROFILE_QUERY_PARAM, None)
+    return f"{request.path}?{query_params.urlencode()}" if query_params else request.path
+
+
+class SQLLog:
+    """Database execute wrapper that records every query with its parameters
+    and duration
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "sql": sql,
+                "params": repr(params),
+                "many": many,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    @property
+    def duration_ms(self) -> float:
+        return round(sum(query["duration_ms"] for query in self.queries), 3)
+
+
+class ProfilerMiddleware(AsyncCapableMiddleware):
+    """Middleware that runs a request under cProfile when it carries a profile
+    token signed for an admin, in the `X-Profile-Token` header or the
+    `_profile` query param. The profile and the SQL log of the request are
+    stored as a `RequestProfile` that can be downloaded from the admin site.
+
+    Requests without a token only pay for the header lookup. Async requests
+    aren't profiled.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        token = request.headers.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM)
+        if not token:
+            return self.get_response(request)
+
+        user = get_profiling_user(token)
+        if user is None:
+            return self.get_response(request)
+        return self.profile(request, user)
+
+    def profile(self, request, user):
+        profiler = cProfile.Profile()
+        sql_log = SQLLog()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sql_log))
+            response = profiler.runcall(self.get_response, request)
+        duration = time.perf_counter() - start
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(SUMMARY_LIMIT)
+        request_profile = RequestProfile.objects.create(
+            user=user,
+            method=request.method,
+            path=get_path_without_token(request)[:2048],
+            status_code=response.status_code,
+            duration_ms=round(duration * 1000, 3),
+            query_count=len(sql_log.queries),
+            sql_ms=sql_log.duration_ms,
+            sql_log=sql_log.queries,
+            stats=marshal.dumps(stats.stats),
+            summary=summary.getvalue(),
+        )
+        response["X-Profile-Id"] = str(request_profile.pk)
+        return response
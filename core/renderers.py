@@ -1,5 +1,18 @@
+import json
+
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
 from rest_framework.renderers import JSONRenderer
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+SUCCESS_ENVELOPE_PREFIX = b'{"data":'
+SUCCESS_ENVELOPE_SUFFIX = b',"status":"success"}'
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
 
 class CustomJSONRenderer(JSONRenderer):
     """Custom JSON Renderer class to reformat the JSON response adding the `data`
@@ -25,3 +38,63 @@ class CustomJSONRenderer(JSONRenderer):
 
         # Call the base render method to serialize the data
         return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONRenderer(CustomJSONRenderer):
+    """JSON Renderer class that produces the same JSend output as
+    `CustomJSONRenderer` but encodes the data with orjson, falling back to
+    the standard library when orjson isn't installed or can't encode the data.
+
+    The envelope of successful responses is written around the encoded data
+    instead of wrapping the data in another dict. Indented output is left to
+    `CustomJSONRenderer`.
+    """
+
+    orjson_options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        context = renderer_context or {}
+        if self.get_indent(accepted_media_type, context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if renderer_context is not None and renderer_context["response"].status_code < 400:
+            return SUCCESS_ENVELOPE_PREFIX + self.encode(data) + SUCCESS_ENVELOPE_SUFFIX
+        if data is None:
+            return b""
+        return self.encode(data)
+
+    def encode(self, data) -> bytes:
+        """Method to encode data into compact JSON the same way DRF's
+        JSONRenderer does
+
+        Args:
+            data (object): the data to be encoded
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        content = None
+        if orjson is not None and self.compact and not self.ensure_ascii:
+            try:
+                # datetimes are passed through to DRF's encoder to keep its format
+                content = orjson.dumps(
+                    data, default=self.encoder_class().default, option=self.orjson_options
+                )
+            except orjson.JSONEncodeError:
+                content = None
+
+        if content is None:
+            content = json.dumps(
+                data,
+                cls=self.encoder_class,
+                ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict,
+                separators=SHORT_SEPARATORS if self.compact else LONG_SEPARATORS,
+            ).encode()
+
+        # keep the output a strict javascript subset like DRF's JSONRenderer.
+        # Both separators start with 0xE2 and looking for a single byte is
+        # much cheaper than searching or copying the whole content twice
+        if b"\xe2" in content and (LINE_SEPARATOR in content or PARAGRAPH_SEPARATOR in content):
+            content = content.replace(LINE_SEPARATOR, b"\\u2028").replace(PARAGRAPH_SEPARATOR, b"\\u2029")
+        return content
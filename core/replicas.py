@@ -0,0 +1,173 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from core.metrics import DB_REPLICA_LAG
+from core.middleware import AsyncCapableMiddleware
+
+logger = logging.getLogger("acms.replica")
+
+PINNED_KEY = "replica:pinned:{}"
+
+_use_replica = ContextVar("use_replica", default=False)
+# alias: (monotonic time of the check, whether the replica can be read)
+_replica_checks = {}
+
+POSTGRESQL_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def get_replica_lag(alias) -> float:
+    """Helper function to measure how far behind the primary a replica is.
+    A replica that replayed everything it received isn't lagging, even when
+    the primary hasn't written for a while
+
+    Args:
+        alias (str): alias of the replica
+
+    Returns:
+        float: the lag in seconds, 0 for databases that aren't replicated
+        with streaming replication such as SQLite
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRESQL_LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def is_replica_available(alias) -> bool:
+    """Helper function to check that a replica is reachable and less than
+    `REPLICA_MAX_LAG` seconds behind. The result is kept for
+    `REPLICA_CHECK_INTERVAL` seconds so that reads don't wait for a check
+    """
+    checked_at, available = _replica_checks.get(alias, (None, False))
+    if checked_at is not None and time.monotonic() - checked_at < settings.REPLICA_CHECK_INTERVAL:
+        return available
+
+    try:
+        lag = get_replica_lag(alias)
+    except DatabaseError:
+        logger.warning(f"[REPLICA] {alias} is unreachable, reading from the primary", exc_info=True)
+        available = False
+    else:
+        DB_REPLICA_LAG.labels(alias).set(lag)
+        available = lag <= settings.REPLICA_MAX_LAG
+        if not available:
+            logger.warning(f"[REPLICA] {alias} is {lag:.1f}s behind, reading from the primary")
+    _replica_checks[alias] = (time.monotonic(), available)
+    return available
+
+
+def pin_to_primary(user):
+    """Helper function to send the reads of a user to the primary for
+    `REPLICA_STICKY_SECONDS` seconds after they wrote, so that they see
+    their changes before the replica has replayed them
+    """
+    cache.set(PINNED_KEY.format(user.pk), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user) -> bool:
+    return bool(user and user.is_authenticated and cache.get(PINNED_KEY.format(user.pk)))
+
+
+@contextmanager
+def read_replica(user=None):
+    """Context manager, or decorator, that sends the reads of the block to the
+    `REPLICA_DATABASE`. Reads still go to the primary when no replica is
+    configured, when it lags, inside a transaction of the primary and
+    for a user who just wrote
+
+    Args:
+        user (User, optional): the user the block reads for. Defaults to None.
+    """
+    if not settings.REPLICA_DATABASE or is_pinned_to_primary(user):
+        yield
+        return
+
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def read_primary():
+    """Context manager that sends the reads of the block to the primary, even
+    within a `read_replica` block
+    """
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Database router that sends the reads of `read_replica` blocks to the
+    `REPLICA_DATABASE` and everything else to the primary. The replica is
+    never migrated, it is kept up to date by the database's replication
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+            and is_replica_available(settings.REPLICA_DATABASE)
+        ):
+            return settings.REPLICA_DATABASE
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # objects read from the replica are saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaStickinessMiddleware(AsyncCapableMiddleware):
+    """Middleware that pins the authenticated user of every successful write
+    request to the primary, see `pin_to_primary`
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.is_write(request, response):
+            pin_to_primary(request.user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.is_write(request, response):
+            await sync_to_async(pin_to_primary)(request.user)
+        return response
+
+    def is_write(self, request, response) -> bool:
+        # DRF sets the user it authenticated on the request
+        user = getattr(request, "user", None)
+        return (
+            settings.REPLICA_DATABASE
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        )
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import tempfile
+import threading
+from functools import lru_cache
+
+import drf_yasg
+import rest_framework
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+from acms.settings_utils import get_env_variable
+
+API_INFO = openapi.Info(
+    title="ACMS API Documentation",
+    default_version="v1",
+    description=(
+        "This is a collection of all available APIs for "
+        "the AmaliTech Capacity Management System"
+    ),
+    terms_of_service="http://localhost/",
+    contact=openapi.Contact(email="cms@amalitech.com"),
+    license=openapi.License(name="BSD License"),
+)
+API_URL = get_env_variable("DEFAULT_URL", "https://acms-api.amalitech-dev.net/")
+
+# directories whose files can't change the schema
+IGNORED_DIRECTORIES = {"__pycache__", "migrations", "tests", "staticfiles", "venv", "node_modules"}
+
+_schema = {}
+_schema_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_code_version() -> str:
+    """Helper function to identify the version of the code that the schema is
+    generated from: the `CODE_VERSION` setting, e.g. the commit that was
+    deployed, or a hash of the project's Python files and of the versions
+    of DRF and drf_yasg
+
+    Returns:
+        str: the version
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+
+    digest = hashlib.md5(f"{rest_framework.VERSION}|{drf_yasg.__version__}".encode())
+    for root, directories, files in os.walk(settings.BASE_DIR):
+        directories[:] = sorted(
+            directory for directory in directories
+            if not directory.startswith(".") and directory not in IGNORED_DIRECTORIES
+        )
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, settings.BASE_DIR).encode())
+                with open(path, "rb") as source:
+                    digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def get_schema_path(version=None) -> str:
+    return os.path.join(settings.OPENAPI_SCHEMA_DIR, f"openapi-{version or get_code_version()}.json")
+
+
+def generate_schema() -> bytes:
+    """Helper function to introspect every view and serializer into the
+    public OpenAPI schema of the API
+
+    Returns:
+        bytes: the schema as JSON
+    """
+    generator = OpenAPISchemaGenerator(API_INFO, url=API_URL)
+    return OpenAPICodecJson(validators=[]).encode(generator.get_schema(request=None, public=True))
+
+
+def build_schema(force=False) -> str:
+    """Helper function to write the schema of the current code version to
+    `OPENAPI_SCHEMA_DIR`, unless it was already built
+
+    Args:
+        force (bool, optional): regenerate an existing schema. Defaults to False.
+
+    Returns:
+        str: the path of the schema
+    """
+    path = get_schema_path()
+    if force or not os.path.exists(path):
+        content = generate_schema()
+        os.makedirs(settings.OPENAPI_SCHEMA_DIR, exist_ok=True)
+        # the workers of a server may build it at once, none of them reads a partial file
+        descriptor, temporary_path = tempfile.mkstemp(dir=settings.OPENAPI_SCHEMA_DIR, suffix=".json")
+        with os.fdopen(descriptor, "wb") as temporary_file:
+            temporary_file.write(content)
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    return path
+
+
+def get_prebuilt_schema():
+    """Helper function to load the schema of the current code version, built
+    on first use if the `build_schema` command didn't run. It's kept in
+    memory for the life of the process
+
+    Returns:
+        tuple: the schema as JSON and its ETag
+    """
+    version = get_code_version()
+    if version not in _schema:
+        with _schema_lock:
+            if version not in _schema:
+                with open(build_schema(), "rb") as schema_file:
+                    content = schema_file.read()
+                etag = f'"{version}-{hashlib.md5(content).hexdigest()[:16]}"'
+                _schema[version] = (content, etag)
+    return _schema[version]
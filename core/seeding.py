@@ -0,0 +1,473 @@
+import csv
+import datetime
+import io
+import json
+import random
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.models import DeveloperProfile, Education, User, WorkExperience
+from core.cache import (DEVELOPER_PROFILES_TAG, PROJECTS_TAG, SKILLS_TAG,
+                        USERS_TAG, invalidate_tags_on_commit)
+from projects.models import Project
+from skills.models import (Category, DeveloperSkillExperience, Skill,
+                           SkillRating, WorkExperienceSkill)
+from skills.utils import (get_experience_years, get_skill_dictionary,
+                          match_skills)
+
+# every seeded user has an email on this domain and every seeded category,
+# skill and project has a slug with this prefix so that they can be cleared
+SEED_EMAIL_DOMAIN = "seed.amalitech.org"
+SEED_SLUG_PREFIX = "seed-"
+SEED_PASSWORD = "Password1"
+
+TAXONOMY = {
+    "Backend": ["Python", "Django", "Java", "Spring", "Node", "Go", "PHP", "Laravel", "Ruby", "Rails"],
+    "Frontend": ["React", "Vue", "Angular", "TypeScript", "CSS", "Svelte", "Next", "Redux", "Sass", "HTML"],
+    "Mobile": ["Kotlin", "Swift", "Flutter", "React Native", "Android", "iOS", "Dart", "Ionic", "Xamarin", "SwiftUI"],
+    "DevOps": ["AWS", "Docker", "Kubernetes", "Terraform", "Ansible", "Azure", "GCP", "Jenkins", "Linux", "Nginx"],
+    "Data": ["SQL", "PostgreSQL", "Spark", "Pandas", "Airflow", "Kafka", "MongoDB", "Redis", "dbt", "Tableau"],
+    "Quality": ["Selenium", "Cypress", "Jest", "Pytest", "JUnit", "Postman", "Playwright", "Appium", "JMeter", "k6"],
+    "Design": ["Figma", "Sketch", "Illustrator", "Photoshop", "InVision", "Zeplin", "Framer", "Miro", "XD", "Canva"],
+    "Management": ["Scrum", "Kanban", "Jira", "Confluence", "SAFe", "PRINCE2", "Roadmaps", "OKRs", "Budgets", "Hiring"],
+}
+SCHOOLS = [
+    "Kwame Nkrumah University of Science and Technology",
+    "University of Ghana",
+    "Ashesi University",
+    "University of Rwanda",
+    "Technische Universität Dresden",
+]
+PROGRAMS = ["BSc. Computer Science", "BSc. Computer Engineering", "BSc. Information Technology", "BSc. Mathematics"]
+COMPANIES = ["AmaliTech", "Turntabl", "Hubtel", "Andela", "MTN", "Vodafone", "Irembo", "Zeepay"]
+JOB_TITLES = ["Software Developer", "Frontend Developer", "Backend Developer", "DevOps Engineer", "QA Engineer"]
+COUNTRIES = ["GH", "RW", "DE", "NG", "KE"]
+
+
+class OrganizationSeeder:
+    """Generates a synthetic organization: users per role, developer profiles
+    with education, work experience and skill ratings, a category and skill
+    taxonomy, and projects whose members overlap.
+
+    Every value comes from a `random.Random(seed)` and dates are relative to
+    the anchor date, so two runs with the same options produce the same
+    rows. The large tables are written with postgres `COPY` in chunks and
+    their primary keys are reserved from their sequences up front. Signals
+    aren't sent, the cached responses are invalidated once at the end.
+
+    The skills of the work experiences and the years of experience per skill
+    are only generated with `skill_experience`, they double the rows to write
+    and check.
+    """
+
+    def __init__(
+        self,
+        developers=1000,
+        admins=2,
+        project_managers=10,
+        categories=8,
+        skills_per_category=10,
+        ratings_per_developer=5,
+        projects=None,
+        members_per_project=5,
+        seed=0,
+        chunk_size=10000,
+        anchor_date=None,
+        skill_experience=False,
+    ):
+        self.developers = developers
+        self.admins = admins
+        self.project_managers = max(project_managers, 1)
+        self.categories = categories
+        self.skills_per_category = skills_per_category
+        self.ratings_per_developer = ratings_per_developer
+        self.projects = developers // 10 if projects is None else projects
+        self.members_per_project = members_per_project
+        self.chunk_size = chunk_size
+        self.anchor_date = anchor_date or datetime.date(2023, 1, 2)
+        self.timestamp = timezone.make_aware(datetime.datetime.combine(self.anchor_date, datetime.time()))
+        self.skill_experience = skill_experience
+        self.random = random.Random(seed)
+
+    @transaction.atomic
+    def seed(self) -> dict:
+        """Method to generate the organization
+
+        Returns:
+            dict: the number of rows created per model
+        """
+        skills = self.seed_taxonomy()
+        # the skills were copied without signals, the cached skill dictionary misses them
+        invalidate_tags_on_commit(SKILLS_TAG)
+        user_ids = self.seed_users()
+        developer_user_ids = user_ids[User.DEVELOPER]
+        projects, memberships = self.plan_projects(developer_user_ids, user_ids[User.PROJECT_MANAGER])
+        profile_ids = self.seed_developer_profiles(developer_user_ids, projects, memberships)
+        counts = {
+            "users": sum(len(ids) for ids in user_ids.values()),
+            "developer_profiles": len(profile_ids),
+            "categories": self.categories,
+            "skills": len(skills),
+            "educations": self.seed_educations(profile_ids),
+        }
+        work_experiences = self.seed_work_experiences(profile_ids, skills)
+        counts.update({
+            "work_experiences": len(work_experiences),
+            "work_experience_skills": self.seed_skill_experience(work_experiences) if self.skill_experience else 0,
+            "skill_ratings": self.seed_skill_ratings(profile_ids, skills),
+            "projects": len(projects),
+        })
+        counts["project_members"] = self.seed_projects(projects, memberships, profile_ids, skills)
+        analyze_tables()
+
+        invalidate_tags_on_commit(USERS_TAG, DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
+        return counts
+
+    def seed_taxonomy(self) -> list:
+        """Method to create the categories and their skills
+
+        Returns:
+            list: (slug, name) tuples of the skills
+        """
+        category_names = list(TAXONOMY)
+        category_rows = []
+        skill_rows = []
+        for index in range(self.categories):
+            base_name = category_names[index % len(category_names)]
+            name = base_name if index < len(category_names) else f"{base_name} {index // len(category_names)}"
+            category_slug = f"{SEED_SLUG_PREFIX}{slugify(name)}"
+            category_rows.append((category_slug, f"Seed {name}", self.timestamp, self.timestamp))
+
+            base_skills = TAXONOMY[base_name]
+            for skill_index in range(self.skills_per_category):
+                skill_name = base_skills[skill_index % len(base_skills)]
+                if skill_index >= len(base_skills) or name != base_name:
+                    skill_name = f"{skill_name} {index}.{skill_index}"
+                skill_rows.append((
+                    f"{SEED_SLUG_PREFIX}{slugify(skill_name)}", f"S {skill_name}"[:20], category_slug,
+                    self.timestamp, self.timestamp,
+                ))
+
+        copy_rows(Category, ["slug", "name", "create_date", "modify_date"], category_rows, self.chunk_size)
+        copy_rows(
+            Skill, ["slug", "name", "category_id", "create_date", "modify_date"], skill_rows, self.chunk_size
+        )
+        return [(slug, name) for slug, name, *rest in skill_rows]
+
+    def seed_users(self) -> dict:
+        password = make_password(SEED_PASSWORD)
+        roles = [
+            (User.ADMIN, "admin", self.admins),
+            (User.PROJECT_MANAGER, "manager", self.project_managers),
+            (User.DEVELOPER, "developer", self.developers),
+        ]
+        user_ids = {}
+        rows = []
+        for role, prefix, count in roles:
+            ids = reserve_ids(User, count)
+            user_ids[role] = ids
+            for index, pk in enumerate(ids):
+                rows.append((
+                    pk, password, f"First {index}", f"Last {index}", self.timestamp, self.timestamp,
+                    self.timestamp, f"{prefix}{index}@{SEED_EMAIL_DOMAIN}", role, True, "{}",
+                    self.random.choice(COUNTRIES), False, False, "",
+                ))
+
+        fields = [
+            "id", "password", "first_name", "last_name", "date_joined", "create_date", "modify_date",
+            "email", "role", "is_active", "profile_photo_variants", "country", "is_superuser", "is_staff",
+            "profile_photo",
+        ]
+        copy_rows(User, fields, rows, self.chunk_size)
+        return user_ids
+
+    def plan_projects(self, developer_user_ids, manager_ids):
+        """Method to pick the dates, creator and members of every project.
+        Members are drawn from a window that slides by less than its size so
+        that consecutive projects share developers
+        """
+        projects = []
+        memberships = []
+        window = max(self.members_per_project * 2, 1)
+        step = max(self.members_per_project // 2, 1)
+        for index in range(self.projects):
+            start_date = self.anchor_date - datetime.timedelta(days=self.random.randrange(180))
+            end_date = start_date + datetime.timedelta(days=self.random.randrange(30, 270))
+            projects.append({
+                "slug": f"{SEED_SLUG_PREFIX}project-{index}",
+                "name": f"Seed project {index}",
+                "start_date": start_date,
+                "end_date": end_date,
+                "created_by_id": self.random.choice(manager_ids),
+            })
+            offset = (index * step) % max(len(developer_user_ids) - window, 1)
+            candidates = range(offset, min(offset + window, len(developer_user_ids)))
+            members = self.random.sample(candidates, min(self.members_per_project, len(candidates)))
+            memberships.append(sorted(members))
+        return projects, memberships
+
+    def seed_developer_profiles(self, developer_user_ids, projects, memberships) -> list:
+        current_projects = {}
+        for project, members in zip(projects, memberships):
+            for member in members:
+                if project["end_date"] >= self.anchor_date:
+                    current_projects[member] = project
+
+        profile_ids = reserve_ids(DeveloperProfile, len(developer_user_ids))
+        rows = []
+        for index, (pk, user_id) in enumerate(zip(profile_ids, developer_user_ids)):
+            project = current_projects.get(index)
+            rows.append((
+                pk, user_id, self.timestamp, self.timestamp, project is None, "{}",
+                project["start_date"] if project else None, project["end_date"] if project else None,
+                self.random.choice(DeveloperProfile.EMPLOYMENT_STATUS_CHOICES)[0],
+                self.random.choice(DeveloperProfile.JOB_INFORMATION_CHOICES)[0],
+                project["name"] if project else "",
+            ))
+
+        fields = [
+            "id", "user_id", "create_date", "modify_date", "availability", "occupied",
+            "current_project_start_date", "current_project_end_date", "employment_status",
+            "job_information", "current_project",
+        ]
+        copy_rows(DeveloperProfile, fields, rows, self.chunk_size)
+        return profile_ids
+
+    def seed_educations(self, profile_ids) -> int:
+        rows = []
+        for profile_id in profile_ids:
+            for _ in range(self.random.randint(1, 2)):
+                start_year = self.random.randrange(2008, 2019)
+                rows.append((
+                    profile_id, self.timestamp, self.timestamp, self.random.choice(SCHOOLS),
+                    self.random.choice(PROGRAMS), datetime.date(start_year, 9, 1), datetime.date(start_year + 4, 7, 31),
+                ))
+        fields = ["developer_profile_id", "create_date", "modify_date", "school_name", "program", "start_date", "end_date"]
+        return copy_rows(Education, fields, rows, self.chunk_size, reserve=True)
+
+    def seed_work_experiences(self, profile_ids, skills) -> list:
+        """Method to create one to three work experiences per developer
+
+        Returns:
+            list: (id, developer profile id, skills used, start date, end date) tuples
+        """
+        skill_names = [name for slug, name in skills]
+        rows = []
+        for profile_id in profile_ids:
+            for _ in range(self.random.randint(1, 3)):
+                start_date = self.anchor_date - datetime.timedelta(days=self.random.randrange(365, 3650))
+                end_date = start_date + datetime.timedelta(days=self.random.randrange(90, 1095))
+                rows.append((
+                    profile_id, self.timestamp, self.timestamp, self.random.choice(JOB_TITLES),
+                    self.random.choice(COMPANIES), self.random.sample(skill_names, min(3, len(skill_names))),
+                    start_date, min(end_date, self.anchor_date),
+                ))
+        rows = [(pk, *row) for pk, row in zip(reserve_ids(WorkExperience, len(rows)), rows)]
+        fields = [
+            "id", "developer_profile_id", "create_date", "modify_date", "job_title", "company_name", "skills_used",
+            "start_date", "end_date",
+        ]
+        copy_rows(WorkExperience, fields, rows, self.chunk_size)
+        return [(pk, profile_id, skills_used, start, end) for pk, profile_id, _, _, _, _, skills_used, start, end in rows]
+
+    def seed_skill_experience(self, work_experiences) -> int:
+        """Method to link the skills used in the work experiences to skills
+        and to compute the years of experience per skill like
+        `skills.utils.sync_skill_experience`, from the seeded rows instead of
+        reading them back
+
+        Returns:
+            int: the number of links
+        """
+        dictionary = get_skill_dictionary()
+        # the seeded skills used are drawn from the skill names, each is matched once
+        matches = {}
+        links, periods = [], defaultdict(list)
+        for pk, profile_id, skills_used, start_date, end_date in work_experiences:
+            for name in skills_used:
+                if name not in matches:
+                    matches[name] = match_skills([name], dictionary)
+            for slug in dict.fromkeys(slug for name in skills_used for slug in matches[name]):
+                links.append((pk, profile_id, slug))
+                periods[profile_id, slug].append((start_date, end_date))
+
+        # nothing references these rows, their primary keys are left to the table's default
+        copy_rows(WorkExperienceSkill, ["work_experience_id", "developer_profile_id", "skill_id"], links, self.chunk_size)
+        experiences = [
+            (profile_id, slug, get_experience_years(skill_periods), max(end for _, end in skill_periods))
+            for (profile_id, slug), skill_periods in periods.items()
+        ]
+        copy_rows(
+            DeveloperSkillExperience, ["developer_profile_id", "skill_id", "years", "last_used"], experiences,
+            self.chunk_size,
+        )
+        return len(links)
+
+    def seed_skill_ratings(self, profile_ids, skills) -> int:
+        """Method to rate a few skills per developer. Ratings follow a
+        triangular distribution between 1 and 5 that peaks at 3 and skills
+        earlier in a category are picked more often
+        """
+        weights = [1 / (index % self.skills_per_category + 1) for index in range(len(skills))]
+        rows = []
+        for profile_id in profile_ids:
+            rated = set()
+            for skill_slug, skill_name in self.random.choices(skills, weights=weights, k=self.ratings_per_developer):
+                if skill_slug in rated:
+                    continue
+                rated.add(skill_slug)
+                rows.append((
+                    profile_id, skill_slug, self.timestamp, self.timestamp,
+                    round(self.random.triangular(1, 5, 3) * 2) / 2, "",
+                ))
+        fields = ["developer_profile_id", "skill_id", "create_date", "modify_date", "rating", "comment"]
+        return copy_rows(SkillRating, fields, rows, self.chunk_size, reserve=True)
+
+    def seed_projects(self, projects, memberships, profile_ids, skills) -> int:
+        rows = [
+            (
+                project["slug"], project["name"], f"{project['name']} for the capacity dataset",
+                project["start_date"], project["end_date"], project["created_by_id"], self.timestamp, self.timestamp,
+            )
+            for project in projects
+        ]
+        fields = ["slug", "name", "description", "start_date", "end_date", "created_by_id", "create_date", "modify_date"]
+        copy_rows(Project, fields, rows, self.chunk_size)
+
+        member_rows = [
+            (project["slug"], profile_ids[member])
+            for project, members in zip(projects, memberships)
+            for member in members
+        ]
+        copy_rows(Project.members.through, ["project_id", "developerprofile_id"], member_rows, self.chunk_size, reserve=True)
+
+        skill_rows = [
+            (project["slug"], skill_slug)
+            for project in projects
+            for skill_slug, skill_name in self.random.sample(skills, min(3, len(skills)))
+        ]
+        copy_rows(Project.required_skills.through, ["project_id", "skill_id"], skill_rows, self.chunk_size, reserve=True)
+        return len(member_rows)
+
+
+def clear_seeded_data() -> int:
+    """Helper function to delete every row created by the seeder. Rows are
+    deleted in SQL without loading them or sending signals
+
+    Returns:
+        int: the number of seeded users that were deleted
+    """
+    users = User.objects.filter(email__endswith=f"@{SEED_EMAIL_DOMAIN}")
+    profiles = DeveloperProfile.objects.filter(user__in=users)
+    projects = Project.objects.filter(slug__startswith=SEED_SLUG_PREFIX)
+    skills = Skill.objects.filter(slug__startswith=SEED_SLUG_PREFIX)
+    querysets = [
+        Project.members.through.objects.filter(developerprofile__in=profiles),
+        Project.members.through.objects.filter(project__in=projects),
+        Project.required_skills.through.objects.filter(project__in=projects),
+        Project.required_skills.through.objects.filter(skill__in=skills),
+        WorkExperienceSkill.objects.filter(developer_profile__in=profiles),
+        WorkExperienceSkill.objects.filter(skill__in=skills),
+        DeveloperSkillExperience.objects.filter(developer_profile__in=profiles),
+        DeveloperSkillExperience.objects.filter(skill__in=skills),
+        SkillRating.objects.filter(developer_profile__in=profiles),
+        SkillRating.objects.filter(skill__in=skills),
+        Education.objects.filter(developer_profile__in=profiles),
+        WorkExperience.objects.filter(developer_profile__in=profiles),
+        projects,
+        Project.objects.filter(created_by__in=users),
+        profiles,
+        skills,
+        Category.objects.filter(slug__startswith=SEED_SLUG_PREFIX),
+    ]
+    # fresh statistics keep the planner from nested loops over the seeded rows
+    analyze_tables()
+    with transaction.atomic():
+        for queryset in querysets:
+            queryset._raw_delete(queryset.db)
+        deleted = users._raw_delete(users.db)
+        invalidate_tags_on_commit(USERS_TAG, DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
+    return deleted
+
+
+SEEDED_MODELS = [
+    User, DeveloperProfile, Education, WorkExperience, Category, Skill, SkillRating, Project,
+    Project.members.through, Project.required_skills.through, WorkExperienceSkill, DeveloperSkillExperience,
+]
+
+
+def analyze_tables():
+    """Helper function to refresh the planner statistics of the seeded tables"""
+    tables = ", ".join(f'"{model._meta.db_table}"' for model in SEEDED_MODELS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {tables}")
+
+
+def reserve_ids(model, count) -> list:
+    """Helper function to take `count` primary keys from the sequence of a
+    model's table so that related rows can be written before the table
+    """
+    if not count:
+        return []
+    table = model._meta.db_table
+    column = model._meta.pk.column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)", [table, column, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_rows(model, fields, rows, chunk_size=10000, reserve=False) -> int:
+    """Helper function to write rows to a model's table with `COPY`
+
+    Args:
+        model (Model): the model of the table
+        fields (list): attribute names of the fields, in the order of the rows
+        rows (list): tuples of python values
+        chunk_size (int, optional): number of rows per `COPY`. Defaults to 10000.
+        reserve (bool, optional): whether to prepend a primary key taken from
+        the table's sequence to every row. Defaults to False.
+
+    Returns:
+        int: the number of rows written
+    """
+    opts = model._meta
+    model_fields = [opts.get_field(field) for field in fields]
+    columns = [f'"{field.column}"' for field in model_fields]
+    if reserve:
+        columns.insert(0, f'"{opts.pk.column}"')
+    # every value is quoted, FORCE_NULL reads the empty values of nullable
+    # columns as NULL
+    null_columns = [f'"{field.column}"' for field in model_fields if field.null]
+    options = f", FORCE_NULL ({', '.join(null_columns)})" if null_columns else ""
+    sql = f'COPY "{opts.db_table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv{options})'
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            if reserve:
+                chunk = [(pk, *row) for pk, row in zip(reserve_ids(model, len(chunk)), chunk)]
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+            writer.writerows([to_copy_value(value) for value in row] for row in chunk)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+    return len(rows)
+
+
+def to_copy_value(value):
+    """Helper function to convert a python value to its `COPY` csv text"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, list):
+        return "{" + ",".join('"' + item.replace("\\", "\\\\").replace('"', '\\"') + '"' for item in value) + "}"
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
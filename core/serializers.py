@@ -0,0 +1,259 @@
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601
+
+from core.models import AuditLog
+from core.timing import timed
+
+# fields whose `to_representation` returns database values unchanged
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.EmailField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.ReadOnlyField,
+    serializers.SlugField,
+    serializers.URLField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class FlatSerializer:
+    """Read-only serializer that produces the same output as a DRF
+    ModelSerializer from `.values_list()` projections instead of model
+    instances.
+
+    The serializer's fields are inspected once and compiled into a function
+    that turns a database row into a dict. Nested serializers and many
+    relations are fetched with one query per relation for the whole list,
+    so the number of queries doesn't grow with the number of rows.
+
+    Supported fields are plain model fields, forward foreign keys (as a
+    primary key or a nested serializer), reverse foreign keys and forward
+    many to many relations (as a list of primary keys or a nested
+    serializer). Relations are ordered by their primary key.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self._compiled = None
+
+    def serialize(self, queryset) -> list:
+        """Method to serialize every object of a queryset, in the order of
+        the queryset
+
+        Args:
+            queryset (QuerySet): a queryset of the serializer's model
+
+        Returns:
+            list: a list of dicts like `serializer_class(queryset, many=True).data`
+        """
+        return [data for row, data in self._serialize_rows(queryset)]
+
+    def serialize_pks(self, pks) -> list:
+        """Method to serialize the objects with the given primary keys, in the
+        order of the primary keys. Used to serialize a page of primary keys
+
+        Args:
+            pks (list): primary keys of the objects
+
+        Returns:
+            list: a list of serialized objects
+        """
+        objects = self.serialize_map(self.model._default_manager.filter(pk__in=pks))
+        return [objects[pk] for pk in pks if pk in objects]
+
+    def serialize_map(self, queryset) -> dict:
+        pk_index = self.compiled["pk_index"]
+        return {row[pk_index]: data for row, data in self._serialize_rows(queryset)}
+
+    def serialize_groups(self, queryset, group_field) -> dict:
+        """Method to serialize a queryset grouped by the value of a field,
+        e.g. the foreign key of a reverse relation
+
+        Returns:
+            dict: mapping of the field value to a list of serialized objects
+        """
+        groups = defaultdict(list)
+        for row, data in self._serialize_rows(queryset, extra_fields=[group_field]):
+            groups[row[-1]].append(data)
+        return groups
+
+    @property
+    def compiled(self) -> dict:
+        if self._compiled is None:
+            self._compiled = self._compile()
+        return self._compiled
+
+    def _serialize_rows(self, queryset, extra_fields=()):
+        with timed("serializer"):
+            return self._build_rows(queryset, extra_fields)
+
+    def _build_rows(self, queryset, extra_fields):
+        compiled = self.compiled
+        rows = list(queryset.values_list(*compiled["value_fields"], *extra_fields))
+        if not rows:
+            return []
+
+        pk_index = compiled["pk_index"]
+        lookups = [relation(rows, pk_index) for relation in compiled["relations"]]
+        build = compiled["build"]
+        converters = compiled["converters"]
+        return [(row, build(row, converters, lookups)) for row in rows]
+
+    def _compile(self) -> dict:
+        """Method to turn the serializer's fields into a list of database
+        columns, relation loaders and a generated row-to-dict function
+        """
+        opts = self.model._meta
+        value_fields = []
+        converters = []
+        relations = []
+        expressions = []
+
+        def add_value_field(name):
+            if name not in value_fields:
+                value_fields.append(name)
+            return value_fields.index(name)
+
+        pk_index = add_value_field(opts.pk.name)
+
+        for field_name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+            if source == "*" or "." in source:
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{field_name} can't be flattened."
+                )
+            model_field = opts.get_field(source)
+
+            if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+                relations.append(self._compile_many_relation(field, model_field))
+                expression = f"lookups[{len(relations) - 1}].get(row[{pk_index}]) or []"
+            elif isinstance(field, serializers.BaseSerializer):
+                index = add_value_field(source)
+                relations.append(ForeignKeyLoader(FlatSerializer(type(field)), index))
+                expression = f"lookups[{len(relations) - 1}].get(row[{index}]) if row[{index}] is not None else None"
+            else:
+                index = add_value_field(source)
+                expression = self._compile_value(field, index, converters)
+            expressions.append(f"{field_name!r}: {expression}")
+
+        namespace = {}
+        exec(f"def build(row, converters, lookups):\n    return {{{', '.join(expressions)}}}\n", namespace)
+        return {
+            "value_fields": value_fields,
+            "pk_index": pk_index,
+            "converters": converters,
+            "relations": relations,
+            "build": namespace["build"],
+        }
+
+    def _compile_value(self, field, index, converters) -> str:
+        if type(field) in IDENTITY_FIELDS:
+            return f"row[{index}]"
+        if type(field) is serializers.ListField and type(field.child) in IDENTITY_FIELDS:
+            return f"row[{index}]"
+
+        if type(field) is serializers.DateField and getattr(field, "format", ISO_8601) == ISO_8601:
+            converters.append(date_to_representation)
+        else:
+            converters.append(field.to_representation)
+        converter = f"converters[{len(converters) - 1}]"
+        if isinstance(field, serializers.ChoiceField):
+            # choice fields such as django-countries' CountryField also
+            # represent empty values
+            return f"{converter}(row[{index}])"
+        return f"{converter}(row[{index}]) if row[{index}] is not None else None"
+
+    def _compile_many_relation(self, field, model_field):
+        if model_field.many_to_many and not model_field.auto_created:
+            through = model_field.remote_field.through
+            source = through._meta.get_field(model_field.m2m_field_name()).attname
+            target = through._meta.get_field(model_field.m2m_reverse_field_name()).attname
+            if isinstance(field, serializers.ManyRelatedField):
+                return ManyToManyLoader(through, source, target)
+            return ManyToManyLoader(through, source, target, FlatSerializer(type(field.child)))
+        if model_field.one_to_many and isinstance(field, serializers.ListSerializer):
+            return ReverseForeignKeyLoader(FlatSerializer(type(field.child)), model_field.field.attname)
+        raise ImproperlyConfigured(
+            f"{self.serializer_class.__name__}.{field.field_name} can't be flattened."
+        )
+
+
+def date_to_representation(value):
+    return value.isoformat()
+
+
+class ForeignKeyLoader:
+    """Loads the nested objects of a forward foreign key for a list of rows"""
+
+    def __init__(self, flat_serializer, index):
+        self.flat_serializer = flat_serializer
+        self.index = index
+
+    def __call__(self, rows, pk_index) -> dict:
+        pks = {row[self.index] for row in rows if row[self.index] is not None}
+        if not pks:
+            return {}
+        model = self.flat_serializer.model
+        return self.flat_serializer.serialize_map(model._base_manager.filter(pk__in=pks))
+
+
+class ReverseForeignKeyLoader:
+    """Loads the nested objects of a reverse foreign key for a list of rows"""
+
+    def __init__(self, flat_serializer, foreign_key):
+        self.flat_serializer = flat_serializer
+        self.foreign_key = foreign_key
+
+    def __call__(self, rows, pk_index) -> dict:
+        model = self.flat_serializer.model
+        queryset = model._default_manager.filter(
+            **{f"{self.foreign_key}__in": [row[pk_index] for row in rows]}
+        ).order_by("pk")
+        return self.flat_serializer.serialize_groups(queryset, self.foreign_key)
+
+
+class ManyToManyLoader:
+    """Loads a many to many relation for a list of rows, either as a list of
+    primary keys or as nested objects
+    """
+
+    def __init__(self, through, source, target, flat_serializer=None):
+        self.through = through
+        self.source = source
+        self.target = target
+        self.flat_serializer = flat_serializer
+
+    def __call__(self, rows, pk_index) -> dict:
+        pairs = self.through._default_manager.filter(
+            **{f"{self.source}__in": [row[pk_index] for row in rows]}
+        ).order_by("pk").values_list(self.source, self.target)
+
+        groups = defaultdict(list)
+        if self.flat_serializer is None:
+            for source, target in pairs:
+                groups[source].append(target)
+            return groups
+
+        pairs = list(pairs)
+        model = self.flat_serializer.model
+        objects = self.flat_serializer.serialize_map(
+            model._default_manager.filter(pk__in={target for source, target in pairs})
+        )
+        for source, target in pairs:
+            groups[source].append(objects[target])
+        return groups
+
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditLog
+        fields = ("id", "actor", "action", "entity_type", "entity_id", "changes", "create_date")
@@ -0,0 +1,48 @@
+from celery import shared_task
+from django.conf import settings
+
+from core.audit import ensure_audit_partitions
+from core.events import dispatch_events, purge_events
+
+
+@shared_task
+def dispatch_outbox_events(max_batches=10):
+    """Celery task to dispatch the pending events of the outbox, batch after
+    batch until a batch isn't full, see `core.events`
+
+    Args:
+        max_batches (int, optional): maximum number of batches. Defaults to 10.
+
+    Returns:
+        dict: the number of events per result
+    """
+    totals = {}
+    for _ in range(max_batches):
+        results = dispatch_events()
+        for result, count in results.items():
+            totals[result] = totals.get(result, 0) + count
+        if sum(results.values()) < settings.OUTBOX_BATCH_SIZE:
+            break
+    return totals
+
+
+@shared_task
+def purge_outbox_events():
+    """Celery task to delete the events dispatched more than
+    `OUTBOX_RETENTION_DAYS` days ago
+
+    Returns:
+        int: the number of deleted events
+    """
+    return purge_events()
+
+
+@shared_task
+def create_audit_partitions():
+    """Celery task to create the monthly partitions of the audit log of the
+    next `AUDIT_PARTITION_MONTHS_AHEAD` months
+
+    Returns:
+        list: the months that have a partition, as ISO dates
+    """
+    return [month.isoformat() for month in ensure_audit_partitions()]
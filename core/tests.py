@@ -0,0 +1,1017 @@
+import datetime
+import decimal
+import json
+import marshal
+import os
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import (DatabaseError, OperationalError, connection,
+                       connections, transaction)
+from django.db.models import Prefetch
+from django.db.utils import load_backend
+from django.test import (SimpleTestCase, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from accounts.models import DeveloperProfile, Education, User, WorkExperience
+from accounts.serializers import DeveloperProfileSerializer
+from accounts.tests.factories import UserFactory
+from core import audit, events, schema
+from core.benchmarks import compare_results, endpoints
+from core.benchmarks.renderers import build_profile_payload
+from core.db.pool import close_pools
+from core.management.commands.profile_imports import parse_import_times
+from core.metrics import DB_POOL_CLOSED, DB_POOL_OPENED, DB_POOL_TIMEOUTS
+from core.models import AuditLog, OutboxEvent, RequestProfile
+from core.nplusone import (NPlusOneError, allow_nplusone, detect_nplusone,
+                           normalize_sql)
+from core.profiling import PROFILE_HEADER, get_profile_token
+from core.renderers import CustomJSONRenderer, FastJSONRenderer
+from core.replicas import _replica_checks, is_pinned_to_primary, read_replica
+from core.serializers import FlatSerializer
+from core.tasks import create_audit_partitions, dispatch_outbox_events
+from core.warmup import (get_template_names, get_warm_up_timings, is_warmed_up,
+                         warm_up_application, warm_up_database)
+from projects import staffing
+from projects.models import Project
+from projects.serializers import ProjectSerializer
+from projects.tests.factories import ProjectFactory
+from skills import similarity
+from skills.models import (DeveloperSkillExperience, Skill, SkillRating,
+                           WorkExperienceSkill)
+from skills.serializers import ListSkillRatingsSerializer
+from skills.tests.factories import (CategoryFactory, SkillFactory,
+                                    SkillRatingFactory)
+from skills.utils import sync_skill_experience
+
+
+class FastJSONRendererTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.payloads = [
+            build_profile_payload(5),
+            {"count": 1, "results": [{"rating": decimal.Decimal("3.5"), "name": _("ADMIN")}]},
+            {"date": datetime.date(2023, 5, 16), "time": datetime.datetime(2023, 5, 16, 9, 55, 12, 123456, tzinfo=datetime.timezone.utc)},
+            {1: "non string key", "text": "line\u2028separator – paragraph\u2029"},
+            None,
+            [],
+        ]
+
+    def assertRendersLikeCustomRenderer(self, status_code):
+        renderer_context = {"response": Response(status=status_code)}
+        for payload in self.payloads:
+            expected = CustomJSONRenderer().render(payload, "application/json", renderer_context)
+            rendered = FastJSONRenderer().render(payload, "application/json", renderer_context)
+            self.assertEqual(rendered, expected)
+
+    def test_success_responses_match_custom_renderer(self):
+        """Test that successful responses are wrapped in the same JSend envelope"""
+        self.assertRendersLikeCustomRenderer(200)
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render([1], "application/json", {"response": Response(status=201)})),
+            {"data": [1], "status": "success"},
+        )
+
+    def test_error_responses_match_custom_renderer(self):
+        """Test that error responses are rendered without the envelope"""
+        self.assertRendersLikeCustomRenderer(400)
+
+    def test_stdlib_fallback_matches_custom_renderer(self):
+        """Test that the output is the same when orjson isn't installed"""
+        with mock.patch("core.renderers.orjson", None):
+            self.assertRendersLikeCustomRenderer(200)
+
+    def test_indented_output_matches_custom_renderer(self):
+        """Test that a requested indent is honoured"""
+        renderer_context = {"response": Response(status=200)}
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            FastJSONRenderer().render(self.payloads[1], media_type, renderer_context),
+            CustomJSONRenderer().render(self.payloads[1], media_type, renderer_context),
+        )
+
+
+class BenchmarkCommandTestCase(SimpleTestCase):
+    def test_renderers_benchmark_reports_both_renderers(self):
+        """Test that the renderers benchmark times both renderers"""
+        stdout = StringIO()
+        call_command("benchmark", "renderers", "--rows", "10", "--repeat", "1", stdout=stdout)
+
+        results = json.loads(stdout.getvalue())["results"]["10"]
+        self.assertIn("CustomJSONRenderer", results)
+        self.assertIn("FastJSONRenderer", results)
+        self.assertIn("speedup", results)
+
+    def test_compare_results_reports_slower_and_query_regressions(self):
+        """Test that only slowdowns beyond the tolerance and extra queries regress"""
+        baseline = {"1000": {"user-list": {"queries": 4, "median_ms": 10.0}, "login": {"queries": 4, "median_ms": 10.0}}}
+        results = {"1000": {"user-list": {"queries": 5, "median_ms": 12.0}, "login": {"queries": 4, "median_ms": 14.0}}}
+
+        self.assertEqual(
+            compare_results(results, baseline, tolerance=0.25),
+            ["1000 > user-list: 5 queries, baseline 4", "1000 > login: median 14.0ms, baseline 10.0ms"],
+        )
+
+
+class EndpointBenchmarkTestCase(TestCase):
+    def test_every_endpoint_is_benchmarked(self):
+        """Test that the endpoints suite covers every route and counts queries"""
+        with self.settings(ALLOWED_HOSTS=["testserver"]):
+            results = endpoints.run(rows=[10], repeat=1, use_test_database=False)["10"]
+
+        self.assertEqual(set(results), {name for name, *rest in endpoints.REQUESTS})
+        self.assertTrue(all(result["queries"] > 0 for result in results.values()))
+
+
+class FlatSerializerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        category = CategoryFactory.create()
+        cls.skills = [
+            SkillFactory.create(name="Python Django", slug="python-django", category=category),
+            SkillFactory.create(name="React", slug="react", category=category),
+        ]
+        cls.creator = UserFactory.create(email="manager@amalitech.org", role=User.PROJECT_MANAGER, country="GH")
+        cls.creator.groups.add(Group.objects.create(name="staffing"))
+        cls.profiles = []
+        for index in range(3):
+            user = UserFactory.create(email=f"dev{index}@amalitech.org", role=User.DEVELOPER, first_name=f"Dev {index}")
+            profile = user.developer_profile.first()
+            profile.occupied = {"weeks": [index]}
+            profile.current_project_end_date = "2023-06-30"
+            profile.save()
+            Education.objects.create(
+                developer_profile=profile, school_name="Ashesi University", program="BSc. Computer Science",
+                start_date="2015-09-01", end_date="2019-07-31",
+            )
+            for company_name in ["AmaliTech", "Meta"][:index]:
+                WorkExperience.objects.create(
+                    developer_profile=profile, job_title="Developer", company_name=company_name,
+                    skills_used=["Python", "Django"], start_date="2020-01-06", end_date="2022-12-16",
+                )
+            for skill in cls.skills[:index]:
+                SkillRatingFactory.create(skill=skill, developer_profile=profile, rating=index + 0.5)
+            cls.profiles.append(profile)
+
+        project = ProjectFactory.create(name="Capacity", required_skills=cls.skills, members=cls.profiles[1:])
+        project.created_by = cls.creator
+        project.save()
+        ProjectFactory.create(name="Bench", required_skills=cls.skills[:1])
+
+    def assertMatchesSerializer(self, serializer_class, queryset):
+        queryset = queryset.order_by("pk")
+        expected = json.loads(json.dumps(serializer_class(queryset, many=True).data))
+        self.assertEqual(FlatSerializer(serializer_class).serialize(queryset), expected)
+
+    def test_developer_profiles_match_serializer(self):
+        """Test that flattened developer profiles match the DRF serializer"""
+        self.assertMatchesSerializer(DeveloperProfileSerializer, DeveloperProfile.objects.all())
+
+    def test_projects_match_serializer(self):
+        """Test that flattened projects with nested members match the DRF serializer"""
+        # the members are loaded in the order they were added, which is the
+        # order of their pks here, DRF loads them in no particular order
+        members = Prefetch("members", queryset=DeveloperProfile.objects.order_by("pk"))
+        self.assertMatchesSerializer(ProjectSerializer, Project.objects.prefetch_related(members))
+
+    def test_skill_ratings_match_serializer(self):
+        """Test that flattened skill ratings match the DRF serializer"""
+        self.assertMatchesSerializer(ListSkillRatingsSerializer, SkillRating.objects.all())
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Test that every relation is loaded with a single query"""
+        with self.assertNumQueries(13):
+            FlatSerializer(ProjectSerializer).serialize(Project.objects.all())
+
+    def test_serialize_pks_keeps_the_order_of_the_pks(self):
+        """Test that a page of primary keys is serialized in order"""
+        pks = [profile.pk for profile in reversed(self.profiles)]
+        data = FlatSerializer(DeveloperProfileSerializer).serialize_pks(pks)
+        self.assertEqual([profile["id"] for profile in data], pks)
+
+
+class SeedCapacityCommandTestCase(TestCase):
+    def seed(self, *args):
+        call_command(
+            "seed_capacity", "--developers", "40", "--projects", "6", "--categories", "9", *args, stdout=StringIO()
+        )
+        return list(SkillRating.objects.order_by("developer_profile__user__email", "skill").values_list(
+            "developer_profile__user__email", "skill", "rating"
+        ))
+
+    def test_seed_capacity_generates_the_organization(self):
+        """Test that every role, profile relation and project membership is generated"""
+        self.seed()
+
+        self.assertEqual(User.objects.filter(role=User.DEVELOPER).count(), 40)
+        self.assertEqual(User.objects.filter(role=User.PROJECT_MANAGER).count(), 10)
+        self.assertEqual(DeveloperProfile.objects.count(), 40)
+        self.assertFalse(DeveloperProfile.objects.filter(education=None).exists())
+        self.assertFalse(DeveloperProfile.objects.filter(work_experience=None).exists())
+        self.assertEqual(Skill.objects.count(), 90)
+        self.assertFalse(WorkExperienceSkill.objects.exists())
+        self.assertTrue(all(project.members.count() == 5 for project in Project.objects.all()))
+        self.assertTrue(User.objects.get(email="developer0@seed.amalitech.org").check_password("Password1"))
+
+    def test_seed_capacity_generates_the_skill_experience(self):
+        """Test that the skills of the work experiences and the years of
+        experience are generated like `sync_skill_experience` computes them
+        """
+        self.seed("--skill-experience")
+
+        def get_rows():
+            return (
+                sorted(WorkExperienceSkill.objects.values_list("work_experience", "developer_profile", "skill")),
+                sorted(DeveloperSkillExperience.objects.values_list("developer_profile", "skill", "years", "last_used")),
+            )
+
+        seeded = get_rows()
+        # every seeded skills_used entry is the name of a seeded skill
+        self.assertEqual(len(seeded[0]), sum(len(row.skills_used) for row in WorkExperience.objects.all()))
+        sync_skill_experience(list(DeveloperProfile.objects.values_list("pk", flat=True)))
+        self.assertEqual(get_rows(), seeded)
+
+    def test_seed_capacity_is_deterministic(self):
+        """Test that the same seed generates the same data after clearing it"""
+        ratings = self.seed()
+        self.assertEqual(self.seed("--clear"), ratings)
+        self.assertNotEqual(self.seed("--clear", "--seed", "1"), ratings)
+
+
+class RequestTimingMiddlewareTestCase(TestCase):
+    def setUp(self) -> None:
+        category = CategoryFactory.create()
+        SkillFactory.create(name="Python Django", slug="python-django", category=category)
+        self.client = APIClient()
+        self.client.force_authenticate(UserFactory.create(email="admin@amalitech.org", role=User.ADMIN))
+        self.url = reverse("skills:list-create-skills")
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0, REQUEST_TIMING_HEADER=True)
+    def test_sampled_requests_are_timed(self):
+        """Test that a sampled request gets a Server-Timing header and a log line"""
+        with self.assertLogs("acms.requests", level="INFO") as logs:
+            response = self.client.get(self.url)
+
+        metrics = [metric.split(";")[0] for metric in response["Server-Timing"].split(", ")]
+        self.assertEqual(metrics, ["db", "serializer", "render", "total"])
+        log = json.loads(logs.records[0].getMessage())
+        self.assertEqual(log["route"], "skills/skills/")
+        self.assertEqual(log["status"], 200)
+        self.assertGreater(log["db_queries"], 0)
+        self.assertGreater(log["serializer_ms"] + log["renderer_ms"], 0)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0)
+    def test_requests_outside_the_sample_are_not_timed(self):
+        """Test that requests outside the sample aren't instrumented"""
+        with self.assertNoLogs("acms.requests", level="INFO"):
+            response = self.client.get(self.url)
+
+        self.assertNotIn("Server-Timing", response)
+
+
+class MetricsViewTestCase(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = UserFactory.create(email="admin@amalitech.org", role=User.ADMIN)
+        self.url = reverse("core:metrics")
+
+    def test_admin_can_scrape_view_metrics(self):
+        """Test that the latency, status and query metrics are labelled by view"""
+        self.client.force_authenticate(self.admin)
+        self.client.get(reverse("skills:list-create-skills"))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        lines = response.content.decode().splitlines()
+
+        def find_sample(name, *labels):
+            return [line for line in lines if line.startswith(name + "{") and all(label in line for label in labels)]
+
+        labels = ['view="skills.views.ListCreateSkillAPIView"', 'method="GET"']
+        self.assertTrue(find_sample("acms_request_duration_seconds_bucket", *labels))
+        self.assertTrue(find_sample("acms_responses_total", *labels, 'status="200"'))
+        self.assertTrue(find_sample("acms_request_db_queries_count", *labels))
+        self.assertTrue(find_sample("acms_response_cache_hit_ratio", 'cache="UserListView.list"'))
+
+    def test_metrics_are_admin_only(self):
+        """Test that users who aren't admins can't scrape the metrics"""
+        self.client.force_authenticate(UserFactory.create(email="dev@amalitech.org", role=User.DEVELOPER))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
+
+
+class NPlusOneDetectorTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        category = CategoryFactory.create()
+        for index in range(4):
+            SkillFactory.create(name=f"Skill {index}", slug=f"skill-{index}", category=category)
+
+    def load_categories(self):
+        return [skill.category.name for skill in Skill.objects.all()]
+
+    def test_normalize_sql_ignores_values(self):
+        """Test that queries which only differ by their values have the same shape"""
+        self.assertEqual(
+            normalize_sql("SELECT * FROM skill WHERE slug = 'react' AND id IN (1, 2, 3)"),
+            normalize_sql("SELECT * FROM skill WHERE slug = 'vue' AND id IN (4)"),
+        )
+
+    @override_settings(NPLUSONE_THRESHOLD=3, NPLUSONE_ALLOWLIST=[])
+    def test_repeated_queries_raise_with_call_site(self):
+        """Test that a query per object raises with the line that issued it"""
+        with self.assertRaises(NPlusOneError) as context:
+            with detect_nplusone(label="skills", mode="raise"):
+                self.load_categories()
+
+        self.assertIn("4 x SELECT", str(context.exception))
+        self.assertIn("in load_categories", str(context.exception))
+
+    @override_settings(NPLUSONE_THRESHOLD=3, NPLUSONE_ALLOWLIST=[])
+    def test_prefetched_queries_are_not_reported(self):
+        """Test that loading the relation with a join isn't reported"""
+        with detect_nplusone(mode="raise"):
+            [skill.category.name for skill in Skill.objects.select_related("category")]
+
+    @override_settings(NPLUSONE_THRESHOLD=3, NPLUSONE_ALLOWLIST=[r"in load_categories$"])
+    def test_allowlisted_call_sites_are_not_reported(self):
+        """Test that repeated queries matching the allowlist aren't reported"""
+        with detect_nplusone(mode="raise"):
+            self.load_categories()
+
+    @override_settings(NPLUSONE_THRESHOLD=3, NPLUSONE_ALLOWLIST=[])
+    def test_allowed_blocks_are_not_reported(self):
+        """Test that repeated queries inside `allow_nplusone` aren't counted"""
+        with detect_nplusone(mode="raise"):
+            with allow_nplusone():
+                self.load_categories()
+
+    @override_settings(NPLUSONE_THRESHOLD=3, NPLUSONE_ALLOWLIST=[])
+    def test_log_mode_warns(self):
+        """Test that repeated queries are logged instead of raised in log mode"""
+        with self.assertLogs("acms.nplusone", level="WARNING") as logs:
+            with detect_nplusone(label="GET /skills/", mode="log"):
+                self.load_categories()
+
+        self.assertIn("Repeated queries in GET /skills/", logs.output[0])
+
+
+class ProfilerMiddlewareTestCase(TestCase):
+    def setUp(self) -> None:
+        category = CategoryFactory.create()
+        SkillFactory.create(name="Python Django", slug="python-django", category=category)
+        self.admin = UserFactory.create(email="admin@amalitech.org", role=User.ADMIN, is_active=True, is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("skills:list-create-skills")
+
+    def test_admin_gets_a_profile_token(self):
+        """Test that admins get a token and other users can't"""
+        response = self.client.post(reverse("core:profile-token"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["header"], PROFILE_HEADER)
+
+        self.client.force_authenticate(UserFactory.create(email="dev@amalitech.org", role=User.DEVELOPER))
+        self.assertEqual(self.client.post(reverse("core:profile-token")).status_code, 403)
+
+    def test_request_with_token_is_profiled(self):
+        """Test that a request with a valid token stores its profile and SQL log"""
+        response = self.client.get(self.url, HTTP_X_PROFILE_TOKEN=get_profile_token(self.admin))
+
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get(pk=response["X-Profile-Id"])
+        self.assertEqual((profile.user, profile.method, profile.path), (self.admin, "GET", self.url))
+        self.assertGreater(profile.query_count, 0)
+        self.assertEqual(len(profile.sql_log), profile.query_count)
+        self.assertIn("skills_skill", " ".join(query["sql"] for query in profile.sql_log))
+        self.assertTrue(marshal.loads(bytes(profile.stats)))
+        self.assertIn("cumulative", profile.summary)
+
+    def test_query_param_token_is_not_stored(self):
+        """Test that the token can be sent as a query param and isn't kept in the path"""
+        response = self.client.get(self.url, {"_profile": get_profile_token(self.admin), "page": 1})
+
+        self.assertEqual(RequestProfile.objects.get(pk=response["X-Profile-Id"]).path, f"{self.url}?page=1")
+
+    def test_invalid_or_non_admin_tokens_are_ignored(self):
+        """Test that requests with a forged or non admin token aren't profiled"""
+        developer = UserFactory.create(email="dev@amalitech.org", role=User.DEVELOPER, is_active=True)
+        for token in ["forged", get_profile_token(developer)]:
+            response = self.client.get(self.url, HTTP_X_PROFILE_TOKEN=token)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_profile_can_be_downloaded_from_the_admin_site(self):
+        """Test that the stats and the SQL log are downloaded as attachments"""
+        response = self.client.get(self.url, HTTP_X_PROFILE_TOKEN=get_profile_token(self.admin))
+        pk = response["X-Profile-Id"]
+        self.client.force_login(UserFactory.create(email="staff@amalitech.org", is_staff=True, is_superuser=True))
+
+        profile_response = self.client.get(reverse("admin:core_requestprofile_download", args=[pk, "profile"]))
+        sql_response = self.client.get(reverse("admin:core_requestprofile_download", args=[pk, "sql"]))
+
+        self.assertEqual(profile_response["Content-Disposition"], f'attachment; filename="request-{pk}.prof"')
+        self.assertEqual(marshal.loads(profile_response.content), marshal.loads(RequestProfile.objects.get(pk=pk).stats))
+        self.assertEqual(len(json.loads(sql_response.content)), RequestProfile.objects.get(pk=pk).query_count)
+
+
+class PooledDatabaseBackendTestCase(SimpleTestCase):
+    def tearDown(self) -> None:
+        close_pools()
+
+    def get_wrapper(self, alias="pool-test", **pool):
+        settings_dict = {**connection.settings_dict, "ENGINE": "core.db.postgresql", "POOL": pool}
+        return load_backend("core.db.postgresql").DatabaseWrapper(settings_dict, alias)
+
+    def get_backend_pid(self, wrapper) -> int:
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_connections_are_reused(self):
+        """Test that closing a connection returns it to the pool"""
+        wrapper = self.get_wrapper(alias="pool-reuse")
+        backend_pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+
+        self.assertEqual(self.get_backend_pid(wrapper), backend_pid)
+        self.assertEqual(DB_POOL_OPENED.labels("pool-reuse")._value.get(), 1)
+        wrapper.close()
+
+    def test_old_connections_are_replaced(self):
+        """Test that a connection older than MAX_LIFETIME isn't reused"""
+        wrapper = self.get_wrapper(alias="pool-lifetime", MAX_LIFETIME=0)
+        backend_pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+
+        self.assertNotEqual(self.get_backend_pid(wrapper), backend_pid)
+        self.assertEqual(DB_POOL_CLOSED.labels("pool-lifetime", "lifetime")._value.get(), 1)
+        wrapper.close()
+
+    def test_dead_connections_are_replaced(self):
+        """Test that an idle connection is pinged and replaced when the server closed it"""
+        wrapper = self.get_wrapper(alias="pool-health", HEALTH_CHECK_INTERVAL=0)
+        backend_pid = self.get_backend_pid(wrapper)
+        wrapper.close()
+        other = self.get_wrapper(alias="pool-health-other")
+        with other.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [backend_pid])
+        other.close()
+
+        self.assertNotEqual(self.get_backend_pid(wrapper), backend_pid)
+        self.assertEqual(DB_POOL_CLOSED.labels("pool-health", "unhealthy")._value.get(), 1)
+        wrapper.close()
+
+    def test_checkout_times_out_when_the_pool_is_full(self):
+        """Test that a checkout fails when every connection stays in use"""
+        first = self.get_wrapper(alias="pool-full", MAX_SIZE=1, TIMEOUT=0.1)
+        second = self.get_wrapper(alias="pool-full", MAX_SIZE=1, TIMEOUT=0.1)
+        first.ensure_connection()
+
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+        self.assertEqual(DB_POOL_TIMEOUTS.labels("pool-full")._value.get(), 1)
+        first.close()
+        second.ensure_connection()
+        second.close()
+
+    def test_open_transactions_are_rolled_back(self):
+        """Test that a connection is returned without the transaction it was closed in"""
+        wrapper = self.get_wrapper(alias="pool-rollback")
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE pool_rollback (id int)")
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pg_temp.pool_rollback')")
+            self.assertIsNone(cursor.fetchone()[0])
+        wrapper.close()
+
+    def test_forked_child_opens_its_own_connection(self):
+        """Test that a forked process doesn't use or close the connection of its parent"""
+        wrapper = self.get_wrapper(alias="pool-fork")
+        backend_pid = self.get_backend_pid(wrapper)
+        read, write = os.pipe()
+        child = os.fork()
+        if child == 0:
+            try:
+                os.close(read)
+                child_backend_pid = self.get_backend_pid(wrapper)
+                wrapper.close()
+                os.write(write, str(child_backend_pid).encode())
+            finally:
+                os._exit(0)
+        os.close(write)
+        os.waitpid(child, 0)
+        with os.fdopen(read) as pipe:
+            child_backend_pid = int(pipe.read())
+
+        self.assertNotEqual(child_backend_pid, backend_pid)
+        self.assertEqual(self.get_backend_pid(wrapper), backend_pid)
+        wrapper.close()
+
+
+@override_settings(REPLICA_DATABASE="replica", REPLICA_MAX_LAG=5, REPLICA_CHECK_INTERVAL=5)
+class ReplicaRouterTestCase(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self) -> None:
+        _replica_checks.clear()
+        cache.clear()
+        self.admin = UserFactory.create(email="admin@amalitech.org", role=User.ADMIN, is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_reads_of_replica_blocks_go_to_the_replica(self):
+        """Test that only the reads of a read_replica block use the replica"""
+        with read_replica():
+            self.assertEqual(User.objects.all().db, "replica")
+            self.assertEqual(User.objects.get(pk=self.admin.pk)._state.db, "replica")
+        self.assertEqual(User.objects.all().db, "default")
+
+    def test_writes_and_transactions_use_the_primary(self):
+        """Test that writes, including of objects read from the replica, and transactions use the primary"""
+        with read_replica():
+            user = User.objects.get(pk=self.admin.pk)
+            user.first_name = "Replica"
+            user.save()
+            with transaction.atomic():
+                self.assertEqual(User.objects.all().db, "default")
+        self.assertEqual(user._state.db, "default")
+        self.assertEqual(User.objects.get(pk=self.admin.pk).first_name, "Replica")
+
+    def test_lagging_or_unreachable_replica_falls_back_to_the_primary(self):
+        """Test that reads go to the primary while the replica lags or fails"""
+        with mock.patch("core.replicas.get_replica_lag", return_value=60) as get_replica_lag, read_replica():
+            with self.assertLogs("acms.replica", "WARNING"):
+                self.assertEqual(User.objects.all().db, "default")
+            self.assertEqual(User.objects.all().db, "default")
+        self.assertEqual(get_replica_lag.call_count, 1)
+
+        _replica_checks.clear()
+        with mock.patch("core.replicas.get_replica_lag", side_effect=DatabaseError), read_replica():
+            with self.assertLogs("acms.replica", "WARNING"):
+                self.assertEqual(User.objects.all().db, "default")
+
+    def test_list_views_read_from_the_replica(self):
+        """Test that the list views run their queries on the replica"""
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            response = self.client.get(reverse("accounts:user-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(replica_queries), 0)
+
+    def test_report_views_read_from_the_replica(self):
+        """Test that the analytics are computed on the replica"""
+        for name in ["analytics:capacity", "analytics:skill-gaps"]:
+            with self.subTest(name), CaptureQueriesContext(connections["default"]) as primary_queries:
+                with CaptureQueriesContext(connections["replica"]) as replica_queries:
+                    response = self.client.get(reverse(name))
+
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(len(replica_queries), 0)
+                self.assertEqual(len(primary_queries), 0)
+
+    def test_similar_developers_read_from_the_replica(self):
+        """Test that the similarity index and the candidates are loaded from the replica"""
+        profile = UserFactory.create(email="dev@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+        similarity._index = None
+        self.addCleanup(setattr, similarity, "_index", None)
+        with CaptureQueriesContext(connections["default"]) as primary_queries:
+            with CaptureQueriesContext(connections["replica"]) as replica_queries:
+                response = self.client.get(reverse("accounts:similar-developers", args=[profile.pk]))
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertGreater(len(replica_queries), 0)
+        self.assertEqual(len(primary_queries), 0)
+
+    def test_recommended_developers_read_from_the_replica(self):
+        """Test that the staffing index and the candidates are loaded from the replica"""
+        ProjectFactory.create(slug="staffed-project")
+        staffing._index = None
+        self.addCleanup(setattr, staffing, "_index", None)
+        with override_settings(STAFFING_INDEX_PATH=os.path.join(tempfile.gettempdir(), "missing-staffing.npz")):
+            with CaptureQueriesContext(connections["default"]) as primary_queries:
+                with CaptureQueriesContext(connections["replica"]) as replica_queries:
+                    response = self.client.get(reverse("projects:recommended-developers-list", args=["staffed-project"]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(replica_queries), 0)
+        self.assertEqual(len(primary_queries), 0)
+
+    def test_users_read_their_writes_from_the_primary(self):
+        """Test that a user who wrote is pinned to the primary"""
+        response = self.client.post(reverse("skills:list-create-categories"), {"name": "Frontend"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(is_pinned_to_primary(self.admin))
+
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            response = self.client.get(reverse("accounts:user-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(replica_queries), 0)
+
+
+class SchemaViewTestCase(TestCase):
+    def setUp(self) -> None:
+        schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_dir.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=schema_dir.name, CODE_VERSION="1.0.0")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(schema._schema.clear)
+        self.addCleanup(schema.get_code_version.cache_clear)
+        schema._schema.clear()
+        schema.get_code_version.cache_clear()
+        self.url = reverse("core:schema")
+
+    def test_schema_is_generated_once_and_revalidated(self):
+        """Test that the schema is generated on the first request and answered with 304 when unchanged"""
+        with mock.patch("core.schema.generate_schema", wraps=schema.generate_schema) as generate_schema:
+            response = self.client.get(self.url)
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/accounts/users/", json.loads(response.content)["paths"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(generate_schema.call_count, 1)
+        self.assertTrue(os.path.exists(schema.get_schema_path("1.0.0")))
+
+    def test_prebuilt_schema_is_read_from_disk(self):
+        """Test that a schema built by the command isn't generated again by the server"""
+        call_command("build_schema", stdout=StringIO())
+        with mock.patch("core.schema.generate_schema") as generate_schema:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        generate_schema.assert_not_called()
+
+    def test_new_code_version_changes_the_schema(self):
+        """Test that another code version gets its own schema and ETag"""
+        etag = self.client.get(self.url)["ETag"]
+        schema.get_code_version.cache_clear()
+
+        with override_settings(CODE_VERSION="1.0.1"):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertTrue(os.path.exists(schema.get_schema_path("1.0.1")))
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_docs_page_does_not_generate_the_schema(self):
+        """Test that the docs page loads the prebuilt schema and can't render a new one"""
+        with mock.patch("core.schema.generate_schema") as generate_schema:
+            response = self.client.get(reverse("schema-swagger-ui"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.url, response.content.decode())
+        generate_schema.assert_not_called()
+
+        self.assertEqual(self.client.get(reverse("schema-swagger-ui"), {"format": "openapi"}).status_code, 404)
+
+
+class WarmUpTestCase(TransactionTestCase):
+    def setUp(self) -> None:
+        schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_dir.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=schema_dir.name, CODE_VERSION="1.0.0")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(schema._schema.clear)
+        self.addCleanup(schema.get_code_version.cache_clear)
+        schema.get_code_version.cache_clear()
+        self.url = reverse("core:ready")
+
+    def test_warm_up_runs_every_step(self):
+        """Test that the warm up steps succeed and compile the email templates"""
+        warm_up_application()
+        warm_up_database()
+
+        self.assertTrue(is_warmed_up())
+        self.assertEqual(
+            set(get_warm_up_timings()),
+            {"urls", "serializers", "templates", "schema", "connections", "taxonomy", "similarity", "staffing"},
+        )
+        self.assertNotIn(None, get_warm_up_timings().values())
+        self.assertIn("email_invitation.html", get_template_names())
+        self.assertIn("notification_email.html", get_template_names())
+
+    def test_ready_once_warmed_up_and_connected(self):
+        """Test that the readiness probe checks the warm up and the database"""
+        warm_up_application()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["ready"])
+
+        with mock.patch("core.views.is_warmed_up", return_value=False):
+            self.assertEqual(self.client.get(self.url).status_code, 503)
+
+        with mock.patch("core.views.connection.cursor", side_effect=OperationalError):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.data["database"])
+
+    def test_wait_for_db_connects(self):
+        """Test that wait_for_db runs a query and fails when the database stays unavailable"""
+        call_command("wait_for_db", stdout=StringIO())
+
+        with mock.patch.object(connections["default"], "cursor", side_effect=OperationalError):
+            with self.assertRaises(CommandError):
+                call_command("wait_for_db", timeout=0, stdout=StringIO())
+
+    def test_import_times_are_parsed(self):
+        """Test that the report of python -X importtime is parsed with the nesting of the modules"""
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     acms.settings_utils",
+            "import time:      2500 |       2620 |   acms.settings",
+        ])
+        self.assertEqual(
+            parse_import_times(output), [("acms.settings_utils", 120, 120, 2), ("acms.settings", 2500, 2620, 1)]
+        )
+
+
+class OutboxTestCase(TransactionTestCase):
+    def setUp(self) -> None:
+        self.handled = []
+        self.addCleanup(events._handlers.pop, "test_event", None)
+        events.event_handler("test_event")(self.handle)
+
+    def handle(self, event):
+        if event.payload.get("fail"):
+            # rolled back with the failed attempt
+            Group.objects.create(name=f"failed {event.pk}")
+            raise events.EventHandlerError("unavailable")
+        self.handled.append(event.payload["id"])
+
+    def test_events_are_dispatched_in_batches(self):
+        """Test that the pending events are dispatched oldest first to their
+        handlers, batch after batch
+        """
+        with transaction.atomic():
+            events.publish_events("test_event", [{"id": index} for index in range(5)])
+        events.publish_event("other_event", {"id": 5})
+
+        with override_settings(OUTBOX_BATCH_SIZE=2):
+            self.assertEqual(dispatch_outbox_events(), {"dispatched": 6})
+
+        self.assertEqual(self.handled, [0, 1, 2, 3, 4])
+        self.assertFalse(OutboxEvent.objects.exclude(status=OutboxEvent.DISPATCHED).exists())
+        self.assertEqual(events.dispatch_events(), {})
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_DELAY=60)
+    def test_failed_events_are_retried(self):
+        """Test that a failed event is retried with a backoff and given up
+        after the maximum number of attempts
+        """
+        event = events.publish_event("test_event", {"id": 0, "fail": True})
+
+        with self.assertLogs("core.events", "WARNING"):
+            self.assertEqual(events.dispatch_events(), {"retried": 1})
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.PENDING, 1))
+        self.assertEqual(event.last_error, "EventHandlerError: unavailable")
+        self.assertGreater(event.available_at, timezone.now() + datetime.timedelta(seconds=50))
+        self.assertFalse(Group.objects.exists())
+        # not due yet
+        self.assertEqual(events.dispatch_events(), {})
+
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        with self.assertLogs("core.events", "ERROR"):
+            self.assertEqual(events.dispatch_events(), {"failed": 1})
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), (OutboxEvent.FAILED, 2))
+
+    def test_claimed_events_are_skipped(self):
+        """Test that the events locked by another dispatcher are skipped"""
+        claimed = events.publish_event("test_event", {"id": 0})
+        events.publish_event("test_event", {"id": 1})
+        locked, release = threading.Event(), threading.Event()
+
+        def claim():
+            with transaction.atomic():
+                OutboxEvent.objects.select_for_update().get(pk=claimed.pk)
+                locked.set()
+                release.wait(10)
+            connection.close()
+
+        thread = threading.Thread(target=claim)
+        thread.start()
+        locked.wait(10)
+        try:
+            self.assertEqual(events.dispatch_events(), {"dispatched": 1})
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(self.handled, [1])
+
+    def test_handlers_run_outside_of_the_claim(self):
+        """Test that the handlers run after the batch is claimed and the
+        result of every event is committed on its own
+        """
+        first, second = events.publish_events("test_event", [{"id": 0}, {"id": 1}])
+        seen = []
+
+        def read_statuses():
+            seen.append(dict(OutboxEvent.objects.values_list("pk", "status")))
+            connection.close()
+
+        def handle(event):
+            # read by another connection, so only what was committed is seen
+            thread = threading.Thread(target=read_statuses)
+            thread.start()
+            thread.join()
+
+        events.event_handler("test_event")(handle)
+        self.assertEqual(events.dispatch_events(), {"dispatched": 2})
+
+        self.assertEqual(seen, [
+            {first.pk: OutboxEvent.PROCESSING, second.pk: OutboxEvent.PROCESSING},
+            {first.pk: OutboxEvent.DISPATCHED, second.pk: OutboxEvent.PROCESSING},
+        ])
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_expired_leases_are_claimed_again(self):
+        """Test that the events whose dispatcher died are dispatched again,
+        or marked failed after their last attempt, and that a result
+        recorded after the lease expired is dropped
+        """
+        abandoned = events.publish_event("test_event", {"id": 0})
+        exhausted = events.publish_event("test_event", {"id": 1})
+        self.assertEqual(len(events.claim_events()), 2)
+        OutboxEvent.objects.filter(pk=exhausted.pk).update(attempts=2)
+        # not due until the lease expires
+        self.assertEqual(events.claim_events(), [])
+
+        OutboxEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(events.dispatch_events(), {"dispatched": 1})
+        abandoned.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((abandoned.status, abandoned.attempts), (OutboxEvent.DISPATCHED, 2))
+        self.assertEqual(exhausted.status, OutboxEvent.FAILED)
+        self.assertEqual(self.handled, [0])
+
+        expired = events.publish_event("test_event", {"id": 2})
+        events.event_handler("test_event")(
+            lambda event: OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        )
+        with self.assertLogs("core.events", "WARNING"):
+            self.assertEqual(events.dispatch_events(), {"expired": 1})
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, OutboxEvent.PROCESSING)
+
+    def test_dispatched_events_are_purged(self):
+        """Test that the events dispatched before the retention are deleted"""
+        old, recent = [events.publish_event("test_event", {"id": index}) for index in range(2)]
+        failed = events.publish_event("test_event", {"id": 2, "fail": True})
+        OutboxEvent.objects.filter(pk=old.pk).update(
+            status=OutboxEvent.DISPATCHED, dispatched_at=timezone.now() - datetime.timedelta(days=8)
+        )
+        OutboxEvent.objects.filter(pk=recent.pk).update(status=OutboxEvent.DISPATCHED, dispatched_at=timezone.now())
+
+        self.assertEqual(events.purge_events(days=7), 1)
+        self.assertEqual(sorted(OutboxEvent.objects.values_list("pk", flat=True)), [recent.pk, failed.pk])
+
+
+class AuditLogTestCase(TransactionTestCase):
+    def setUp(self) -> None:
+        self.admin = UserFactory.create(email="admin@amalitech.org", role=User.ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.developers = [
+            UserFactory.create(email=f"dev{index}@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+            for index in range(2)
+        ]
+        self.project = ProjectFactory.create(slug="audited-project")
+
+    def get_records(self, **filters):
+        # the table isn't managed, so it isn't flushed between tests
+        return AuditLog.objects.filter(create_date__gte=self.start, **filters)
+
+    def test_assignments_are_written_in_one_query(self):
+        """Test that the records of a request are written by one bulk insert
+        once the view returned
+        """
+        self.start = timezone.now()
+        url = reverse("projects:project-assign-to-developer", args=[self.project.slug])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {"members": [developer.pk for developer in self.developers]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        inserts = [query["sql"] for query in queries.captured_queries if 'INSERT INTO "core_auditlog"' in query["sql"]]
+        self.assertEqual(len(inserts), 1)
+        records = self.get_records(action=audit.DEVELOPER_ASSIGNED).order_by("entity_id")
+        self.assertEqual(
+            [(record.entity_type, record.entity_id, record.actor_id) for record in records],
+            [("accounts.developerprofile", str(developer.pk), self.admin.pk) for developer in self.developers],
+        )
+        self.assertEqual(records[0].changes["project_id"], self.project.pk)
+
+    def test_rating_and_role_changes_are_recorded(self):
+        """Test that the changes of a rating or a role are recorded with the
+        old value, and that unchanged saves and rolled back changes aren't
+        """
+        skill = self.project.required_skills.get()
+        self.start = timezone.now()
+        rating = SkillRating.objects.create(
+            skill=skill, developer_profile=self.developers[0], rating=decimal.Decimal("3.0"), comment="ok"
+        )
+        rating = SkillRating.objects.get(pk=rating.pk)
+        rating.comment = "still ok"
+        rating.save()
+        rating.rating = decimal.Decimal("4.5")
+        rating.save()
+        user = User.objects.get(pk=self.developers[1].user_id)
+        user.role = User.PROJECT_MANAGER
+        user.save()
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            user.role = User.ADMIN
+            user.save()
+            raise DatabaseError("rolled back")
+
+        self.assertEqual(
+            list(self.get_records().order_by("id").values_list("action", "changes")),
+            [
+                (
+                    audit.SKILL_RATING_CREATED,
+                    {"developer_profile_id": self.developers[0].pk, "skill_id": skill.pk, "rating": "3.0"},
+                ),
+                (
+                    audit.SKILL_RATING_CHANGED,
+                    {"developer_profile_id": self.developers[0].pk, "skill_id": skill.pk, "old_rating": "3.0", "rating": "4.5"},
+                ),
+                (audit.ROLE_CHANGED, {"old_role": User.DEVELOPER, "role": User.PROJECT_MANAGER}),
+            ],
+        )
+
+    def test_audit_log_is_append_only(self):
+        """Test that the records can't be updated or deleted"""
+        self.start = timezone.now()
+        with audit.audit_context():
+            audit.record_change(audit.ROLE_CHANGED, self.admin, actor=self.admin)
+        record = self.get_records().get()
+
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            AuditLog.objects.filter(pk=record.pk).update(action="edited")
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            AuditLog.objects.filter(pk=record.pk).delete()
+        self.assertEqual(self.get_records().get().action, audit.ROLE_CHANGED)
+        # a statement trigger, PostgreSQL 11 has no row triggers on partitioned tables
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tgtype & 1 FROM pg_trigger WHERE tgname = 'core_auditlog_append_only'")
+            self.assertEqual(cursor.fetchall(), [(0,)])
+
+    def test_audit_log_is_listed_by_entity_and_actor(self):
+        """Test that admins list the records of an entity or of an actor,
+        newest first
+        """
+        self.start = timezone.now()
+        with audit.audit_context():
+            for developer in self.developers:
+                audit.record_change(audit.DEVELOPER_ASSIGNED, developer, actor=self.admin)
+        url = reverse("core:audit-log")
+
+        response = self.client.get(
+            url, {"entity_type": "accounts.developerprofile", "entity_id": self.developers[1].pk}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([record["entity_id"] for record in response.data["results"]], [str(self.developers[1].pk)])
+
+        response = self.client.get(url, {"actor": self.admin.pk})
+        self.assertEqual(
+            [record["entity_id"] for record in response.data["results"]][:2],
+            [str(developer.pk) for developer in reversed(self.developers)],
+        )
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_monthly_partitions_are_created_ahead(self):
+        """Test that the task creates the partitions of this month and of the
+        following ones
+        """
+        months = create_audit_partitions()
+
+        self.assertEqual(len(months), 3)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits JOIN pg_class parent ON parent.oid = inhparent "
+                "JOIN pg_class child ON child.oid = inhrelid WHERE parent.relname = 'core_auditlog'"
+            )
+            partitions = {name for name, in cursor.fetchall()}
+        self.assertTrue({f"core_auditlog_{month[:7].replace('-', '_')}" for month in months} <= partitions)
@@ -0,0 +1,103 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+_current_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Durations in seconds measured while a sampled request is handled"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.serializer = 0.0
+        self.renderer = 0.0
+        self._active = set()
+
+
+def get_request_timings():
+    return _current_timings.get()
+
+
+@contextmanager
+def record_request_timings():
+    """Context manager that collects the timings of everything that runs in
+    the current context until it exits
+
+    Yields:
+        RequestTimings: the collected timings
+    """
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed(metric):
+    """Context manager to add the time spent in the block to a metric of the
+    current request. Nested blocks of the same metric are only counted once,
+    and nothing is recorded outside a sampled request
+
+    Args:
+        metric (str): "serializer" or "renderer"
+    """
+    timings = _current_timings.get()
+    if timings is None or metric in timings._active:
+        yield
+        return
+
+    timings._active.add(metric)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timings, metric, getattr(timings, metric) + time.perf_counter() - start)
+        timings._active.discard(metric)
+
+
+def sql_timer(execute, sql, params, many, context):
+    """Database execute wrapper that counts the queries of the current
+    request and their duration
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.sql += time.perf_counter() - start
+
+
+def timed_property(prop, metric):
+    """Helper function to wrap the getter of a property with `timed`"""
+
+    @wraps(prop.fget)
+    def getter(instance):
+        with timed(metric):
+            return prop.fget(instance)
+
+    getter.timed = True
+    return property(getter, prop.fset, prop.fdel, prop.__doc__)
+
+
+def instrument_rest_framework():
+    """Helper function to time every DRF serializer's `.data` and the
+    rendering of every DRF response. Called once when the app is ready
+    """
+    from rest_framework.response import Response
+    from rest_framework.serializers import (BaseSerializer, ListSerializer,
+                                            Serializer)
+
+    if getattr(BaseSerializer.data.fget, "timed", False):
+        return
+    for serializer_class in [BaseSerializer, Serializer, ListSerializer]:
+        serializer_class.data = timed_property(serializer_class.__dict__["data"], "serializer")
+    Response.rendered_content = timed_property(Response.rendered_content, "renderer")
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from core.views import (AuditLogListView, MetricsView, ProfileTokenView,
+                        ReadinessView, SchemaView)
+
+urlpatterns = [
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("profile-token/", ProfileTokenView.as_view(), name="profile-token"),
+    path("openapi.json", SchemaView.as_view(), name="schema"),
+    path("ready/", ReadinessView.as_view(), name="ready"),
+    path("audit-log/", AuditLogListView.as_view(), name="audit-log"),
+]
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from rest_framework import generics, status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.metrics import get_registry
+from core.models import AuditLog
+from core.profiling import PROFILE_HEADER, get_profile_token
+from core.schema import get_prebuilt_schema
+from core.serializers import AuditLogSerializer
+from core.warmup import get_warm_up_timings, is_warmed_up
+from utils.exceptions import CustomAPIException
+from utils.permissions import IsAdmin
+
+
+class MetricsView(APIView):
+    """APIView to scrape the metrics of every worker in the Prometheus text
+    format
+    """
+
+    permission_classes = [IsAuthenticated & IsAdmin]
+    swagger_schema = None
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+class ProfileTokenView(APIView):
+    """APIView to get a short lived token that profiles the requests sent
+    with it, see `core.profiling.ProfilerMiddleware`
+    """
+
+    permission_classes = [IsAuthenticated & IsAdmin]
+    swagger_schema = None
+
+    def post(self, request, *args, **kwargs):
+        response_data = {
+            "token": get_profile_token(request.user),
+            "header": PROFILE_HEADER,
+            "expires_in": settings.PROFILER_TOKEN_MAX_AGE,
+        }
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+class SchemaView(APIView):
+    """APIView to serve the prebuilt OpenAPI schema of the API, which the
+    docs page loads. Clients revalidate it with its ETag, which only
+    changes with the code version
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    swagger_schema = None
+
+    def get(self, request, *args, **kwargs):
+        content, etag = get_prebuilt_schema()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type="application/openapi+json")
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+
+class ReadinessView(APIView):
+    """APIView for the readiness probe of the load balancer: a process is
+    ready once it's warmed up and while it can reach the database
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    swagger_schema = None
+
+    def get(self, request, *args, **kwargs):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            database = True
+        except DatabaseError:
+            database = False
+
+        ready = database and is_warmed_up()
+        response_data = {"ready": ready, "database": database, "warm_up": get_warm_up_timings()}
+        return Response(response_data, status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class AuditLogListView(generics.ListAPIView):
+    """APIView to list the audit log of an entity, with the `entity_type`
+    and `entity_id` query params, or of an actor, with the `actor` query
+    param, newest first. Both are served by an index of the table
+    """
+
+    permission_classes = [IsAuthenticated & IsAdmin]
+    serializer_class = AuditLogSerializer
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = AuditLog.objects.all()
+        if params.get("entity_type") and params.get("entity_id"):
+            queryset = queryset.filter(entity_type=params["entity_type"], entity_id=params["entity_id"])
+        elif params.get("actor", "").isdigit():
+            queryset = queryset.filter(actor_id=params["actor"])
+        else:
+            raise CustomAPIException(message="Filter the audit log by entity_type and entity_id, or by actor")
+        if params.get("action"):
+            queryset = queryset.filter(action=params["action"])
+        return queryset.order_by("-create_date", "-id")
@@ -0,0 +1,139 @@
+"""Work done once per process before it serves requests, so that the first
+requests after a deploy don't pay for it.
+
+`warm_up_application` runs when the WSGI or ASGI application is loaded. With
+gunicorn's `preload_app` that's in the master, whose imports and compiled
+templates are shared by every forked worker. `warm_up_database` opens the
+connections of a worker and primes the caches that need the database, it
+runs in every worker once the application is loaded, see gunicorn.conf.py.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from core.schema import get_prebuilt_schema
+from projects.staffing import get_staffing_index
+from skills.similarity import get_similarity_index
+from skills.utils import get_skill_taxonomy
+
+logger = logging.getLogger("acms.startup")
+
+# step name: seconds it took, or None when it failed
+_timings = {}
+
+
+def get_views(patterns=None):
+    """Helper function to list the views of every URL, importing them"""
+    views = []
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            views.extend(get_views(pattern.url_patterns))
+        elif isinstance(pattern, URLPattern):
+            views.append(getattr(pattern.callback, "cls", getattr(pattern.callback, "view_class", None)))
+    return [view for view in views if view is not None]
+
+
+def get_template_names() -> list:
+    """Helper function to list the templates of the project's apps, such as
+    the email templates, without the templates of third party packages
+    """
+    names = set()
+    base_dir = str(settings.BASE_DIR)
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            if not str(directory).startswith(base_dir) or not os.path.isdir(directory):
+                continue
+            for root, _, files in os.walk(directory):
+                names.update(
+                    os.path.relpath(os.path.join(root, name), directory) for name in files if name.endswith(".html")
+                )
+    return sorted(names)
+
+
+def warm_up_urls():
+    # reversing a name builds the resolver's lookups for every URL
+    get_resolver().reverse_dict
+    return get_views()
+
+
+def warm_up_serializers():
+    for view in set(get_views()):
+        serializer_class = getattr(view, "serializer_class", None)
+        if serializer_class is not None:
+            # builds the fields of model serializers from the model's metadata
+            serializer_class().fields
+
+
+def warm_up_templates():
+    for name in get_template_names():
+        get_template(name)
+
+
+def warm_up_connections():
+    aliases = ["default", *([settings.REPLICA_DATABASE] if settings.REPLICA_DATABASE else [])]
+    for alias in aliases:
+        connection = connections[alias]
+        connection.ensure_connection()
+        # returns it to the pool with the core.db.postgresql engine
+        connection.close()
+
+
+APPLICATION_STEPS = {
+    "urls": warm_up_urls,
+    "serializers": warm_up_serializers,
+    "templates": warm_up_templates,
+    "schema": get_prebuilt_schema,
+}
+DATABASE_STEPS = {
+    "connections": warm_up_connections,
+    "taxonomy": get_skill_taxonomy,
+    "similarity": get_similarity_index,
+    "staffing": get_staffing_index,
+}
+
+
+def run_steps(steps):
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception(f"[WARM UP] {name} failed")
+            _timings[name] = None
+        else:
+            _timings[name] = round(time.perf_counter() - start, 4)
+    logger.info(f"[WARM UP] {', '.join(f'{name}: {_timings[name]}s' for name in steps)}")
+
+
+def warm_up_application():
+    """Function to import the views, build the serializers' fields, compile
+    the templates and load the OpenAPI schema of the process
+    """
+    run_steps(APPLICATION_STEPS)
+
+
+def warm_up_database():
+    """Function to open the database connections of the process and prime
+    the caches that are read from the database
+    """
+    run_steps(DATABASE_STEPS)
+    # reads the taxonomy through the connection opened above, close it
+    connections["default"].close()
+
+
+def get_warm_up_timings() -> dict:
+    return dict(_timings)
+
+
+def is_warmed_up() -> bool:
+    """Helper function to check that the application steps ran and succeeded.
+    The database steps may fail while the database starts, readiness checks
+    the database itself
+    """
+    return all(_timings.get(name) is not None for name in APPLICATION_STEPS)
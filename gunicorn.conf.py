@@ -0,0 +1,35 @@
+"""Gunicorn settings, loaded automatically from the working directory.
+
+The application is loaded and warmed up by the master before it forks the
+workers (GUNICORN_PRELOAD=0 disables it, e.g. for --reload), and every
+worker opens its database connections before it accepts requests.
+
+When PROMETHEUS_MULTIPROC_DIR is set every worker writes its metrics to
+files in that directory so that a scrape reports all the workers. The
+directory is emptied when the server starts and the files of a worker
+that exits are marked as dead.
+"""
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+preload_app = bool(int(os.environ.get("GUNICORN_PRELOAD", 1)))
+
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    from core.warmup import warm_up_database
+
+    warm_up_database()
@@ -0,0 +1,17 @@
+from accounts.models import DeveloperProfile
+from core.events import DEVELOPER_ASSIGNED, EventHandlerError, event_handler
+from projects.models import Project
+from utils.send_email import send_project_assignment_email
+
+
+@event_handler(DEVELOPER_ASSIGNED)
+def send_assignment_email(event):
+    """Event handler to notify a developer of their assignment to a project
+    that still exists
+    """
+    project = Project.objects.filter(pk=event.payload["project_id"]).first()
+    developer = DeveloperProfile.objects.select_related("user").filter(pk=event.payload["developer_profile_id"]).first()
+    if project is None or developer is None:
+        return
+    if not send_project_assignment_email(developer, project):
+        raise EventHandlerError(f"The assignment of developer profile {developer.pk} couldn't be sent")
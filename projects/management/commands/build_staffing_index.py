@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from projects.staffing import build_staffing_index
+
+
+class Command(BaseCommand):
+    """Django command to build the index of the projects' required skills
+    used for staffing recommendations, before the workers start or after
+    importing projects
+    """
+
+    help = "Build the staffing index of the projects' required skills"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Path of the index. Defaults to STAFFING_INDEX_PATH")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        path = options["output"] or settings.STAFFING_INDEX_PATH
+        index = build_staffing_index(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index.slugs)} projects and {len(index.skills)} skills "
+            f"in {time.perf_counter() - start:.1f}s at {path}"
+        ))
@@ -1,10 +1,19 @@
 from rest_framework import serializers
 
-from accounts.serializers import (DeveloperProfileSerializer,
+from accounts.serializers import (DEVELOPER_PROFILE_PREFETCH,
+                                  DeveloperProfileSerializer,
                                   UserConfigSerializer)
 from projects.models import Project
 from utils.general import get_date_from_string
 
+# relations read by the ProjectSerializer
+PROJECT_PREFETCH = [
+    "required_skills",
+    "created_by__groups",
+    "created_by__user_permissions",
+    *(f"members__{lookup}" for lookup in DEVELOPER_PROFILE_PREFETCH),
+]
+
 
 class ProjectSerializer(serializers.ModelSerializer):
     members = DeveloperProfileSerializer(many=True, read_only=True)
@@ -0,0 +1,40 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import PROJECTS_TAG, invalidate_tags_on_commit
+from projects.models import Project
+from projects.staffing import expire_staffing_index
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver(m2m_changed, sender=Project.members.through)
+@receiver(m2m_changed, sender=Project.required_skills.through)
+def invalidate_project_responses(sender, **kwargs):
+    """Signal function to invalidate the cached responses that contain projects"""
+    invalidate_tags_on_commit(PROJECTS_TAG)
+
+
+@receiver(m2m_changed, sender=Project.required_skills.through)
+def touch_projects(sender, instance, action, reverse, pk_set, **kwargs):
+    """Signal function to update the `modify_date` of the projects whose
+    required skills changed, for the staffing index of every process to
+    reload them, and to refresh the index of this process
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        projects = Project.objects.filter(pk=instance.pk)
+    elif pk_set:
+        projects = Project.objects.filter(pk__in=pk_set)
+    else:
+        # a skill was removed from every project, the skills changed and the index is rebuilt
+        return
+    projects.update(modify_date=timezone.now())
+    expire_staffing_index()
+
+
+@receiver(post_save, sender=Project)
+def expire_project_staffing_index(sender, **kwargs):
+    """Signal function to refresh the staffing index of this process"""
+    expire_staffing_index()
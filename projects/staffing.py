@@ -0,0 +1,288 @@
+"""Staffing recommendations from the teams of similar past projects.
+
+Every project is the set of its required skills. The sets are held by each
+worker in a `ProjectSkillIndex`, a float32 matrix with one 0/1 row per
+project, so that the Jaccard similarity of a new project's skills to every
+project is a single matrix-vector product: the product is the size of the
+intersection and the union is the sum of both sizes minus it.
+
+The index is built offline by the `build_staffing_index` command or task
+into `STAFFING_INDEX_PATH`, loaded by a worker on first use and refreshed
+incrementally: at most every `STAFFING_REFRESH_INTERVAL` seconds, the rows
+of the projects created or edited since the last refresh are reloaded with
+one query. A change of the required skills of a project updates its
+`modify_date`, see `projects.signals`, and projects are matched by their
+`modify_date` going back `STAFFING_REFRESH_LAG` seconds so that a
+transaction committed after the refresh started is still seen. The index is
+rebuilt when the skills change.
+
+The members of the most similar past projects are read from the database,
+so a deleted project has no members to recommend until the next build
+removes its row.
+"""
+import datetime
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import DeveloperProfile
+from core.cache import SKILLS_TAG, get_tag_versions
+from projects.models import Project
+from skills.models import Skill
+
+logger = logging.getLogger(__name__)
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class ProjectSkillIndex:
+    """Required skill sets of the projects, see the module"""
+
+    def __init__(self, skills, skills_version=None):
+        self.skills = list(skills)
+        self.columns = {slug: column for column, slug in enumerate(self.skills)}
+        self.skills_version = skills_version
+        self.rows = {}
+        self.slugs = np.empty(0, dtype=object)
+        self.end_dates = np.empty(0, dtype=np.int64)
+        self.matrix = np.zeros((0, len(self.skills)), dtype=np.float32)
+        self.sizes = np.empty(0, dtype=np.float32)
+        self.watermark = None
+        self.refreshed_at = time.monotonic()
+
+    @classmethod
+    def build(cls, skills_version=None):
+        """Method to load the required skills of every project"""
+        index = cls(Skill.objects.order_by("slug").values_list("slug", flat=True), skills_version)
+        index.watermark = timezone.now()
+        index.load(Project.objects.all())
+        return index
+
+    def refresh(self) -> int:
+        """Method to reload the rows of the projects created or edited since
+        the last refresh
+
+        Returns:
+            int: the number of reloaded projects
+        """
+        since = self.watermark - timezone.timedelta(seconds=settings.STAFFING_REFRESH_LAG)
+        watermark = timezone.now()
+        count = self.load(Project.objects.filter(modify_date__gte=since))
+        self.watermark, self.refreshed_at = watermark, time.monotonic()
+        return count
+
+    def load(self, projects) -> int:
+        """Method to replace the rows of the projects with their required
+        skills and end dates
+
+        Returns:
+            int: the number of loaded projects
+        """
+        end_dates = dict(projects.values_list("slug", "end_date"))
+        if not end_dates:
+            return 0
+
+        slugs = np.array(list(end_dates), dtype=object)
+        positions = {slug: position for position, slug in enumerate(end_dates)}
+        vectors = np.zeros((len(slugs), len(self.skills)), dtype=np.float32)
+        required_skills = Project.required_skills.through.objects.filter(project__in=projects.values("pk"))
+        for slug, skill in required_skills.values_list("project_id", "skill_id"):
+            if slug in positions and skill in self.columns:
+                vectors[positions[slug], self.columns[skill]] = 1
+        self.set_rows(slugs, np.array([day.toordinal() for day in end_dates.values()], dtype=np.int64), vectors)
+        return len(slugs)
+
+    def set_rows(self, slugs, end_dates, vectors):
+        """Method to replace the rows of the known projects and append the
+        rows of the new ones
+        """
+        known = np.array([slug in self.rows for slug in slugs.tolist()], dtype=bool)
+        if known.any():
+            rows = [self.rows[slug] for slug in slugs[known].tolist()]
+            self.matrix[rows] = vectors[known]
+            self.end_dates[rows] = end_dates[known]
+        if not known.all():
+            start = len(self.slugs)
+            new_slugs = slugs[~known]
+            self.rows.update(zip(new_slugs.tolist(), range(start, start + len(new_slugs))))
+            self.slugs = np.concatenate([self.slugs, new_slugs])
+            self.end_dates = np.concatenate([self.end_dates, end_dates[~known]])
+            self.matrix = np.vstack([self.matrix, vectors[~known]])
+        self.sizes = self.matrix.sum(axis=1)
+
+    def get_scores(self, skills, ended_before, exclude=None):
+        """Method to compute the Jaccard similarity of the required skills of
+        every project that ended before a date to a set of skills, 0 for the
+        other projects
+
+        Args:
+            skills (iterable): slugs of the skills
+            ended_before (date): projects that end on or after it are ignored
+            exclude (str, optional): slug of a project to ignore, e.g. the new project
+
+        Returns:
+            ndarray: the similarity of every row
+        """
+        skills = set(skills)
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        vector[[self.columns[skill] for skill in skills if skill in self.columns]] = 1
+        intersections = self.matrix @ vector
+        unions = self.sizes + len(skills) - intersections
+        scores = np.divide(intersections, unions, out=np.zeros_like(intersections), where=unions > 0)
+        scores[self.end_dates >= ended_before.toordinal()] = 0
+        if exclude in self.rows:
+            scores[self.rows[exclude]] = 0
+        return scores
+
+    def rank(self, scores, count):
+        """Method to get the `count` most similar projects with a positive
+        similarity, most similar first
+
+        Returns:
+            tuple: arrays of the project slugs and their similarity
+        """
+        count = min(count, len(scores))
+        if count == 0:
+            return self.slugs[:0], scores[:0]
+        candidates = np.argpartition(-scores, count - 1)[:count]
+        candidates = candidates[np.lexsort((self.slugs[candidates].astype(str), -scores[candidates]))]
+        candidates = candidates[scores[candidates] > 0]
+        return self.slugs[candidates], scores[candidates]
+
+    def save(self, path):
+        """Method to write the index to a file, replacing it at once so that
+        a worker never reads a partial index
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        with os.fdopen(descriptor, "wb") as temporary_file:
+            np.savez_compressed(
+                temporary_file,
+                skills=np.array(self.skills, dtype=str),
+                slugs=self.slugs.astype(str),
+                end_dates=self.end_dates,
+                matrix=self.matrix.astype(bool),
+                watermark=np.array(self.watermark.isoformat()),
+            )
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def read(cls, path, skills_version=None):
+        """Method to load an index written by `save`
+
+        Returns:
+            ProjectSkillIndex: the index
+        """
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(data["skills"].tolist(), skills_version)
+            index.watermark = datetime.datetime.fromisoformat(str(data["watermark"]))
+            index.set_rows(data["slugs"].astype(object), data["end_dates"], data["matrix"].astype(np.float32))
+        return index
+
+
+def build_staffing_index(path=None) -> ProjectSkillIndex:
+    """Helper function to build the index of every project and write it to
+    `STAFFING_INDEX_PATH`, for the workers to load
+
+    Args:
+        path (str, optional): Defaults to `STAFFING_INDEX_PATH`.
+
+    Returns:
+        ProjectSkillIndex: the index
+    """
+    index = ProjectSkillIndex.build()
+    index.save(path or settings.STAFFING_INDEX_PATH)
+    return index
+
+
+def load_staffing_index(skills_version=None) -> ProjectSkillIndex:
+    """Helper function to load the index built offline and refresh it, or to
+    build it if there's none or it was built for other skills
+    """
+    path = settings.STAFFING_INDEX_PATH
+    if os.path.exists(path):
+        try:
+            index = ProjectSkillIndex.read(path, skills_version)
+        except (OSError, ValueError, KeyError):
+            logger.exception(f"[STAFFING] The index at {path} couldn't be read")
+        else:
+            if index.skills == list(Skill.objects.order_by("slug").values_list("slug", flat=True)):
+                index.refresh()
+                return index
+    return ProjectSkillIndex.build(skills_version)
+
+
+def get_staffing_index() -> ProjectSkillIndex:
+    """Helper function to get the index of the process, loaded on first use,
+    reloaded when the skills changed and refreshed when it's due
+    """
+    global _index
+    with _index_lock:
+        skills_version = get_tag_versions([SKILLS_TAG])[0]
+        if _index is None or _index.skills_version != skills_version:
+            _index = load_staffing_index(skills_version)
+        elif time.monotonic() - _index.refreshed_at >= settings.STAFFING_REFRESH_INTERVAL:
+            _index.refresh()
+        return _index
+
+
+def expire_staffing_index():
+    """Helper function to refresh the index of the process on its next use,
+    e.g. after a project changed in this process
+    """
+    if _index is not None:
+        _index.refreshed_at = float("-inf")
+
+
+def recommend_developers(project, limit=10) -> list:
+    """Helper function to recommend the developers who were members of the
+    past projects whose required skills are the most similar to a project's.
+    A developer's score is the sum of the similarities of those projects
+    they were a member of
+
+    Args:
+        project (Project): the project to staff
+        limit (int, optional): number of developers. Defaults to 10.
+
+    Returns:
+        list: (developer profile id, score, slugs of the similar projects) tuples, best first
+    """
+    skills = project.required_skills.values_list("pk", flat=True)
+    index = get_staffing_index()
+    with _index_lock:
+        scores = index.get_scores(skills, timezone.now().date(), exclude=project.pk)
+        slugs, similarities = index.rank(scores, settings.STAFFING_SIMILAR_PROJECTS)
+    similarities = dict(zip(slugs.tolist(), similarities.tolist()))
+    if not similarities:
+        return []
+
+    candidates, projects = defaultdict(float), defaultdict(list)
+    members = Project.members.through.objects.filter(project__in=similarities).exclude(
+        developerprofile__in=project.members.values("pk")
+    )
+    for slug, profile_id in members.values_list("project_id", "developerprofile_id"):
+        candidates[profile_id] += similarities[slug]
+        projects[profile_id].append(slug)
+    available = DeveloperProfile.objects.filter(
+        Q(availability=True) | Q(current_project_end_date__lt=project.start_date),
+        pk__in=candidates, user__is_active=True,
+    ).values_list("pk", flat=True)
+    recommended = sorted(
+        (
+            (profile_id, candidates[profile_id], sorted(projects[profile_id], key=lambda slug: (-similarities[slug], slug)))
+            for profile_id in available
+        ),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return recommended[:limit]
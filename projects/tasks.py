@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from projects.staffing import build_staffing_index as build_index
+
+
+@shared_task
+def build_staffing_index():
+    """Celery task to rebuild the staffing index of every project into
+    `STAFFING_INDEX_PATH`, dropping the rows of the deleted projects
+
+    Returns:
+        int: the number of indexed projects
+    """
+    return len(build_index().slugs)
@@ -1,13 +1,22 @@
-from django.test import TestCase
+import os
+import tempfile
+
+from asgiref.sync import async_to_sync
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from accounts.models import User
+from accounts.models import DeveloperProfile, User
 from accounts.tests.factories import UserFactory
+from core.events import dispatch_events
+from projects import staffing
 from projects.tests.factories import ProjectFactory
+from projects.views import AssignProjectToDeveloperView
 from skills.tests.factories import (CategoryFactory, SkillFactory,
                                     SkillRatingFactory)
 
@@ -75,6 +84,39 @@ class ListProjectsTestCase(ProjectTestMixin, TestCase):
         self.assertEqual(response.data["results"][0].get("description"), self.project.description)
 
 
+class ProjectConditionalGetTestCase(ProjectTestMixin, TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        access_token = self.user.tokens.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        self.list_url = reverse("projects:project-list")
+        self.detail_url = reverse("projects:project-detail", kwargs={"slug": self.project.pk})
+
+    def test_unchanged_projects_return_not_modified(self):
+        """Test that a request with a matching ETag gets an empty 304 response
+        """
+        for url in [self.list_url, self.detail_url]:
+            response = self.client.get(url, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.has_header("ETag"))
+            self.assertTrue(response.has_header("Last-Modified"))
+
+            response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.content, b"")
+
+    def test_etag_changes_when_nested_objects_change(self):
+        """Test that assigning a member changes the ETag of the project list
+        """
+        etag = self.client.get(self.list_url, format="json")["ETag"]
+        developer = UserFactory.create(email="dev@amalitech.org", role=User.DEVELOPER)
+        self.project.members.add(developer.developer_profile.first())
+
+        response = self.client.get(self.list_url, format="json", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+
 class RetreiveProjectDetailViewTestCase(ProjectTestMixin, TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
@@ -124,6 +166,32 @@ class AssignProjectToDeveloperTestCase(ProjectTestMixin, TestCase):
         response = self.client.patch(self.url, payload, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    @override_settings(ROOT_URLCONF="acms.asgi_urls", EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_asgi_deployment_assigns_and_notifies_every_developer(self):
+        """Test that the ASGI deployment assigns the members with the sync
+        view and that the dispatcher emails each of them
+        """
+        developer = UserFactory.create(email="dev2@amalitech.org", role=User.DEVELOPER)
+        members = [self.developer.developer_profile.first().pk, developer.developer_profile.first().pk]
+        response = async_to_sync(self.async_client.patch)(
+            self.url, {"members": members}, content_type="application/json",
+            AUTHORIZATION=f"Bearer {self.user.tokens.get('access')}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.resolver_match.func.view_class, AssignProjectToDeveloperView)
+        self.assertEqual(sorted(member["id"] for member in response.data["members"]), sorted(members))
+        self.assertEqual(dispatch_events(), {"dispatched": 2})
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), ["dev2@amalitech.org", "dev@amalitech.org"])
+
+    def test_invalid_members_are_rejected(self):
+        """Test that assigning a developer profile that doesn't exist fails
+        """
+        access_token = self.user.tokens.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        response = self.client.patch(self.url, {"members": [0]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class SuggestedDevelopersListTestCase(ProjectTestMixin, TestCase):
     def setUp(self) -> None:
@@ -151,3 +219,99 @@ class SuggestedDevelopersListTestCase(ProjectTestMixin, TestCase):
         self.assertContains(response, "match_percentage")
         self.assertEqual(response.data[0].get("developer_profile").get("id"), self.developer_profile.pk)
         self.assertEqual(response.data[0].get("match_percentage"), 100.0)
+
+
+class RecommendedDevelopersListTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        category = CategoryFactory.create(name="Engineering", slug="engineering")
+        cls.skills = {
+            name: SkillFactory.create(name=name, slug=name.lower(), category=category)
+            for name in ["Python", "Django", "React", "Go"]
+        }
+        cls.developers = {
+            name: UserFactory.create(email=f"{name}@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+            for name in ["alice", "bob", "carol", "dave", "erin", "frank", "grace"]
+        }
+        DeveloperProfile.objects.filter(pk=cls.developers["frank"].pk).update(availability=False)
+        today = timezone.now().date()
+        for name, skills, end_date, members in [
+            ("API", ["Python", "Django"], today - timezone.timedelta(days=60), ["alice", "bob", "frank", "grace"]),
+            ("Web", ["Python", "React"], today - timezone.timedelta(days=30), ["bob", "carol"]),
+            ("Ongoing", ["Python", "Django"], today + timezone.timedelta(days=30), ["dave"]),
+            ("Mobile", ["Go"], today - timezone.timedelta(days=10), ["erin"]),
+        ]:
+            cls.create_project(name, skills, end_date, members)
+        cls.project = cls.create_project("New API", ["Python", "Django"], today + timezone.timedelta(days=90), ["grace"])
+        cls.manager = UserFactory.create(email="manager@amalitech.org", role=User.PROJECT_MANAGER)
+
+    @classmethod
+    def create_project(cls, name, skills, end_date, members):
+        return ProjectFactory.create(
+            name=name,
+            start_date=end_date - timezone.timedelta(days=90),
+            end_date=end_date,
+            required_skills=[cls.skills[skill] for skill in skills],
+            members=[cls.developers[member] for member in members],
+        )
+
+    def setUp(self) -> None:
+        staffing._index = None
+        self.addCleanup(setattr, staffing, "_index", None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+        self.url = reverse("projects:recommended-developers-list", kwargs={"slug": self.project.pk})
+
+    def test_members_of_similar_past_projects_are_recommended(self):
+        """Test that the available members of the ended projects are ranked by
+        the Jaccard similarity of the projects they were on, without the
+        members of the project itself
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [data["developer_profile"]["id"] for data in response.data],
+            [self.developers[name].pk for name in ["bob", "alice", "carol"]],
+        )
+        self.assertEqual([data["score"] for data in response.data], [1.3333, 1.0, 0.3333])
+        self.assertEqual(response.data[0]["similar_projects"], ["api", "web"])
+        self.assertEqual(len(self.client.get(self.url, {"limit": 1}).data), 1)
+        self.assertEqual(self.client.get(self.url, {"limit": 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(STAFFING_REFRESH_INTERVAL=3600)
+    def test_index_is_refreshed_when_projects_are_created_or_edited(self):
+        """Test that the rows of the new projects and of the projects whose
+        required skills changed are reloaded without rebuilding the index
+        """
+        self.client.get(self.url)
+        index = staffing._index
+        mobile = self.developers["erin"].project_set.get()
+        mobile.required_skills.set([self.skills["Python"], self.skills["Django"]])
+        self.create_project("CMS", ["Django"], timezone.now().date() - timezone.timedelta(days=5), ["dave"])
+
+        response = self.client.get(self.url, {"limit": 5})
+
+        self.assertIs(staffing._index, index)
+        self.assertEqual(
+            [data["developer_profile"]["id"] for data in response.data],
+            [self.developers[name].pk for name in ["bob", "alice", "erin", "dave", "carol"]],
+        )
+        self.assertEqual(response.data[3]["score"], 0.5)
+
+    def test_index_built_offline_is_loaded_and_refreshed(self):
+        """Test that the workers load the index written by the command and
+        reload the projects created after it was built
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "staffing.npz")
+            with override_settings(STAFFING_INDEX_PATH=path):
+                call_command("build_staffing_index", stdout=open(os.devnull, "w"))
+                built = staffing.ProjectSkillIndex.read(path)
+                self.create_project("CMS", ["Django"], timezone.now().date() - timezone.timedelta(days=5), ["dave"])
+
+                index = staffing.get_staffing_index()
+
+        self.assertEqual(sorted(built.slugs.tolist()), ["api", "mobile", "new-api", "ongoing", "web"])
+        self.assertEqual(sorted(index.slugs.tolist()), ["api", "cms", "mobile", "new-api", "ongoing", "web"])
+        self.assertEqual(index.skills, ["django", "go", "python", "react"])
@@ -2,7 +2,9 @@ from django.urls import path
 
 from projects.views import (AssignProjectToDeveloperView, CreateProjectView,
                             DestroyProjectView, DeveloperProjectsListView,
-                            ListProjectsDetailView, RetreiveProjectDetailView,
+                            ListProjectsDetailView,
+                            RecommendedDevelopersListView,
+                            RetreiveProjectDetailView,
                             SuggestedDevelopersListView, UpdateProjectView)
 
 urlpatterns = [
@@ -14,4 +16,5 @@ urlpatterns = [
     path("<str:slug>/assign/", AssignProjectToDeveloperView.as_view(), name="project-assign-to-developer"),
     path("<int:id>/developer/", DeveloperProjectsListView.as_view(), name="view-developer-projects"),
     path("<str:slug>/suggested-developers/", SuggestedDevelopersListView.as_view(), name="suggested-developers-list"),
+    path("<str:slug>/recommended-developers/", RecommendedDevelopersListView.as_view(), name="recommended-developers-list"),
 ]
@@ -1,34 +1,58 @@
+from collections import defaultdict
+
 from django.db.models import QuerySet
 
 from accounts.serializers import DeveloperProfileSerializer
+from core.serializers import FlatSerializer
 from projects.models import Project
+from skills.models import DeveloperSkillExperience, SkillRating
+
+developer_profile_serializer = FlatSerializer(DeveloperProfileSerializer)
 
 
 def get_suggested_profiles(project: Project, developer_profiles: QuerySet) -> list:
     """Helper function to calculate the percentage by which
-    a developer matches a project's required skills
+    a developer matches a project's required skills, ranked by match and
+    then by the developer's years of experience in the required skills
+
+    The required skills, the skills of every developer, their precomputed
+    years of experience and the serialized developer profiles are each
+    loaded with one query for the whole list
 
     Args:
         project (Project): The project against a match is supposed to be
         computed
-        developer_profile (DeveloperProfile): The developer profile that is
+        developer_profiles (QuerySet): The developer profiles that are
         supposed to be matched
 
     Returns:
-        _type_: _description_
+        list: the serialized developer profiles with their match percentage
     """
-    suggested_profiles = []
+    required_skills = set(project.required_skills.values_list("pk", flat=True))
+    developer_skills = defaultdict(set)
+    skill_ratings = SkillRating.objects.filter(
+        developer_profile__in=developer_profiles.values("pk"), skill__in=required_skills
+    ).values_list("developer_profile_id", "skill_id")
+    for developer_profile_id, skill_id in skill_ratings:
+        developer_skills[developer_profile_id].add(skill_id)
+    experience_years = defaultdict(float)
+    experiences = DeveloperSkillExperience.objects.filter(
+        developer_profile__in=developer_profiles.values("pk"), skill__in=required_skills
+    ).values_list("developer_profile_id", "years")
+    for developer_profile_id, years in experiences:
+        experience_years[developer_profile_id] += float(years)
 
-    for profile in developer_profiles:
-        required_skills = set(project.required_skills.all())
-        developer_skills = set(profile.skills.all())
-        matching_skills = required_skills.intersection(developer_skills)
-        match_percentage = round(len(matching_skills) / len(required_skills) * 100, 1)
+    suggested_profiles = []
+    for profile_id, profile_data in developer_profile_serializer.serialize_map(developer_profiles).items():
+        matching_skills = developer_skills[profile_id]
+        match_percentage = round(len(matching_skills) / len(required_skills) * 100, 1) if required_skills else 0.0
 
         developer_data = {
-            "developer_profile": DeveloperProfileSerializer(profile).data,
+            "developer_profile": profile_data,
             "match_percentage": match_percentage,
+            "experience_years": round(experience_years[profile_id], 1),
         }
 
         suggested_profiles.append(developer_data)
+    suggested_profiles.sort(key=lambda data: (-data["match_percentage"], -data["experience_years"]))
     return suggested_profiles
@@ -1,20 +1,35 @@
+from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.generics import (CreateAPIView, DestroyAPIView,
-                                     ListAPIView, RetrieveAPIView,
-                                     UpdateAPIView)
+                                     GenericAPIView, ListAPIView,
+                                     RetrieveAPIView, UpdateAPIView)
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from accounts.models import DeveloperProfile
+from accounts.serializers import DeveloperProfileSerializer
+from core import audit
+from core.cache import (DEVELOPER_PROFILES_TAG, PROJECTS_TAG, cache_response,
+                        invalidate_tags_on_commit)
+from core.events import (DEVELOPER_ASSIGNED, PROJECT_UPDATED, publish_event,
+                         publish_events)
+from core.mixins import (ConditionalGetMixin, ConditionalRetrieveMixin,
+                         FlatListMixin, ReadReplicaMixin)
+from core.serializers import FlatSerializer
 from projects.models import Project
-from projects.serializers import AssignProjectSerializer, ProjectSerializer
+from projects.serializers import (PROJECT_PREFETCH, AssignProjectSerializer,
+                                  ProjectSerializer)
+from projects.staffing import recommend_developers
 from projects.utils import get_suggested_profiles
 from utils.decorators import required_fields
 from utils.exceptions import CustomAPIException
 from utils.permissions import IsAdmin, IsDeveloper, IsProjectManager
-from utils.send_email import send_project_assignment_email
+
+# relations nested in the ProjectSerializer output
+PROJECT_DEPENDENCIES = ("required_skills", "members", "members__user", "created_by")
 
 
 class CreateProjectView(CreateAPIView):
@@ -43,37 +58,69 @@ class CreateProjectView(CreateAPIView):
         project.save()
 
 
-class ListProjectsDetailView(ListAPIView):
+class ListProjectsDetailView(ReadReplicaMixin, ConditionalGetMixin, FlatListMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ProjectSerializer
+    flat_serializer = FlatSerializer(ProjectSerializer)
     queryset = Project.objects.all()
+    conditional_dependencies = PROJECT_DEPENDENCIES
+
+    @cache_response(tags=[PROJECTS_TAG])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
-class RetreiveProjectDetailView(RetrieveAPIView):
+class RetreiveProjectDetailView(ConditionalRetrieveMixin, RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ProjectSerializer
-    queryset = Project.objects.all()
+    queryset = Project.objects.prefetch_related(*PROJECT_PREFETCH)
     lookup_field = "slug"
+    conditional_dependencies = PROJECT_DEPENDENCIES
 
 
 class AssignProjectToDeveloperView(UpdateAPIView):
+    """APIView to add developers to a project. The developers are notified
+    by the `DEVELOPER_ASSIGNED` event handler once the assignment is
+    committed, see `projects.handlers`
+    """
     permission_classes = [IsAuthenticated & IsAdmin | IsProjectManager]
     serializer_class = AssignProjectSerializer
     queryset = Project.objects.all()
     lookup_field = "slug"
 
     def patch(self, request, *args, **kwargs):
+        project = self.assign_members(request.data.get("members", []))
+        return self.get_project_response(project)
+
+    @transaction.atomic
+    def assign_members(self, member_ids):
+        project, developers = self.add_members(member_ids)
+        self.update_members(project, developers)
+        publish_events(
+            DEVELOPER_ASSIGNED,
+            [{"developer_profile_id": developer.pk, "project_id": project.pk} for developer in developers],
+        )
+        for developer in developers:
+            audit.record_change(audit.DEVELOPER_ASSIGNED, developer, {"project_id": project.pk, "project": project.name})
+        return project
+
+    def add_members(self, member_ids):
         project = self.get_object()
-        member_ids = request.data.get("members", [])
-        developers = DeveloperProfile.objects.filter(id__in=member_ids)
+        developers = DeveloperProfile.objects.filter(id__in=member_ids).select_related("user")
         if len(developers) != len(member_ids):
-            return CustomAPIException(message="One or more developer profiles is invalid!", status=status.HTTP_400_BAD_REQUEST)
+            raise CustomAPIException(message="One or more developer profiles is invalid!", status_code=status.HTTP_400_BAD_REQUEST)
         project.members.add(*developers)
+        # membership changes don't touch the project row so bump it explicitly
+        project.save(update_fields=["modify_date"])
+        return project, developers
 
-        for developer in developers:
-            send_project_assignment_email(developer, project)
+    def update_members(self, project, developers):
+        developers.update(availability=False, current_project_start_date=project.start_date, current_project_end_date=project.end_date, current_project=project.name, modify_date=timezone.now())
+        # bulk updates don't send post_save so the cached profiles are dropped here
+        invalidate_tags_on_commit(DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
 
-        developers.update(availability=False, current_project_start_date=project.start_date, current_project_end_date=project.end_date, current_project=project.name)
+    def get_project_response(self, project):
+        project = self.get_queryset().prefetch_related(*PROJECT_PREFETCH).get(pk=project.pk)
         serializer = self.get_serializer(project)
         return Response(serializer.data)
 
@@ -84,6 +131,18 @@ class UpdateProjectView(UpdateAPIView):
     queryset = Project.objects.all()
     lookup_field = "slug"
 
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        serializer = self.get_serializer(self.get_object(), data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            project = serializer.save()
+            publish_event(PROJECT_UPDATED, {"project_id": project.pk, "fields": sorted(serializer.validated_data)})
+
+        # the nested members are serialized from a prefetched copy
+        project = self.get_queryset().prefetch_related(*PROJECT_PREFETCH).get(pk=project.pk)
+        return Response(self.get_serializer(project).data)
+
 
 class DestroyProjectView(DestroyAPIView):
     permission_classes = [IsAuthenticated & IsAdmin | IsProjectManager]
@@ -92,21 +151,24 @@ class DestroyProjectView(DestroyAPIView):
     lookup_field = "slug"
 
 
-class DeveloperProjectsListView(ListAPIView):
+class DeveloperProjectsListView(ReadReplicaMixin, ConditionalGetMixin, ListAPIView):
     permission_classes = [IsAuthenticated & (IsDeveloper | IsAdmin | IsProjectManager)]
     serializer_class = ProjectSerializer
+    conditional_dependencies = PROJECT_DEPENDENCIES
     # User = User()
 
     def get_queryset(self):
         user_id = self.kwargs['id']
 
         developer = get_object_or_404(DeveloperProfile, user__id=user_id)
-        projects = Project.objects.filter(members__id=developer.id).distinct().order_by('-create_date')
+        projects = Project.objects.filter(members__id=developer.id).distinct().order_by('-create_date').prefetch_related(
+            *PROJECT_PREFETCH
+        )
 
         return projects
 
 
-class SuggestedDevelopersListView(ListAPIView):
+class SuggestedDevelopersListView(ReadReplicaMixin, ListAPIView):
     """List API View that enables users to retrieve a list of
     suggested developers to be assigned to a project based on the project's
     required skills and the developer's skills
@@ -136,3 +198,31 @@ class SuggestedDevelopersListView(ListAPIView):
             raise CustomAPIException(message=error_message)
 
         return Response(suggested_profiles)
+
+
+class RecommendedDevelopersListView(ReadReplicaMixin, GenericAPIView):
+    """API View to recommend the developers who were members of the past
+    projects whose required skills are the most similar to a project's. The
+    `limit` query param is the number of developers, 10 by default
+    """
+    serializer_class = DeveloperProfileSerializer
+    permission_classes = [IsAuthenticated & (IsAdmin | IsProjectManager)]
+    flat_serializer = FlatSerializer(DeveloperProfileSerializer)
+    queryset = Project.objects.all()
+    lookup_field = "slug"
+    recommended_limit = 10
+    max_recommended_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        project = self.get_object()
+        limit = request.query_params.get("limit", self.recommended_limit)
+        if not str(limit).isdigit() or not 0 < int(limit) <= self.max_recommended_limit:
+            raise CustomAPIException(message=f"limit must be a number between 1 and {self.max_recommended_limit}")
+
+        recommended = recommend_developers(project, int(limit))
+        profiles = self.flat_serializer.serialize_pks([profile_id for profile_id, _, _ in recommended])
+        response_data = [
+            {"developer_profile": profile, "score": round(score, 4), "similar_projects": similar_projects}
+            for profile, (_, score, similar_projects) in zip(profiles, recommended)
+        ]
+        return Response(response_data, status=status.HTTP_200_OK)
@@ -1,5 +1,11 @@
 from django.contrib import admin
 
-from skills.models import Category
+from skills.models import Category, SkillSynonym
 
 admin.site.register(Category)
+
+
+@admin.register(SkillSynonym)
+class SkillSynonymAdmin(admin.ModelAdmin):
+    list_display = ("name", "skill")
+    search_fields = ("name", "skill__name")
@@ -0,0 +1,39 @@
+import time
+from collections import Counter
+
+from django.core.management import BaseCommand, CommandError
+
+from skills.utils import backfill_skill_experience
+
+
+class Command(BaseCommand):
+    """Django command to link the `skills_used` of every work experience to
+    skills and to recompute the years of experience per skill, e.g. after
+    adding skills or synonyms
+    """
+
+    help = "Back-fill the skills of the work experiences and the years of experience per skill"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Number of developer profiles per transaction")
+        parser.add_argument("--unmatched", type=int, default=20, help="Number of unmatched skill names listed")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("The chunk size must be positive.")
+
+        start = time.perf_counter()
+        totals, unmatched = Counter(), Counter()
+        for result in backfill_skill_experience(options["chunk_size"]):
+            unmatched.update(result.pop("unmatched"))
+            totals.update(result)
+            self.stdout.write(f"{totals['links']} skill links and {totals['experiences']} experiences so far")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Linked {totals['links']} work experience skills and computed {totals['experiences']} "
+            f"experiences in {time.perf_counter() - start:.1f}s"
+        ))
+        if unmatched and options["unmatched"]:
+            self.stdout.write("Most common unmatched skills, add them as skills or synonyms:")
+            for name, count in unmatched.most_common(options["unmatched"]):
+                self.stdout.write(f"  {name}: {count}")
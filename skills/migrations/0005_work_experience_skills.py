@@ -0,0 +1,63 @@
+# Generated by Django 4.1.7 on 2026-10-19 19:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_developerprofile_availability_end_date_index'),
+        ('skills', '0004_skillrating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkExperienceSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('developer_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.developerprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='skills.skill')),
+                ('work_experience', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='accounts.workexperience')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SkillSynonym',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('create_date', models.DateTimeField(auto_now_add=True, verbose_name='date created')),
+                ('modify_date', models.DateTimeField(auto_now=True, verbose_name='date modified')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='synonyms', to='skills.skill')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DeveloperSkillExperience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('years', models.DecimalField(decimal_places=1, max_digits=4)),
+                ('last_used', models.DateField()),
+                ('developer_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_experience', to='accounts.developerprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='skills.skill')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='workexperienceskill',
+            index=models.Index(fields=['skill', 'developer_profile'], name='skills_wes_skill_profile_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='workexperienceskill',
+            constraint=models.UniqueConstraint(fields=('work_experience', 'skill'), name='skills_work_experience_skill_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='developerskillexperience',
+            index=models.Index(fields=['skill', '-years'], name='skills_experience_years_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='developerskillexperience',
+            constraint=models.UniqueConstraint(fields=('developer_profile', 'skill'), name='skills_developer_skill_unique'),
+        ),
+    ]
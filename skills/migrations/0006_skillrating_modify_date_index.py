@@ -0,0 +1,17 @@
+# Generated by Django 4.1.7 on 2026-10-19 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0005_work_experience_skills'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skillrating',
+            index=models.Index(fields=['modify_date'], name='skills_rating_modify_date_idx'),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
 from django.utils.text import slugify
 
-from accounts.models import DeveloperProfile
+from accounts.models import DeveloperProfile, WorkExperience
 from core.models import TimestampMixin
 
 
@@ -48,7 +48,68 @@ class SkillRating(TimestampMixin, models.Model):
     rating = models.DecimalField(max_digits=3, decimal_places=1)
     comment = models.CharField(max_length=255)
 
+    class Meta:
+        indexes = [
+            # the similarity index reloads the recently changed ratings, see `skills.similarity`
+            models.Index(fields=["modify_date"], name="skills_rating_modify_date_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"""
         {self.developer_profile.user.id} -
         {self.skill.name} - {self.rating}"""
+
+
+class SkillSynonym(TimestampMixin, models.Model):
+    """Model class for another name of a skill, such as "JS" for JavaScript,
+    used to link the free text skills of work experiences to skills, see
+    `skills.utils.get_skill_dictionary`
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="synonyms")
+
+    def __str__(self) -> str:
+        return f"{self.name} - {self.skill_id}"
+
+
+class WorkExperienceSkill(models.Model):
+    """Model class for a skill that a `skills_used` entry of a work
+    experience was matched to. The developer profile is copied from the
+    work experience to aggregate and filter without joining it
+    """
+
+    work_experience = models.ForeignKey(WorkExperience, on_delete=models.CASCADE, related_name="skill_links")
+    developer_profile = models.ForeignKey(DeveloperProfile, on_delete=models.CASCADE, related_name="+")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["work_experience", "skill"], name="skills_work_experience_skill_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["skill", "developer_profile"], name="skills_wes_skill_profile_idx"),
+        ]
+
+
+class DeveloperSkillExperience(models.Model):
+    """Model class for the years of experience of a developer in a skill,
+    precomputed from their work experiences: the overlapping periods of the
+    work experiences that used the skill are counted once
+    """
+
+    developer_profile = models.ForeignKey(DeveloperProfile, on_delete=models.CASCADE, related_name="skill_experience")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="+")
+    years = models.DecimalField(max_digits=4, decimal_places=1)
+    last_used = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["developer_profile", "skill"], name="skills_developer_skill_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["skill", "-years"], name="skills_experience_years_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.developer_profile_id} - {self.skill_id} - {self.years}"
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core import audit
+from core.cache import (DEVELOPER_PROFILES_TAG, PROJECTS_TAG, SKILLS_TAG,
+                        invalidate_tags_on_commit)
+from skills.models import Category, Skill, SkillRating, SkillSynonym
+from skills.similarity import expire_similarity_index
+
+
+@receiver([post_save, post_delete], sender=SkillRating)
+def invalidate_skill_rating_responses(sender, **kwargs):
+    """Signal function to invalidate the cached responses that contain the
+    skills of developer profiles, and the similarity index of this process
+    """
+    invalidate_tags_on_commit(DEVELOPER_PROFILES_TAG, PROJECTS_TAG)
+    expire_similarity_index()
+
+
+@receiver([post_save, post_delete], sender=Skill)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=SkillSynonym)
+def invalidate_skill_taxonomy(sender, **kwargs):
+    """Signal function to invalidate the cached skill taxonomy and skill
+    dictionary
+    """
+    invalidate_tags_on_commit(SKILLS_TAG)
+
+
+@receiver(post_init, sender=SkillRating)
+def remember_skill_rating(sender, instance, **kwargs):
+    """Signal function to keep the rating a skill rating was loaded with, to
+    audit its changes. A deferred rating isn't loaded
+    """
+    instance._initial_rating = instance.__dict__.get("rating")
+
+
+@receiver(post_save, sender=SkillRating)
+def audit_skill_rating(sender, instance, created, **kwargs):
+    """Signal function to record a new rating or a change of rating in the
+    audit log
+    """
+    changes = {"developer_profile_id": instance.developer_profile_id, "skill_id": instance.skill_id}
+    if created:
+        audit.record_change(audit.SKILL_RATING_CREATED, instance, {**changes, "rating": instance.rating})
+    elif instance._initial_rating is not None and instance._initial_rating != instance.rating:
+        audit.record_change(
+            audit.SKILL_RATING_CHANGED, instance, {**changes, "old_rating": instance._initial_rating, "rating": instance.rating}
+        )
+    instance._initial_rating = instance.rating
+
+
+@receiver(post_delete, sender=SkillRating)
+def audit_skill_rating_deletion(sender, instance, **kwargs):
+    """Signal function to record a deleted rating in the audit log"""
+    audit.record_change(
+        audit.SKILL_RATING_DELETED,
+        instance,
+        {"developer_profile_id": instance.developer_profile_id, "skill_id": instance.skill_id, "rating": instance.rating},
+    )
@@ -0,0 +1,186 @@
+"""Similar developers by their skill ratings.
+
+Every developer is a vector of their ratings over the skills. The vectors
+are held by each worker in a `SkillVectorIndex`, a float32 matrix with one
+L2 normalized row per rated developer, so that the cosine similarity of a
+developer to every other one is a single matrix-vector product.
+
+The index is built on first use and refreshed incrementally: at most every
+`SIMILARITY_REFRESH_INTERVAL` seconds, the rows of the developers whose
+ratings changed since the last refresh are reloaded with one query. Ratings
+are matched by their `modify_date`, going back `SIMILARITY_REFRESH_LAG`
+seconds so that a transaction committed after the refresh started is still
+seen. The index is rebuilt when the skills change. Availability changes too
+often to be kept in the index, the candidates are filtered in the database.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from accounts.models import DeveloperProfile
+from core.cache import SKILLS_TAG, get_tag_versions
+from skills.models import Skill, SkillRating
+
+# candidates ranked per available developer that is asked for, most are available
+CANDIDATE_FACTOR = 4
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class SkillVectorIndex:
+    """Normalized rating vectors of the rated developers, see the module"""
+
+    def __init__(self, skills, skills_version=None):
+        self.skills = list(skills)
+        self.columns = {slug: column for column, slug in enumerate(self.skills)}
+        self.skills_version = skills_version
+        self.rows = {}
+        self.profile_ids = np.empty(0, dtype=np.int64)
+        self.matrix = np.zeros((0, len(self.skills)), dtype=np.float32)
+        self.watermark = None
+        self.refreshed_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        """Method to load the ratings of every developer"""
+        index = cls(Skill.objects.order_by("slug").values_list("slug", flat=True), get_tag_versions([SKILLS_TAG])[0])
+        index.watermark = timezone.now()
+        index.load(SkillRating.objects.all())
+        return index
+
+    def refresh(self) -> int:
+        """Method to reload the rows of the developers whose ratings changed
+        since the last refresh
+
+        Returns:
+            int: the number of reloaded developers
+        """
+        since = self.watermark - timezone.timedelta(seconds=settings.SIMILARITY_REFRESH_LAG)
+        watermark = timezone.now()
+        changed = SkillRating.objects.filter(modify_date__gte=since).values("developer_profile_id")
+        count = self.load(SkillRating.objects.filter(developer_profile_id__in=changed))
+        self.watermark, self.refreshed_at = watermark, time.monotonic()
+        return count
+
+    def load(self, ratings) -> int:
+        """Method to replace the rows of the developers of the ratings with
+        their ratings, every rating of a developer must be included
+
+        Returns:
+            int: the number of loaded developers
+        """
+        rows = ratings.annotate(value=Cast("rating", FloatField())).values_list(
+            "developer_profile_id", "skill_id", "value"
+        )
+        rows = [(profile_id, self.columns[slug], value) for profile_id, slug, value in rows if slug in self.columns]
+        if not rows:
+            return 0
+
+        profile_ids, columns, values = (np.array(column) for column in zip(*rows))
+        profile_ids, positions = np.unique(profile_ids, return_inverse=True)
+        vectors = np.zeros((len(profile_ids), len(self.skills)), dtype=np.float32)
+        np.maximum.at(vectors, (positions, columns), values.astype(np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1)
+
+        known = np.array([profile_id in self.rows for profile_id in profile_ids.tolist()], dtype=bool)
+        if known.any():
+            self.matrix[[self.rows[profile_id] for profile_id in profile_ids[known].tolist()]] = vectors[known]
+        if not known.all():
+            start = len(self.profile_ids)
+            new_ids = profile_ids[~known]
+            self.rows.update(zip(new_ids.tolist(), range(start, start + len(new_ids))))
+            self.profile_ids = np.concatenate([self.profile_ids, new_ids])
+            self.matrix = np.vstack([self.matrix, vectors[~known]])
+        return len(profile_ids)
+
+    def get_scores(self, developer_profile_id):
+        """Method to compute the cosine similarity of every developer to a
+        developer, 0 for the developer themselves
+
+        Returns:
+            ndarray: the similarity of every row, None if the developer has no ratings
+        """
+        row = self.rows.get(developer_profile_id)
+        if row is None:
+            return None
+        scores = self.matrix @ self.matrix[row]
+        scores[row] = 0
+        return scores
+
+    def rank(self, scores, count):
+        """Method to get the `count` most similar developers with a positive
+        similarity, most similar first
+
+        Returns:
+            tuple: arrays of the developer profile ids and their similarity
+        """
+        count = min(count, len(scores))
+        if count == 0:
+            return self.profile_ids[:0], scores[:0]
+        candidates = np.argpartition(-scores, count - 1)[:count]
+        candidates = candidates[np.lexsort((self.profile_ids[candidates], -scores[candidates]))]
+        candidates = candidates[scores[candidates] > 0]
+        return self.profile_ids[candidates], scores[candidates]
+
+
+def get_similarity_index() -> SkillVectorIndex:
+    """Helper function to get the index of the process, built on first use,
+    rebuilt when the skills changed and refreshed when it's due
+    """
+    global _index
+    with _index_lock:
+        if _index is None or _index.skills_version != get_tag_versions([SKILLS_TAG])[0]:
+            _index = SkillVectorIndex.build()
+        elif time.monotonic() - _index.refreshed_at >= settings.SIMILARITY_REFRESH_INTERVAL:
+            _index.refresh()
+        return _index
+
+
+def expire_similarity_index():
+    """Helper function to refresh the index of the process on its next use,
+    e.g. after a rating changed in this process
+    """
+    if _index is not None:
+        _index.refreshed_at = float("-inf")
+
+
+def find_similar_developers(developer_profile_id, limit=10) -> list:
+    """Helper function to find the available developers whose ratings are
+    the most similar to a developer's
+
+    Args:
+        developer_profile_id (int): primary key of the developer profile
+        limit (int, optional): number of developers. Defaults to 10.
+
+    Returns:
+        list: (developer profile id, cosine similarity) tuples, most similar first
+    """
+    index = get_similarity_index()
+    with _index_lock:
+        scores = index.get_scores(developer_profile_id)
+    if scores is None:
+        return []
+
+    count = limit * CANDIDATE_FACTOR
+    while True:
+        profile_ids, similarities = index.rank(scores, count)
+        available = set(
+            DeveloperProfile.objects.filter(
+                pk__in=profile_ids.tolist(), availability=True, user__is_active=True
+            ).values_list("pk", flat=True)
+        )
+        similar = [
+            (profile_id, similarity)
+            for profile_id, similarity in zip(profile_ids.tolist(), similarities.tolist())
+            if profile_id in available
+        ]
+        if len(similar) >= limit or len(profile_ids) < count or count >= len(scores):
+            return similar[:limit]
+        count *= CANDIDATE_FACTOR
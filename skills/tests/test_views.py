@@ -1,13 +1,22 @@
+import datetime
+import decimal
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 from django.utils.text import slugify
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from accounts.models import User
+from accounts.models import User, WorkExperience
 from accounts.tests.factories import UserFactory
+from projects.tests.factories import ProjectFactory
+from skills.models import (DeveloperSkillExperience, Skill, SkillSynonym,
+                           WorkExperienceSkill)
 from skills.tests.factories import (CategoryFactory, SkillFactory,
                                     SkillRatingFactory)
+from skills.utils import get_experience_years, match_skills
 
 
 class ListCreateCategoryAPITestCase(TestCase):
@@ -105,6 +114,18 @@ class ListCreateSkillAPITestCase(TestCase):
             self.category.slug,
         )
 
+    def test_skill_list_is_cached_until_a_skill_changes(self):
+        """Test that the skill list is served from the cached taxonomy until a skill is saved"""
+        skill = SkillFactory.create(category=self.category)
+        self.client.get(self.url)
+
+        Skill.objects.filter(pk=skill.pk).update(name="Python Flask")
+        self.assertEqual(self.client.get(self.url).data[0]["name"], skill.name)
+
+        skill.name = "Python FastAPI"
+        skill.save()
+        self.assertEqual(self.client.get(self.url).data[0]["name"], "Python FastAPI")
+
 
 class CategoryAPITestMixin:
     def setUp(self):
@@ -195,3 +216,107 @@ class ListSkillRatingsAPITestCase(SkillRatingAPITestMixin, TestCase):
         self.assertEqual(response.data[0].get("comment"), skill_rating.comment)
         self.assertEqual(response.data[0].get("skill").get("name"), self.skill.name)
         self.assertEqual(response.data[0].get("skill").get("slug"), self.skill.slug)
+
+
+class SkillExperienceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        category = CategoryFactory.create(name="Languages", slug="languages")
+        cls.skills = {
+            name: SkillFactory.create(name=name, slug=slug, category=category)
+            for name, slug in [("C++", "cpp"), ("C#", "csharp"), ("JavaScript", "javascript"), ("Node.js", "nodejs")]
+        }
+        SkillSynonym.objects.create(name="JS", skill=cls.skills["JavaScript"])
+        cls.developer = UserFactory.create(email="dev@amalitech.org", role=User.DEVELOPER)
+        cls.developer_profile = cls.developer.developer_profile.get()
+
+    def add_work_experience(self, developer_profile, skills_used, start_date, end_date):
+        return WorkExperience.objects.create(
+            developer_profile=developer_profile, job_title="Developer", company_name="Amalitech",
+            skills_used=skills_used, start_date=start_date, end_date=end_date,
+        )
+
+    def test_skill_names_are_matched_through_their_spellings_and_synonyms(self):
+        """Test that free text skills are matched by normalized name, slug or
+        synonym, keeping the symbols that tell skills apart
+        """
+        self.assertEqual(
+            match_skills(["c++", "C #", "NodeJS", "node-js", "js", "javascript", "Cobol"]),
+            ["cpp", "csharp", "nodejs", "javascript"],
+        )
+
+    def test_overlapping_work_experiences_are_counted_once(self):
+        """Test that the years of overlapping periods are counted once"""
+        periods = [
+            (datetime.date(2020, 1, 1), datetime.date(2021, 1, 1)),
+            (datetime.date(2020, 7, 1), datetime.date(2022, 1, 1)),
+            (datetime.date(2023, 1, 1), datetime.date(2023, 7, 2)),
+        ]
+        self.assertEqual(get_experience_years(periods), decimal.Decimal("2.5"))
+
+    def test_profile_update_links_the_skills_used(self):
+        """Test that updating the work experience of a profile links its
+        skills and recomputes the years of experience per skill
+        """
+        client = APIClient()
+        client.force_authenticate(self.developer)
+        work_experience = {"job_title": "Developer", "company_name": "Amalitech"}
+        payload = {
+            "work_experience": [
+                {**work_experience, "skills_used": ["JS", "C++"], "start_date": "2019-01-01", "end_date": "2021-01-01"},
+                {**work_experience, "skills_used": ["javascript", "Cobol"], "start_date": "2020-01-01", "end_date": "2022-01-01"},
+            ]
+        }
+
+        response = client.patch(reverse("accounts:developer-profile-update"), payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(WorkExperienceSkill.objects.filter(developer_profile=self.developer_profile).count(), 3)
+        self.assertEqual(
+            dict(self.developer_profile.skill_experience.values_list("skill", "years")),
+            {"javascript": decimal.Decimal("3.0"), "cpp": decimal.Decimal("2.0")},
+        )
+
+        response = client.delete(
+            reverse("accounts:work-experience-retrieve-update-delete", args=[response.data["work_experience"][0]["id"]])
+        )
+        self.assertEqual(
+            dict(self.developer_profile.skill_experience.values_list("skill", "years")),
+            {"javascript": decimal.Decimal("2.0")},
+        )
+
+    def test_backfill_command_links_existing_work_experiences(self):
+        """Test that the command links the work experiences of every profile
+        in chunks and lists the unmatched skills
+        """
+        profiles = [self.developer_profile] + [
+            UserFactory.create(email=f"dev{index}@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+            for index in range(2)
+        ]
+        for profile in profiles:
+            self.add_work_experience(profile, ["Node.js", "Fortran"], datetime.date(2020, 1, 1), datetime.date(2021, 1, 1))
+        output = StringIO()
+
+        call_command("backfill_skill_experience", "--chunk-size", "2", stdout=output)
+
+        self.assertEqual(WorkExperienceSkill.objects.filter(skill="nodejs").count(), 3)
+        self.assertEqual(DeveloperSkillExperience.objects.filter(skill="nodejs", years=decimal.Decimal("1.0")).count(), 3)
+        self.assertIn("Fortran: 3", output.getvalue())
+
+    def test_suggested_developers_are_ranked_by_experience(self):
+        """Test that developers with the same match are ranked by their years
+        of experience in the required skills
+        """
+        project = ProjectFactory.create(slug="ranked-project", required_skills=[self.skills["C#"]])
+        senior = UserFactory.create(email="senior@amalitech.org", role=User.DEVELOPER).developer_profile.get()
+        for profile, start_date in [(self.developer_profile, datetime.date(2022, 1, 1)), (senior, datetime.date(2015, 1, 1))]:
+            SkillRatingFactory.create(skill=self.skills["C#"], developer_profile=profile)
+            self.add_work_experience(profile, ["C#"], start_date, datetime.date(2023, 1, 1))
+        call_command("backfill_skill_experience", stdout=StringIO())
+        client = APIClient()
+        client.force_authenticate(UserFactory.create(email="admin@amalitech.org", role=User.ADMIN))
+
+        response = client.get(reverse("projects:suggested-developers-list", args=[project.slug]))
+
+        self.assertEqual([data["developer_profile"]["id"] for data in response.data], [senior.pk, self.developer_profile.pk])
+        self.assertEqual([data["experience_years"] for data in response.data], [8.0, 1.0])
@@ -0,0 +1,158 @@
+import decimal
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.text import slugify
+
+from accounts.models import DeveloperProfile, WorkExperience
+from core.cache import SKILLS_TAG, get_tag_versions
+from skills.models import (DeveloperSkillExperience, Skill, SkillSynonym,
+                           WorkExperienceSkill)
+from skills.serializers import SkillSerializer
+
+TAXONOMY_KEY = "skills:taxonomy:{}"
+DICTIONARY_KEY = "skills:dictionary:{}"
+DAYS_PER_YEAR = decimal.Decimal("365.25")
+# characters that tell skills apart but that slugify drops, e.g. C, C++ and C#
+SKILL_SYMBOLS = {"+": "plus", "#": "sharp"}
+SKILL_SYMBOLS_PATTERN = re.compile("|".join(re.escape(symbol) for symbol in SKILL_SYMBOLS))
+
+
+def get_skill_taxonomy() -> list:
+    """Helper function to get every skill with its category, serialized like
+    the skill list. It's cached until a skill or a category changes, for at
+    most `RESPONSE_CACHE_TIMEOUT` seconds
+
+    Returns:
+        list: the serialized skills
+    """
+    key = TAXONOMY_KEY.format(*get_tag_versions([SKILLS_TAG]))
+    taxonomy = cache.get(key)
+    if taxonomy is None:
+        taxonomy = SkillSerializer(Skill.objects.select_related("category"), many=True).data
+        cache.set(key, taxonomy, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+    return taxonomy
+
+
+def normalize_skill_name(name) -> str:
+    """Helper function to normalize a skill name so that its spellings match,
+    e.g. "Node.js" and "NodeJS" or "c++" and "C++"
+    """
+    return slugify(SKILL_SYMBOLS_PATTERN.sub(lambda match: SKILL_SYMBOLS[match.group()], name)).replace("-", "")
+
+
+def get_skill_dictionary() -> dict:
+    """Helper function to map the normalized names, slugs and synonyms of
+    every skill to its slug. It's cached until a skill, a category or a
+    synonym changes, for at most `RESPONSE_CACHE_TIMEOUT` seconds
+
+    Returns:
+        dict: normalized name: skill slug
+    """
+    key = DICTIONARY_KEY.format(*get_tag_versions([SKILLS_TAG]))
+    dictionary = cache.get(key)
+    if dictionary is None:
+        dictionary = {}
+        skills = list(Skill.objects.values_list("slug", "name"))
+        # a name takes precedence over a synonym or another skill's slug
+        for slug, name in skills:
+            dictionary[normalize_skill_name(name)] = slug
+        for name, slug in SkillSynonym.objects.values_list("name", "skill_id"):
+            dictionary.setdefault(normalize_skill_name(name), slug)
+        for slug, name in skills:
+            dictionary.setdefault(normalize_skill_name(slug), slug)
+        cache.set(key, dictionary, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+    return dictionary
+
+
+def match_skills(names, dictionary=None) -> list:
+    """Helper function to match free text skill names to skills
+
+    Returns:
+        list: the slugs of the matched skills, without duplicates
+    """
+    dictionary = get_skill_dictionary() if dictionary is None else dictionary
+    slugs = (dictionary.get(normalize_skill_name(name)) for name in names)
+    return list(dict.fromkeys(slug for slug in slugs if slug is not None))
+
+
+def get_experience_years(periods) -> decimal.Decimal:
+    """Helper function to count the years of a list of (start, end) dates,
+    counting overlapping periods once
+    """
+    days, current_start, current_end = 0, None, None
+    for start, end in sorted(periods):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                days += (current_end - current_start).days
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        days += (current_end - current_start).days
+    return (days / DAYS_PER_YEAR).quantize(decimal.Decimal("0.1"))
+
+
+def sync_skill_experience(developer_profile_ids) -> dict:
+    """Helper function to link the `skills_used` of the work experiences of
+    developer profiles to skills and to recompute their years of experience
+    per skill. Each table is replaced with one delete and one insert, call
+    it in the transaction that changed the work experiences
+
+    Args:
+        developer_profile_ids (list): primary keys of the developer profiles
+
+    Returns:
+        dict: the number of links and experiences created and a Counter of the unmatched names
+    """
+    dictionary = get_skill_dictionary()
+    links, periods, unmatched = [], defaultdict(list), Counter()
+    work_experiences = WorkExperience.objects.filter(developer_profile_id__in=developer_profile_ids).values_list(
+        "pk", "developer_profile_id", "skills_used", "start_date", "end_date"
+    )
+    for pk, developer_profile_id, skills_used, start_date, end_date in work_experiences:
+        unmatched.update(name for name in skills_used if normalize_skill_name(name) not in dictionary)
+        for slug in match_skills(skills_used, dictionary):
+            links.append(WorkExperienceSkill(work_experience_id=pk, developer_profile_id=developer_profile_id, skill_id=slug))
+            if start_date and end_date and start_date <= end_date:
+                periods[developer_profile_id, slug].append((start_date, end_date))
+
+    WorkExperienceSkill.objects.filter(developer_profile_id__in=developer_profile_ids).delete()
+    WorkExperienceSkill.objects.bulk_create(links)
+    DeveloperSkillExperience.objects.filter(developer_profile_id__in=developer_profile_ids).delete()
+    experiences = DeveloperSkillExperience.objects.bulk_create(
+        DeveloperSkillExperience(
+            developer_profile_id=developer_profile_id,
+            skill_id=slug,
+            years=get_experience_years(skill_periods),
+            last_used=max(end for _, end in skill_periods),
+        )
+        for (developer_profile_id, slug), skill_periods in periods.items()
+    )
+    return {"links": len(links), "experiences": len(experiences), "unmatched": unmatched}
+
+
+def backfill_skill_experience(chunk_size=500, developer_profile_ids=None):
+    """Generator to run `sync_skill_experience` over every developer profile,
+    or the given ones, in chunks of `chunk_size` profiles, each in its own
+    transaction
+
+    Yields:
+        dict: the result of every chunk
+    """
+    last_pk = 0
+    while True:
+        if developer_profile_ids is None:
+            chunk = list(
+                DeveloperProfile.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:chunk_size]
+            )
+        else:
+            chunk = list(developer_profile_ids[last_pk:last_pk + chunk_size])
+        if not chunk:
+            return
+        with transaction.atomic():
+            yield sync_skill_experience(chunk)
+        last_pk = chunk[-1] if developer_profile_ids is None else last_pk + len(chunk)
@@ -1,27 +1,37 @@
+from django.db import transaction
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from accounts.models import DeveloperProfile
+from core.events import SKILL_RATING_CHANGED, publish_event
+from core.mixins import (ConditionalGetMixin, ConditionalRetrieveMixin,
+                         FlatListMixin)
+from core.serializers import FlatSerializer
 from skills.models import Category, Skill, SkillRating
 from skills.serializers import (CategorySerializer, ListSkillRatingsSerializer,
                                 SkillRatingSerializer, SkillSerializer)
+from skills.utils import get_skill_taxonomy
 from utils.permissions import IsAdmin, IsDeveloper, IsProjectManager
 
 
-class ListCreateCategoryAPIView(generics.ListCreateAPIView):
+class ListCreateCategoryAPIView(ConditionalGetMixin, generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated, IsAdmin]
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
     pagination_class = None
 
 
-class ListCreateSkillAPIView(generics.ListCreateAPIView):
-    queryset = Skill.objects.all()
+class ListCreateSkillAPIView(ConditionalGetMixin, generics.ListCreateAPIView):
+    queryset = Skill.objects.select_related("category")
+    conditional_dependencies = ("category",)
     serializer_class = SkillSerializer
     permission_classes = [IsAuthenticated & IsAdmin | IsDeveloper | IsProjectManager]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return Response(get_skill_taxonomy())
+
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, many=True)
         serializer.is_valid(raise_exception=True)
@@ -48,7 +58,7 @@ class SkillDeleteAllAPIView(generics.DestroyAPIView):
         return Response(response_data, status=status.HTTP_204_NO_CONTENT)
 
 
-class AdminRetrieveUpdateDestroyMixin(generics.RetrieveUpdateDestroyAPIView):
+class AdminRetrieveUpdateDestroyMixin(ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated & IsAdmin]
 
 
@@ -60,21 +70,20 @@ class CategoryUpdateDestroyAPIView(AdminRetrieveUpdateDestroyMixin):
 class SkillUpdateDestroyAPIView(AdminRetrieveUpdateDestroyMixin):
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
+    conditional_dependencies = ("category",)
 
 
-class SkillRatingListCreateAPIView(generics.ListCreateAPIView):
+class SkillRatingListCreateAPIView(ConditionalGetMixin, FlatListMixin, generics.ListCreateAPIView):
     serializer_class = SkillRatingSerializer
+    flat_serializer = FlatSerializer(ListSkillRatingsSerializer)
     permission_classes = [IsAuthenticated & IsDeveloper]
     pagination_class = None
+    conditional_dependencies = ("skill", "skill__category")
 
-    def list(self, request, *args, **kwargs):
+    def get_queryset(self):
         user = self.request.user
         developer_profile = user.developer_profile.first()
-        queryset = SkillRating.objects.filter(developer_profile=developer_profile)
-
-        serializer = ListSkillRatingsSerializer(queryset, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return SkillRating.objects.filter(developer_profile=developer_profile)
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -82,10 +91,17 @@ class SkillRatingListCreateAPIView(generics.ListCreateAPIView):
         self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @transaction.atomic
     def perform_create(self, serializer):
         user = self.request.user
         developer_profile = DeveloperProfile.objects.get(user=user)
 
         skill_rating = serializer.save(developer_profile=developer_profile)
+        publish_event(SKILL_RATING_CHANGED, {
+            "skill_rating_id": skill_rating.pk,
+            "developer_profile_id": developer_profile.pk,
+            "skill_id": skill_rating.skill_id,
+            "rating": skill_rating.rating,
+        })
 
         return skill_rating
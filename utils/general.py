@@ -1,29 +1,32 @@
+import os
 from datetime import datetime
 
-from rest_framework import serializers
-
 from django.core.files.storage import default_storage
 from django.utils.text import slugify
+from rest_framework import serializers
 
 
-def upload_to_s3(file):
-    """Utility function to enable a user to upload files
+def upload_file(file, folder=""):
+    """Utility function to stream an uploaded file to the default storage.
+    The file is written chunk by chunk so it is never read into memory
+    as a whole
 
     Args:
-        file (_type_): the file to be uploaded
+        file (UploadedFile): the file to be uploaded
+        folder (str, optional): folder to save the file in. Defaults to "".
 
     Returns:
-        str: URL of the saved photo from AWS
+        str: storage path of the saved file or None if the upload failed
     """
-    filename = slugify(file.name)
+    name, extension = os.path.splitext(file.name)
+    filename = f"{slugify(name)}{extension.lower()}"
+    if folder:
+        filename = f"{folder}/{filename}"
     try:
-        path = default_storage.save(f"{filename}", file)
+        return default_storage.save(filename, file)
     except IOError:
         return None
 
-    url = default_storage.url(path)
-
-    return url
 
 def get_date_from_string(date_string: str) -> datetime:
     try:
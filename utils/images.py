@@ -0,0 +1,33 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+def resize_image_variants(file, sizes: dict, quality: int = 80) -> dict:
+    """Utility function to generate resized and compressed JPEG variants
+    of an image. The image is decoded once and shrunk progressively from
+    the largest to the smallest variant
+
+    Args:
+        file (File): a file-like object containing the original image
+        sizes (dict): mapping of the variant name to the length in pixels
+        of its longest edge
+        quality (int, optional): JPEG quality of the variants. Defaults to 80.
+
+    Raises:
+        PIL.UnidentifiedImageError: raised if the file is not a valid image
+
+    Returns:
+        dict: mapping of the variant name to a ContentFile of the variant
+    """
+    variants = {}
+    with Image.open(file) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    for name, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        variants[name] = ContentFile(buffer.getvalue())
+    return variants